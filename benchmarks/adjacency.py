@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# thoth-adviser
+# Copyright(C) 2020 Fridolin Pokorny
+#
+# This program is free software: you can redistribute it and / or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Benchmark storage of dependencies and dependents noted during a resolver run.
+
+Compares memory used and time spent on inserting edges of a synthetic dependency graph into nested dictionaries
+of sets (the representation used previously in resolver context) and into the compact dependency graph. Run from
+the repository root:
+
+  PYTHONPATH=. python3 benchmarks/adjacency.py --packages 2000 --versions 20 --hub-dependents 32000
+"""
+
+import random
+import time
+import tracemalloc
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Set
+from typing import Tuple
+
+import click
+
+from thoth.adviser.adjacency import DependencyGraph
+
+_INDEX_URL = "https://pypi.org/simple"
+_ENVIRONMENT = ("rhel", "8", "3.6")
+
+
+class NestedDicts:
+    """Dependencies and dependents kept in nested dictionaries of sets."""
+
+    def __init__(self) -> None:
+        """Initialize empty mappings."""
+        self.dependencies: Dict[str, Dict[Tuple[str, str, str], Set[Tuple[str, str, str]]]] = {}
+        self.dependents: Dict[str, Dict[Tuple[str, str, str], Set[Any]]] = {}
+
+    def add(self, package_tuple: Tuple[str, str, str], dependency_tuple: Tuple[str, str, str], *env: str) -> None:
+        """Note down a dependency."""
+        self.dependencies.setdefault(package_tuple[0], {}).setdefault(package_tuple, set()).add(dependency_tuple)
+        self.dependents.setdefault(dependency_tuple[0], {}).setdefault(dependency_tuple, set()).add(
+            (package_tuple,) + env
+        )
+
+
+def _get_edges(packages: int, versions: int, dependencies: int, seed: int) -> List[Tuple[Any, Any]]:
+    """Generate edges of a synthetic dependency graph, each edge is noted twice as in resolver runs."""
+    rng = random.Random(seed)
+    package_tuples = [(f"package-{i}", f"{j}.0.0", _INDEX_URL) for i in range(packages) for j in range(versions)]
+    edges = []
+    for package_tuple in package_tuples:
+        for dependency_tuple in rng.sample(package_tuples, dependencies):
+            edges.append((package_tuple, dependency_tuple))
+
+    return edges * 2
+
+
+def _measure(factory: Callable[[], Any], edges: List[Tuple[Any, Any]]) -> Tuple[float, float]:
+    """Insert the given edges, return memory used in MiB and time spent in seconds."""
+    tracemalloc.start()
+    start = time.monotonic()
+    storage = factory()
+    for package_tuple, dependency_tuple in edges:
+        storage.add(package_tuple, dependency_tuple, *_ENVIRONMENT)
+
+    duration = time.monotonic() - start
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return memory / 1024 / 1024, duration
+
+
+@click.command()
+@click.option("--packages", type=int, default=2000, show_default=True, help="Number of packages.")
+@click.option("--versions", type=int, default=20, show_default=True, help="Number of versions of each package.")
+@click.option("--dependencies", type=int, default=4, show_default=True, help="Dependencies of each package version.")
+@click.option(
+    "--hub-dependents", type=int, default=32000, show_default=True, help="Dependents of a single hub package."
+)
+@click.option("--seed", type=int, default=42, show_default=True, help="Seed used to generate the graph.")
+def cli(packages: int, versions: int, dependencies: int, hub_dependents: int, seed: int) -> None:
+    """Benchmark storage of dependencies and dependents."""
+    graph_edges = _get_edges(packages, versions, dependencies, seed)
+    hub_tuple = ("hub", "1.0.0", _INDEX_URL)
+    hub_edges = [((f"package-{i}", "1.0.0", _INDEX_URL), hub_tuple) for i in range(hub_dependents)] * 2
+
+    click.echo(f"{'storage':<16} {'scenario':<8} {'edges':>9} {'memory (MiB)':>12} {'time (s)':>8}")
+    for name, factory in (("nested dicts", NestedDicts), ("dependency graph", DependencyGraph)):
+        for scenario, edges in (("graph", graph_edges), ("hub", hub_edges)):
+            memory, duration = _measure(factory, edges)
+            click.echo(f"{name:<16} {scenario:<8} {len(edges):>9} {memory:>12.1f} {duration:>8.2f}")
+
+
+if __name__ == "__main__":
+    cli()
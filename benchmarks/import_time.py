@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# thoth-adviser
+# Copyright(C) 2020 Fridolin Pokorny
+#
+# This program is free software: you can redistribute it and / or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Benchmark start-up cost of adviser - time spent on importing modules and building pipeline configuration.
+
+Each scenario is run in a fresh interpreter so that no module is imported beforehand. Time spent on interpreter
+start-up is not included. Run from the repository root:
+
+  PYTHONPATH=. python3 benchmarks/import_time.py --runs 10
+"""
+
+import statistics
+import subprocess
+import sys
+from typing import Tuple
+
+import click
+
+_PROJECT = """
+from thoth.common import RuntimeEnvironment
+from thoth.python import Project
+project = Project.from_files(
+    pipfile_path="tests/data/projects/Pipfile",
+    pipfile_lock_path="tests/data/projects/Pipfile.lock",
+    runtime_environment=RuntimeEnvironment.from_dict({"python_version": "3.8"}),
+)
+"""
+
+_SCENARIOS = {
+    "cli": "import thoth.adviser.cli",
+    "units": "from thoth.adviser.pipeline_builder import PipelineBuilder\nlist(PipelineBuilder._iter_units())",
+    "adviser": _PROJECT
+    + """
+from thoth.adviser.enums import RecommendationType
+from thoth.adviser.pipeline_builder import PipelineBuilder
+PipelineBuilder.get_adviser_pipeline_config(
+    graph=None, project=project, library_usage=None, recommendation_type=RecommendationType.STABLE
+)
+""",
+    "dependency-monkey": _PROJECT
+    + """
+from thoth.adviser.enums import DecisionType
+from thoth.adviser.pipeline_builder import PipelineBuilder
+PipelineBuilder.get_dependency_monkey_pipeline_config(
+    graph=None, project=project, library_usage=None, decision_type=DecisionType.RANDOM
+)
+""",
+}
+
+_TEMPLATE = """
+import time
+start = time.perf_counter()
+{code}
+print(time.perf_counter() - start)
+print("matplotlib" in __import__("sys").modules)
+"""
+
+
+def _run_scenario(code: str) -> Tuple[float, bool]:
+    """Run the given scenario in a fresh interpreter, return time spent and whether matplotlib was imported."""
+    output = subprocess.check_output(
+        [sys.executable, "-c", _TEMPLATE.format(code=code)], stderr=subprocess.DEVNULL, universal_newlines=True
+    )
+    duration, matplotlib_imported = output.splitlines()[-2:]
+    return float(duration), matplotlib_imported == "True"
+
+
+@click.command()
+@click.option("--runs", type=int, default=5, show_default=True, help="Number of runs for each scenario.")
+@click.option(
+    "--scenario",
+    "scenario_names",
+    type=click.Choice(list(_SCENARIOS)),
+    multiple=True,
+    help="Scenarios to benchmark, all if not provided.",
+)
+def cli(runs: int, scenario_names: Tuple[str, ...]) -> None:
+    """Benchmark start-up cost of adviser."""
+    click.echo(f"{'scenario':<20} {'median (ms)':>11} {'min (ms)':>9} {'matplotlib':>10}")
+    for scenario_name in scenario_names or _SCENARIOS:
+        results = [_run_scenario(_SCENARIOS[scenario_name]) for _ in range(runs)]
+        durations = [duration * 1000 for duration, _ in results]
+        click.echo(
+            f"{scenario_name:<20} {statistics.median(durations):>11.1f} {min(durations):>9.1f} "
+            f"{str(any(imported for _, imported in results)):>10}"
+        )
+
+
+if __name__ == "__main__":
+    cli()
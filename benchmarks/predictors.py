@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+# thoth-adviser
+# Copyright(C) 2020 Fridolin Pokorny
+#
+# This program is free software: you can redistribute it and / or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Benchmark predictors on synthetic dependency graphs - quality of the stack resolved per time spent.
+
+The resolver is run with a synthetic graph database and a single step scoring package versions with
+pre-generated scores. Each predictor is given the same time budget, the best score found and the time when it
+was found are reported. Run from the repository root:
+
+  PYTHONPATH=. python3 benchmarks/predictors.py --time-budget 10 --seed 42
+"""
+
+import logging
+import random
+import threading
+import time
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+import attr
+import click
+from thoth.common import RuntimeEnvironment
+from thoth.python import PackageVersion
+from thoth.python import Project
+from thoth.python import Source
+
+from thoth.adviser.enums import RecommendationType
+from thoth.adviser.pipeline_config import PipelineConfig
+from thoth.adviser.predictors import MCTS
+from thoth.adviser.predictors import TemporalDifference
+from thoth.adviser.predictors import UCT
+from thoth.adviser.resolver import Resolver
+from thoth.adviser.state import State
+from thoth.adviser.step import Step
+
+_INDEX_URL = "https://pypi.org/simple"
+_PREDICTORS = {"UCT": UCT, "MCTS": MCTS, "TemporalDifference": TemporalDifference}
+
+
+@attr.s(slots=True)
+class SyntheticGraph:
+    """A synthetic graph database - packages in layers, versions depend on packages in the next layer.
+
+    Each version depends on a window of versions of a dependency. Windows of different dependents do not need
+    to overlap which introduces conflicts in the resolution.
+    """
+
+    layers = attr.ib(type=int)
+    width = attr.ib(type=int)
+    versions = attr.ib(type=int)
+    dependencies = attr.ib(type=int)
+    seed = attr.ib(type=int)
+
+    scores = attr.ib(type=Dict[Tuple[str, str, str], float], factory=dict, init=False)
+    _depends_on = attr.ib(type=Dict[Tuple[str, str], List[Tuple[str, str]]], factory=dict, init=False)
+
+    def __attrs_post_init__(self) -> None:
+        """Generate the synthetic graph."""
+        rand = random.Random(self.seed)
+        for layer in range(self.layers):
+            for package_name in self.get_layer(layer):
+                for version in self.get_versions(package_name):
+                    self.scores[(package_name, version, _INDEX_URL)] = rand.uniform(-0.2, 0.2)
+
+                    dependencies = []
+                    if layer + 1 < self.layers:
+                        next_layer = self.get_layer(layer + 1)
+                        for dependency_name in rand.sample(next_layer, min(self.dependencies, len(next_layer))):
+                            dependency_versions = self.get_versions(dependency_name)
+                            start = rand.randrange(len(dependency_versions) - max(2 * self.versions // 3, 1) + 1)
+                            window = dependency_versions[start : start + max(2 * self.versions // 3, 1)]
+                            dependencies.extend((dependency_name, v) for v in window)
+
+                    self._depends_on[(package_name, version)] = dependencies
+
+    def get_layer(self, layer: int) -> List[str]:
+        """Get names of packages in the given layer."""
+        return [f"package-{layer}-{idx}" for idx in range(self.width)]
+
+    def get_versions(self, package_name: str) -> List[str]:
+        """Get versions of the given package, the latest first."""
+        return [f"1.0.{idx}" for idx in range(self.versions - 1, -1, -1)]
+
+    def get_depends_on(self, package_name: str, package_version: str, *_: Any, **__: Any) -> Dict[Any, Any]:
+        """Get dependencies of the given package."""
+        return {None: self._depends_on[(package_name, package_version)]}
+
+    def get_python_package_version_records(
+        self, *, package_name: str, package_version: str, **_: Any
+    ) -> List[Dict[str, Any]]:
+        """Get records of the given package as solved in the runtime environment."""
+        return [
+            {
+                "package_name": package_name,
+                "package_version": package_version,
+                "index_url": _INDEX_URL,
+                "os_name": None,
+                "os_version": None,
+                "python_version": None,
+            }
+        ]
+
+    def get_python_package_hashes_sha256(self, *_: Any) -> List[str]:
+        """Get hashes of the given package, no artifact hashes are provided in the synthetic graph."""
+        return []
+
+    def get_python_environment_marker(self, *_: Any, **__: Any) -> None:
+        """Get environment marker of the given dependency, no markers are used in the synthetic graph."""
+        return None
+
+
+@attr.s(slots=True)
+class SyntheticSolver:
+    """Resolve direct dependencies of the synthetic project."""
+
+    graph = attr.ib(type=SyntheticGraph)
+
+    def solve(self, package_versions: List[PackageVersion], graceful: bool = True) -> Dict[str, List[PackageVersion]]:
+        """Resolve all versions of the given direct dependencies."""
+        return {
+            package_version.name: [
+                PackageVersion(
+                    name=package_version.name, version=f"=={version}", index=Source(_INDEX_URL), develop=False
+                )
+                for version in self.graph.get_versions(package_version.name)
+            ]
+            for package_version in package_versions
+        }
+
+
+@attr.s(slots=True)
+class SyntheticScoreStep(Step):
+    """Score package versions with scores pre-generated in the synthetic graph."""
+
+    scores = attr.ib(type=Dict[Tuple[str, str, str], float], kw_only=True)
+
+    def run(self, _: State, package_version: PackageVersion) -> Optional[Tuple[Optional[float], None]]:
+        """Score the given package version."""
+        return self.scores[package_version.to_tuple()], None
+
+
+def _run_predictor(predictor_name: str, graph: SyntheticGraph, time_budget: float, seed: int) -> Dict[str, Any]:
+    """Run the given predictor in the given time budget and gather statistics."""
+    random.seed(seed)
+    project = Project.from_strings(
+        "[[source]]\nurl = 'https://pypi.org/simple'\nverify_ssl = true\nname = 'pypi'\n\n[packages]\n"
+        + "".join(f"{package_name} = '*'\n" for package_name in graph.get_layer(0)),
+        runtime_environment=RuntimeEnvironment.from_dict({}),
+    )
+    resolver = Resolver(
+        pipeline=PipelineConfig(steps={None: [SyntheticScoreStep(scores=graph.scores)]}),
+        project=project,
+        library_usage=None,
+        graph=graph,
+        predictor=_PREDICTORS[predictor_name](keep_history=False),
+        beam_width=10000,
+        limit=10 ** 9,
+        count=1,
+        recommendation_type=RecommendationType.STABLE,
+        solver=SyntheticSolver(graph),
+    )
+
+    timer = threading.Timer(time_budget, lambda: setattr(resolver, "stop_resolving", True))
+    best_score = None
+    best_found = None
+    stacks = 0
+    start = time.monotonic()
+    timer.start()
+    try:
+        for product in resolver.resolve_products(with_devel=False, user_stack_scoring=False):
+            stacks += 1
+            if best_score is None or product.score > best_score:
+                best_score = product.score
+                best_found = time.monotonic() - start
+    finally:
+        timer.cancel()
+
+    return {
+        "predictor": predictor_name,
+        "best_score": best_score,
+        "best_found": best_found,
+        "stacks": stacks,
+        "iterations": resolver.context.iteration,
+    }
+
+
+@click.command()
+@click.option("--layers", type=int, default=4, show_default=True, help="Depth of the synthetic dependency graph.")
+@click.option("--width", type=int, default=6, show_default=True, help="Number of packages in a layer.")
+@click.option("--versions", type=int, default=12, show_default=True, help="Number of versions of each package.")
+@click.option("--dependencies", type=int, default=2, show_default=True, help="Dependencies of each package version.")
+@click.option("--time-budget", type=float, default=10.0, show_default=True, help="Seconds given to each predictor.")
+@click.option("--seed", type=int, default=42, show_default=True, help="Seed used to generate the graph and runs.")
+@click.option("--runs", type=int, default=3, show_default=True, help="Number of runs for each predictor.")
+@click.option(
+    "--predictor",
+    "predictor_names",
+    type=click.Choice(list(_PREDICTORS)),
+    multiple=True,
+    help="Predictors to benchmark, all if not provided.",
+)
+def cli(
+    layers: int,
+    width: int,
+    versions: int,
+    dependencies: int,
+    time_budget: float,
+    seed: int,
+    runs: int,
+    predictor_names: Tuple[str, ...],
+) -> None:
+    """Benchmark predictors on a synthetic dependency graph."""
+    logging.basicConfig(level=logging.ERROR)
+    graph = SyntheticGraph(layers=layers, width=width, versions=versions, dependencies=dependencies, seed=seed)
+
+    click.echo(f"{'predictor':<20} {'run':>3} {'best score':>10} {'found (s)':>9} {'stacks':>8} {'iterations':>10}")
+    for predictor_name in predictor_names or _PREDICTORS:
+        for run in range(runs):
+            result = _run_predictor(predictor_name, graph, time_budget, seed + run)
+            best_score = f"{result['best_score']:.4f}" if result["best_score"] is not None else "-"
+            best_found = f"{result['best_found']:.2f}" if result["best_found"] is not None else "-"
+            click.echo(
+                f"{predictor_name:<20} {run:>3} {best_score:>10} {best_found:>9} "
+                f"{result['stacks']:>8} {result['iterations']:>10}"
+            )
+
+
+if __name__ == "__main__":
+    cli()
@@ -19,10 +19,20 @@
 """Mocking responses from the graph database."""
 
 import os
+import random
 import typing
 from collections import deque
 
+import attr
 import yaml
+from thoth.common import RuntimeEnvironment
+from thoth.python import PackageVersion
+from thoth.python import Project
+from thoth.python import Source
+
+from thoth.adviser.state import State
+from thoth.adviser.step import Step
+
 from .base import AdviserTestCase
 
 
@@ -129,3 +139,104 @@ class MockedGraphDatabase:
             result[python_package_id] = package_tuple
 
         return result
+
+
+class SyntheticGraphDatabase:
+    """A synthetic graph database - packages in layers, versions depend on packages in the next layer.
+
+    Each version depends on a window of versions of a dependency, windows of different dependents do not need
+    to overlap which introduces conflicts in the resolution. Scores of package versions are pre-generated.
+    """
+
+    INDEX_URL = "https://pypi.org/simple"
+
+    def __init__(self, layers: int = 4, width: int = 4, versions: int = 6, dependencies: int = 2, seed: int = 1):
+        """Generate the synthetic graph."""
+        self.layers = layers
+        self.width = width
+        self.versions = versions
+        self.scores = {}
+        self._depends_on = {}
+
+        rand = random.Random(seed)
+        window_size = max(2 * versions // 3, 1)
+        for layer in range(layers):
+            for package_name in self.get_layer(layer):
+                for version in self.get_versions(package_name):
+                    self.scores[(package_name, version, self.INDEX_URL)] = rand.uniform(-0.2, 0.2)
+
+                    depends_on = []
+                    if layer + 1 < layers:
+                        next_layer = self.get_layer(layer + 1)
+                        for dependency_name in rand.sample(next_layer, min(dependencies, len(next_layer))):
+                            dependency_versions = self.get_versions(dependency_name)
+                            start = rand.randrange(len(dependency_versions) - window_size + 1)
+                            depends_on.extend(
+                                (dependency_name, v) for v in dependency_versions[start : start + window_size]
+                            )
+
+                    self._depends_on[(package_name, version)] = depends_on
+
+    def get_layer(self, layer: int) -> typing.List[str]:
+        """Get names of packages in the given layer."""
+        return [f"package-{layer}-{idx}" for idx in range(self.width)]
+
+    def get_versions(self, package_name: str) -> typing.List[str]:
+        """Get versions of the given package, the latest first."""
+        return [f"1.0.{idx}" for idx in range(self.versions - 1, -1, -1)]
+
+    def get_depends_on(self, package_name: str, package_version: str, *args, **kwargs) -> typing.Dict:
+        """Get dependencies of the given package."""
+        return {None: self._depends_on[(package_name, package_version)]}
+
+    def get_python_package_version_records(self, *, package_name: str, package_version: str, **kwargs) -> list:
+        """Get records of the given package as solved in the runtime environment."""
+        return [
+            {
+                "package_name": package_name,
+                "package_version": package_version,
+                "index_url": self.INDEX_URL,
+                "os_name": None,
+                "os_version": None,
+                "python_version": None,
+            }
+        ]
+
+    def get_python_package_hashes_sha256(self, *args) -> list:
+        """Get hashes of the given package, no artifact hashes are provided."""
+        return []
+
+    def get_python_environment_marker(self, *args, **kwargs) -> None:
+        """Get environment marker of the given dependency, no markers are used."""
+        return None
+
+    def solve(self, package_versions: list, graceful: bool = True) -> typing.Dict[str, list]:
+        """Resolve all versions of the given direct dependencies, the graph acts as a solver as well."""
+        return {
+            package_version.name: [
+                PackageVersion(
+                    name=package_version.name, version=f"=={version}", index=Source(self.INDEX_URL), develop=False
+                )
+                for version in self.get_versions(package_version.name)
+            ]
+            for package_version in package_versions
+        }
+
+    def get_project(self) -> Project:
+        """Get a project stating all the packages in the first layer as direct dependencies."""
+        return Project.from_strings(
+            "[[source]]\nurl = 'https://pypi.org/simple'\nverify_ssl = true\nname = 'pypi'\n\n[packages]\n"
+            + "".join(f"{package_name} = '*'\n" for package_name in self.get_layer(0)),
+            runtime_environment=RuntimeEnvironment.from_dict({}),
+        )
+
+
+@attr.s(slots=True)
+class SyntheticScoreStep(Step):
+    """Score package versions with scores pre-generated in the synthetic graph database."""
+
+    scores = attr.ib(type=typing.Dict[typing.Tuple[str, str, str], float], kw_only=True)
+
+    def run(self, _: State, package_version: PackageVersion) -> typing.Tuple[float, None]:
+        """Score the given package version."""
+        return self.scores[package_version.to_tuple()], None
@@ -23,6 +23,22 @@ from typing import Any
 
 import tests.units as units
 import thoth.adviser
+import thoth.adviser.boots
+import thoth.adviser.pseudonyms
+import thoth.adviser.sieves
+import thoth.adviser.steps
+import thoth.adviser.strides
+import thoth.adviser.wraps
+
+# Keep references to units implemented in adviser, thoth.adviser attributes are substituted in tests.
+_ADVISER_UNITS = {
+    "boots": thoth.adviser.boots,
+    "pseudonyms": thoth.adviser.pseudonyms,
+    "sieves": thoth.adviser.sieves,
+    "steps": thoth.adviser.steps,
+    "strides": thoth.adviser.strides,
+    "wraps": thoth.adviser.wraps,
+}
 
 
 def use_test_units(func: Any) -> Any:
@@ -46,17 +62,8 @@ def use_test_units(func: Any) -> Any:
         try:
             return func(*args, **kwargs)
         finally:
-            sys.modules["thoth.adviser"].boots = thoth.adviser.boots
-            sys.modules["thoth.adviser.boots"] = thoth.adviser.boots
-            sys.modules["thoth.adviser"].pseudonyms = thoth.adviser.pseudonyms
-            sys.modules["thoth.adviser.pseudonyms"] = thoth.adviser.pseudonyms
-            sys.modules["thoth.adviser"].sieves = thoth.adviser.sieves
-            sys.modules["thoth.adviser.sieves"] = thoth.adviser.sieves
-            sys.modules["thoth.adviser"].steps = thoth.adviser.steps
-            sys.modules["thoth.adviser.steps"] = thoth.adviser.steps
-            sys.modules["thoth.adviser"].strides = thoth.adviser.strides
-            sys.modules["thoth.adviser.strides"] = thoth.adviser.strides
-            sys.modules["thoth.adviser"].wraps = thoth.adviser.wraps
-            sys.modules["thoth.adviser.wraps"] = thoth.adviser.wraps
+            for name, module in _ADVISER_UNITS.items():
+                setattr(sys.modules["thoth.adviser"], name, module)
+                sys.modules[f"thoth.adviser.{name}"] = module
 
     return wrapped
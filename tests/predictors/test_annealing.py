@@ -18,6 +18,7 @@
 """Test implementation of Adaptive Simulated Annealing (ASA)."""
 
 from typing import Callable
+import random
 
 import flexmock
 
@@ -26,6 +27,7 @@ from hypothesis.strategies import integers
 from hypothesis.strategies import floats
 
 from thoth.adviser.beam import Beam
+from thoth.adviser.beam_backends import ArrayBackend
 from thoth.adviser.predictors import AdaptiveSimulatedAnnealing
 from thoth.adviser.state import State
 
@@ -90,6 +92,23 @@ class TestAdaptiveSimulatedAnnealing(AdviserTestCase):
             assert predictor._temperature == context.limit, "Predictor's limit not initialized correctly"
             assert predictor._temperature_history == [], "Predictor's temperature history no discarded"
 
+    def test_exploit(self) -> None:
+        """Test switching to exploitation."""
+        context = flexmock(limit=100)
+
+        predictor = AdaptiveSimulatedAnnealing()
+        with predictor.assigned_context(context):
+            predictor.pre_run()
+            predictor.exploit()
+            assert predictor._temperature == 0.0
+            temperature_context = flexmock(
+                accepted_final_states_count=10,
+                iteration=5,
+                limit=100,
+                beam=flexmock(size=1),
+            )
+            assert predictor._temperature_function(predictor._temperature, temperature_context) == 0.0
+
     @given(
         integers(min_value=1, max_value=256),
         integers(min_value=1, max_value=1024),
@@ -128,3 +147,38 @@ class TestAdaptiveSimulatedAnnealing(AdviserTestCase):
             assert package_tuple is not None
             assert package_tuple[0] in next_state.unresolved_dependencies
             assert package_tuple in next_state.unresolved_dependencies[package_tuple[0]].values()
+
+    def test_run_score_weighted(self) -> None:
+        """Test running the annealing with neighbour states picked based on their score."""
+        beam = Beam(backend="array")
+        state1 = State(score=1.0, unresolved_dependencies={"flask": {0: ("flask", "1.0.0", "https://pypi.org/simple")}})
+        beam.add_state(state1)
+        state2 = State(score=0.0, unresolved_dependencies={"click": {0: ("click", "1.0.0", "https://pypi.org/simple")}})
+        beam.add_state(state2)
+
+        flexmock(ArrayBackend).should_receive("get_random_weighted").and_return(state2).once()
+        flexmock(random).should_receive("random").and_return(0.0).once()
+
+        predictor = AdaptiveSimulatedAnnealing(score_weighted=True)
+        predictor._temperature = 1000.0
+        context = flexmock(accepted_final_states_count=0, iteration=0, limit=1000, beam=beam)
+        with predictor.assigned_context(context):
+            next_state, package_tuple = predictor.run()
+
+        assert next_state is state2
+        assert package_tuple == ("click", "1.0.0", "https://pypi.org/simple")
+
+    def test_run_batch(self) -> None:
+        """Test transitions to a state already present in a batch are dropped."""
+        beam = Beam()
+        state1 = State(score=1.0, unresolved_dependencies={"flask": {0: ("flask", "1.0.0", "https://pypi.org/simple")}})
+        beam.add_state(state1)
+        state2 = State(score=0.0, unresolved_dependencies={"click": {0: ("click", "1.0.0", "https://pypi.org/simple")}})
+        beam.add_state(state2)
+
+        predictor = AdaptiveSimulatedAnnealing()
+        predictor.exploit()
+        context = flexmock(accepted_final_states_count=0, iteration=0, limit=1000, beam=beam)
+        with predictor.assigned_context(context):
+            # The top rated state is picked in each transition during exploitation.
+            assert predictor.run_batch(5) == [(state1, ("flask", "1.0.0", "https://pypi.org/simple"))]
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# thoth-adviser
+# Copyright(C) 2020 Fridolin Pokorny
+#
+# This program is free software: you can redistribute it and / or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Test implementation of a depth-first backtracking search resolving the latest stacks."""
+
+import math
+
+from thoth.adviser.context import Context
+from thoth.adviser.predictors import DepthFirst
+from thoth.adviser.state import State
+
+from ..base import AdviserTestCase
+
+
+class TestDepthFirst(AdviserTestCase):
+    """Test implementation of a depth-first backtracking search resolving the latest stacks."""
+
+    _FLASK_110 = ("flask", "1.1.0", "https://pypi.org/simple")
+    _FLASK_100 = ("flask", "1.0.0", "https://pypi.org/simple")
+    _NUMPY = ("numpy", "1.19.0", "https://pypi.org/simple")
+
+    def _get_initial_state(self) -> State:
+        """Get a state with flask in two versions, the latest first, and numpy to be resolved."""
+        state = State()
+        state.add_unresolved_dependency(self._FLASK_110)
+        state.add_unresolved_dependency(self._FLASK_100)
+        state.add_unresolved_dependency(self._NUMPY)
+        return state
+
+    @staticmethod
+    def _expand(state: State, package_tuple: tuple) -> State:
+        """Expand the given state the way resolver does, the candidate is removed from the parent state."""
+        state.remove_unresolved_dependency(package_tuple)
+        cloned_state = state.clone()
+        cloned_state.remove_unresolved_dependency_subtree(package_tuple[0])
+        cloned_state.add_resolved_dependency(package_tuple)
+        return cloned_state
+
+    def test_run_backtrack(self, context: Context) -> None:
+        """Test descending to states created with the latest versions first and backtracking on dead ends."""
+        state = self._get_initial_state()
+        context.beam.add_state(state)
+
+        predictor = DepthFirst()
+        with predictor.assigned_context(context):
+            predictor.pre_run()
+            assert predictor.run() == (state, self._FLASK_110)
+
+            child = self._expand(state, self._FLASK_110)
+            context.beam.add_state(child)
+            predictor.set_reward_signal(child, self._FLASK_110, 0.0)
+            assert predictor.run() == (child, self._NUMPY)
+
+            # numpy cannot be resolved in the child, resolver removes the child as there is no other candidate.
+            child.remove_unresolved_dependency(self._NUMPY)
+            context.beam.remove(child)
+            predictor.set_reward_signal(child, self._NUMPY, math.nan)
+
+            # Backtrack, the older version of flask is tried.
+            assert predictor.run() == (state, self._FLASK_100)
+
+            # The last candidate resolved, the state is reused.
+            state.remove_unresolved_dependency(self._FLASK_100)
+            state.add_resolved_dependency(self._FLASK_100)
+            predictor.set_reward_signal(state, self._FLASK_100, 0.0)
+            assert predictor._stack == [state]
+            assert predictor.run() == (state, self._NUMPY)
+
+            # A final state does not descend.
+            final_state = self._expand(state, self._NUMPY)
+            predictor.set_reward_signal(final_state, self._NUMPY, math.inf)
+            assert predictor._stack == [state]
+
+        predictor.post_run()
+        assert predictor._stack == []
+
+    def test_run_conflict(self, context: Context) -> None:
+        """Test package versions known to conflict with candidates for their dependencies are not tried again."""
+        state = self._get_initial_state()
+        context.beam.add_state(state)
+        # flask in version 1.1.0 depends on numpy.
+        context.register_package_tuple(
+            self._NUMPY,
+            dependent_tuple=self._FLASK_110,
+            develop=False,
+            os_name=None,
+            os_version=None,
+            python_version=None,
+        )
+
+        predictor = DepthFirst()
+        with predictor.assigned_context(context):
+            predictor.pre_run()
+            assert predictor.run() == (state, self._FLASK_110)
+            predictor.set_reward_signal(state, self._FLASK_110, math.nan)
+            assert len(predictor._conflicts) == 1
+
+            # The same candidates for numpy are present, flask in version 1.1.0 is skipped.
+            other_state = self._get_initial_state()
+            predictor._stack.append(other_state)
+            context.beam.add_state(other_state)
+            assert predictor.run() == (other_state, self._FLASK_100)
+            assert self._FLASK_110 not in other_state.iter_unresolved_dependencies()
+
+            # A different candidate for numpy, flask in version 1.1.0 is tried.
+            other_state = self._get_initial_state()
+            other_state.remove_unresolved_dependency(self._NUMPY)
+            other_state.add_unresolved_dependency(("numpy", "1.18.0", "https://pypi.org/simple"))
+            predictor._stack.append(other_state)
+            context.beam.add_state(other_state)
+            assert predictor.run() == (other_state, self._FLASK_110)
+
+    def test_run_conflict_last_candidate(self, context: Context) -> None:
+        """Test the last candidate is always provided so that resolver can discard the state."""
+        state = State()
+        state.add_unresolved_dependency(self._FLASK_100)
+        context.beam.add_state(state)
+
+        predictor = DepthFirst()
+        with predictor.assigned_context(context):
+            predictor.pre_run()
+            predictor._conflicts.add(predictor._compute_conflict_key(state, self._FLASK_100))
+            assert predictor.run() == (state, self._FLASK_100)
+
+    def test_run_no_memoize(self, context: Context) -> None:
+        """Test turning off memoization of conflicts."""
+        state = self._get_initial_state()
+        context.beam.add_state(state)
+
+        predictor = DepthFirst(memoize=False)
+        with predictor.assigned_context(context):
+            predictor.pre_run()
+            assert predictor.run() == (state, self._FLASK_110)
+            state.remove_unresolved_dependency(self._FLASK_110)
+            predictor.set_reward_signal(state, self._FLASK_110, math.nan)
+
+            assert predictor.run() == (state, self._FLASK_100)
+
+        assert predictor._conflicts == set()
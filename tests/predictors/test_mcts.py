@@ -23,6 +23,7 @@ import flexmock
 import pytest
 
 from thoth.adviser.context import Context
+from thoth.adviser.predictors.policy import Policy
 from thoth.adviser.predictors import MCTS
 from thoth.adviser.predictors import TemporalDifference
 
@@ -89,9 +90,11 @@ class TestMCTS(AdviserTestCase):
             ]
         )
         # numpy was already seen, tensorflow was not seen yet
-        predictor._policy = {
-            ("numpy", "2.0.0", "https://pypi.org/simple"): [2.3, 100],
-        }
+        predictor._policy = Policy.from_dict(
+            {
+                ("numpy", "2.0.0", "https://pypi.org/simple"): [2.3, 100],
+            }
+        )
         predictor._next_state = flexmock()
         predictor.set_reward_signal(state, ("numpy", "2.0.0", "https://pypi.org/simple"), math.inf)
         assert predictor._next_state is None
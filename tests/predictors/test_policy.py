@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# thoth-adviser
+# Copyright(C) 2020 Fridolin Pokorny
+#
+# This program is free software: you can redistribute it and / or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Test policy learnt by reinforcement learning based predictors."""
+
+import os
+
+import flexmock
+
+from thoth.adviser.predictors.policy import Policy
+from thoth.adviser.predictors.policy import PolicyStore
+
+from ..base import AdviserTestCase
+
+
+class TestPolicy(AdviserTestCase):
+    """Test policy learnt by reinforcement learning based predictors."""
+
+    _FLASK = ("flask", "1.1.0", "https://pypi.org/simple")
+    _NUMPY = ("numpy", "1.19.0", "https://pypi.org/simple")
+    _SPACY = ("spacy", "2.2.4", "https://pypi.org/simple")
+
+    def test_add_rewards(self) -> None:
+        """Test accumulating rewards."""
+        policy = Policy()
+        assert policy == {}
+        assert len(policy) == 0
+
+        policy.add_rewards([self._FLASK, self._NUMPY], 1.0)
+        policy.add_reward(self._NUMPY, 2.0)
+
+        assert policy == {self._FLASK: [1.0, 1], self._NUMPY: [3.0, 2]}
+        assert policy.get(self._NUMPY) == [3.0, 2]
+        assert policy.get(self._SPACY) is None
+        assert self._FLASK in policy
+        assert self._SPACY not in policy
+        assert Policy.from_dict(policy.to_dict()) == policy
+
+        policy.clear()
+        assert policy == {}
+
+    def test_get_best(self) -> None:
+        """Test picking the package tuple with the highest average reward."""
+        policy = Policy.from_dict({self._FLASK: [3.0, 2], self._NUMPY: [10.0, 5], self._SPACY: [-1.0, 1]})
+
+        assert policy.get_best([self._SPACY, self._NUMPY, self._FLASK]) == self._NUMPY
+        assert policy.get_best([self._SPACY, self._FLASK]) == self._FLASK
+        assert policy.get_best([("tensorflow", "2.0.0", "https://pypi.org/simple")]) is None
+        assert policy.get_best([]) is None
+
+    def test_decay(self) -> None:
+        """Test decaying rewards accumulated."""
+        policy = Policy.from_dict({self._FLASK: [8.0, 4], self._NUMPY: [1.0, 1]})
+        policy.decay(0.5)
+
+        assert policy == {self._FLASK: [4.0, 2], self._NUMPY: [1.0, 1]}
+
+
+class TestPolicyStore(AdviserTestCase):
+    """Test a local store of learnt policies."""
+
+    _FLASK = ("flask", "1.1.0", "https://pypi.org/simple")
+    _NUMPY = ("numpy", "1.19.0", "https://pypi.org/simple")
+
+    @staticmethod
+    def _get_context(runtime_environment: dict, packages: dict) -> flexmock:
+        """Get a context mock with the given runtime environment and direct dependencies."""
+        return flexmock(
+            project=flexmock(
+                runtime_environment=flexmock(to_dict=lambda: runtime_environment),
+                pipfile=flexmock(packages=flexmock(packages=packages), dev_packages=flexmock(packages={})),
+            )
+        )
+
+    def test_get_key(self) -> None:
+        """Test keying policies by runtime environment and direct dependencies."""
+        key = PolicyStore.get_key(self._get_context({"python_version": "3.8"}, {"flask": None, "numpy": None}))
+        assert key == PolicyStore.get_key(self._get_context({"python_version": "3.8"}, {"numpy": None, "flask": None}))
+        assert key != PolicyStore.get_key(self._get_context({"python_version": "3.6"}, {"flask": None, "numpy": None}))
+        assert key != PolicyStore.get_key(self._get_context({"python_version": "3.8"}, {"flask": None}))
+
+    def test_save_load(self, tmp_path) -> None:
+        """Test persisting a policy and loading it back."""
+        store = PolicyStore(str(tmp_path / "policies"))
+        assert store.load("foo") is None
+
+        policy = Policy.from_dict({self._FLASK: [3.0, 2], self._NUMPY: [-1.0, 1]})
+        store.save("foo", policy)
+        assert os.listdir(store.path) == ["foo.json"]
+        assert store.load("foo") == policy
+        assert store.load("bar") is None
+
+    def test_load_corrupted(self, tmp_path) -> None:
+        """Test a corrupted policy is not used."""
+        store = PolicyStore(str(tmp_path))
+        (tmp_path / "foo.json").write_text("[[")
+        assert store.load("foo") is None
@@ -24,6 +24,7 @@ from hypothesis import given
 from hypothesis.strategies import integers
 
 from thoth.adviser.beam import Beam
+from thoth.adviser.beam_backends import ArrayBackend
 from thoth.adviser.predictors import Sampling
 from thoth.adviser.state import State
 
@@ -56,6 +57,51 @@ class TestSampling(AdviserTestCase):
             assert package_tuple[0] in next_state.unresolved_dependencies
             assert package_tuple in next_state.unresolved_dependencies[package_tuple[0]].values()
 
+    def test_run_batch(self) -> None:
+        """Test sampling a batch of states, batch size is bounded by the beam size."""
+        beam = Beam()
+        for score in range(3):
+            beam.add_state(
+                State(
+                    score=score, unresolved_dependencies={"flask": {0: ("flask", "1.0.0", "https://pypi.org/simple")}}
+                )
+            )
+
+        predictor = Sampling()
+        context = flexmock(accepted_final_states_count=10, beam=beam)
+
+        with predictor.assigned_context(context):
+            batch = predictor.run_batch(2)
+            assert len(batch) == 2
+            assert all(state in beam.iter_states() for state, _ in batch)
+
+            batch = predictor.run_batch(5)
+            assert len(batch) == 3
+            # States are sampled without replacement.
+            assert {id(state) for state, _ in batch} == {id(state) for state in beam.iter_states()}
+
+    def test_run_batch_score_weighted(self) -> None:
+        """Test states drawn repeatedly in score weighted sampling are expanded at most once in a batch."""
+        beam = Beam(backend="array")
+        state1 = State(score=1.0, unresolved_dependencies={"flask": {0: ("flask", "1.0.0", "https://pypi.org/simple")}})
+        beam.add_state(state1)
+        state2 = State(score=0.0, unresolved_dependencies={"click": {0: ("click", "1.0.0", "https://pypi.org/simple")}})
+        beam.add_state(state2)
+
+        flexmock(ArrayBackend).should_receive("get_random_weighted").and_return(state1).and_return(state1).and_return(
+            state2
+        ).times(3)
+
+        predictor = Sampling(score_weighted=True)
+        context = flexmock(accepted_final_states_count=10, beam=beam)
+        with predictor.assigned_context(context):
+            batch = predictor.run_batch(2)
+
+        assert batch == [
+            (state1, ("flask", "1.0.0", "https://pypi.org/simple")),
+            (state2, ("click", "1.0.0", "https://pypi.org/simple")),
+        ]
+
     def test_pre_run(self) -> None:
         """Test pre-run initialization."""
         context = flexmock(limit=99)
@@ -67,3 +113,17 @@ class TestSampling(AdviserTestCase):
         with predictor.assigned_context(context):
             predictor.pre_run()
             assert predictor._history == [], "Predictor's history not discarded"
+
+    def test_run_score_weighted(self) -> None:
+        """Test running the sampling method with score weighted sampling."""
+        beam = Beam(backend="array")
+        state1 = State(score=0.0, unresolved_dependencies={"flask": {0: ("flask", "1.0.0", "https://pypi.org/simple")}})
+        beam.add_state(state1)
+
+        predictor = Sampling(score_weighted=True)
+        context = flexmock(accepted_final_states_count=10, beam=beam)
+
+        with predictor.assigned_context(context):
+            next_state, package_tuple = predictor.run()
+            assert next_state is state1
+            assert package_tuple == ("flask", "1.0.0", "https://pypi.org/simple")
@@ -27,6 +27,8 @@ import flexmock
 import pytest
 
 from thoth.adviser.context import Context
+from thoth.adviser.predictors.policy import Policy
+from thoth.adviser.predictors.policy import PolicyStore
 from thoth.adviser.predictors import TemporalDifference
 from thoth.adviser.predictors import AdaptiveSimulatedAnnealing
 from thoth.adviser.state import State
@@ -89,7 +91,7 @@ class TestTemporalDifference(AdviserTestCase):
         """Test initialization done before running."""
         predictor = TemporalDifference()
 
-        predictor._policy = {("tensorflow", "2.0.0", "https://pypi.org/simple"): [1.0, 2]}
+        predictor._policy = Policy.from_dict({("tensorflow", "2.0.0", "https://pypi.org/simple"): [1.0, 2]})
         predictor._temperature_history = [(0.212, True, 0.23, 100)]
         predictor._temperature = 12.3
 
@@ -102,6 +104,31 @@ class TestTemporalDifference(AdviserTestCase):
         assert isinstance(predictor._temperature, float)
         assert predictor._temperature == float(context.limit)
 
+    def test_pre_run_post_run_policy_store(self, tmp_path) -> None:
+        """Test loading a policy learnt in a previous run and persisting it."""
+        package_tuple = ("tensorflow", "2.0.0", "https://pypi.org/simple")
+        store = PolicyStore(str(tmp_path))
+        store.save("foo", Policy.from_dict({package_tuple: [8.0, 4]}))
+        flexmock(PolicyStore).should_receive("get_key").and_return("foo")
+
+        predictor = TemporalDifference(policy_store=str(tmp_path), policy_decay=0.5)
+        context = flexmock(limit=42)
+        with predictor.assigned_context(context):
+            predictor.pre_run()
+            assert predictor._policy_loaded is True
+            assert predictor._policy == {package_tuple: [4.0, 2]}
+
+            predictor._policy.add_reward(package_tuple, 1.0)
+            predictor.post_run()
+
+        assert store.load("foo") == {package_tuple: [5.0, 3]}
+
+    @pytest.mark.parametrize("policy_decay", [0.0, -0.5, 1.5])
+    def test_policy_decay_invalid(self, policy_decay: float) -> None:
+        """Test rejecting an invalid decay of a persisted policy."""
+        with pytest.raises(ValueError):
+            TemporalDifference(policy_decay=policy_decay)
+
     @pytest.mark.parametrize("float_case", [math.nan, math.inf, -math.inf])
     def test_set_reward_signal_nan_inf(self, float_case: float) -> None:
         """Test (not) keeping the reward signal for nan/inf."""
@@ -110,9 +137,11 @@ class TestTemporalDifference(AdviserTestCase):
         state.add_resolved_dependency(("tensorflow", "2.3.0", "https://pypi.org/simple"))
         state.add_resolved_dependency(("flask", "0.12", "https://pypi.org/simple"))
         state.add_unresolved_dependency(("termial-random", "0.0.2", "https://pypi.org/simple"))
-        predictor._policy = {
-            ("flask", "0.12", "https://pypi.org/simple"): [0.2, 1],
-        }
+        predictor._policy = Policy.from_dict(
+            {
+                ("flask", "0.12", "https://pypi.org/simple"): [0.2, 1],
+            }
+        )
         predictor._steps_taken = 2
         predictor._steps_reward = 1.2
         predictor._next_state = state
@@ -138,9 +167,11 @@ class TestTemporalDifference(AdviserTestCase):
         state.should_receive("iter_resolved_dependencies").and_return([package_tuple]).once()
 
         predictor = TemporalDifference()
-        predictor._policy = {
-            ("numpy", "1.0.0", "https://pypi.org/simple"): [30.30, 92],
-        }
+        predictor._policy = Policy.from_dict(
+            {
+                ("numpy", "1.0.0", "https://pypi.org/simple"): [30.30, 92],
+            }
+        )
 
         predictor._steps_taken = 1
         predictor.set_reward_signal(state, None, reward)
@@ -159,10 +190,12 @@ class TestTemporalDifference(AdviserTestCase):
         state.should_receive("iter_resolved_dependencies").and_return([package_tuple]).once()
 
         predictor = TemporalDifference()
-        predictor._policy = {
-            package_tuple: [16.23, 2010],
-            ("numpy", "1.0.0", "https://pypi.org/simple"): [30.30, 92],
-        }
+        predictor._policy = Policy.from_dict(
+            {
+                package_tuple: [16.23, 2010],
+                ("numpy", "1.0.0", "https://pypi.org/simple"): [30.30, 92],
+            }
+        )
 
         predictor._steps_taken = 1
         predictor.set_reward_signal(state, None, reward)
@@ -175,11 +208,13 @@ class TestTemporalDifference(AdviserTestCase):
     def test_do_exploitation(self) -> None:
         """Tests on exploitation computation."""
         predictor = TemporalDifference()
-        predictor._policy = {
-            ("tensorflow", "2.1.0", "https://thoth-station.ninja"): [2020.21, 666],
-            ("tensorflow", "2.0.0", "https://thoth-station.ninja"): [16.61, 1992],
-            ("numpy", "1.0.0", "https://pypi.org/simple"): [30.30, 92],
-        }
+        predictor._policy = Policy.from_dict(
+            {
+                ("tensorflow", "2.1.0", "https://thoth-station.ninja"): [2020.21, 666],
+                ("tensorflow", "2.0.0", "https://thoth-station.ninja"): [16.61, 1992],
+                ("numpy", "1.0.0", "https://pypi.org/simple"): [30.30, 92],
+            }
+        )
 
         state = flexmock()
         state.should_receive("iter_unresolved_dependencies").and_return(
@@ -296,6 +331,17 @@ class TestTemporalDifference(AdviserTestCase):
             assert predictor.run() == (max_state, unresolved_dependency)
             assert predictor._steps_taken == 1
 
+    def test_run_batch(self, context: Context) -> None:
+        """Test a single expansion is provided, trajectories depend on reward signals."""
+        state = State(score=1.0)
+        package_tuple = ("flask", "1.1.0", "https://pypi.org/simple")
+        predictor = TemporalDifference()
+        flexmock(TemporalDifference)
+        TemporalDifference.should_receive("run").with_args().and_return((state, package_tuple)).once()
+
+        with predictor.assigned_context(context):
+            assert predictor.run_batch(8) == [(state, package_tuple)]
+
     def test_validation(self) -> None:
         """Test validation of configuration supplied for n-step TD-learning."""
         with pytest.raises(ValueError):
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+# thoth-adviser
+# Copyright(C) 2020 Fridolin Pokorny
+#
+# This program is free software: you can redistribute it and / or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Test implementation of Upper Confidence bounds applied to Trees (UCT) based predictor."""
+
+import math
+
+import pytest
+
+from thoth.adviser.context import Context
+from thoth.adviser.predictors import UCT
+from thoth.adviser.state import State
+
+from ..base import AdviserTestCase
+
+
+class TestUCT(AdviserTestCase):
+    """Test implementation of UCT based predictor."""
+
+    _FLASK = ("flask", "1.1.0", "https://pypi.org/simple")
+    _NUMPY = ("numpy", "1.19.0", "https://pypi.org/simple")
+
+    def _expand(self, state: State, package_tuple: tuple) -> State:
+        """Expand the given state the way resolver does."""
+        cloned_state = state.clone()
+        cloned_state.remove_unresolved_dependency_subtree(package_tuple[0])
+        cloned_state.add_resolved_dependency(package_tuple)
+        return cloned_state
+
+    @pytest.mark.parametrize("option", ["exploration", "widening_coefficient", "widening_exponent"])
+    def test_invalid_configuration(self, option: str) -> None:
+        """Test rejecting invalid configuration."""
+        with pytest.raises(ValueError):
+            UCT(**{option: -1.0})
+
+    def test_compute_fingerprint(self) -> None:
+        """Test fingerprints do not depend on order in which dependencies were resolved."""
+        state1 = State()
+        state1.add_resolved_dependency(self._FLASK)
+        state1.add_resolved_dependency(self._NUMPY)
+        state2 = State()
+        state2.add_resolved_dependency(self._NUMPY)
+        state2.add_resolved_dependency(self._FLASK)
+
+        assert UCT._compute_fingerprint(state1) == UCT._compute_fingerprint(state2)
+        assert UCT._compute_fingerprint(state1) != UCT._compute_fingerprint(State())
+
+    def test_run_rollout(self, context: Context) -> None:
+        """Test expanding states in a rollout and propagating reward of a final state back to the root."""
+        state = State()
+        state.add_unresolved_dependency(self._FLASK)
+        state.add_unresolved_dependency(self._NUMPY)
+        context.beam.add_state(state)
+
+        predictor = UCT()
+        with predictor.assigned_context(context):
+            predictor.pre_run()
+
+            selected_state, package_tuple = predictor.run()
+            assert selected_state is state
+            assert predictor.size == 1
+
+            child = self._expand(state, package_tuple)
+            child.score = 0.5
+            context.beam.add_state(child)
+            predictor.set_reward_signal(child, package_tuple, 0.5)
+            assert predictor.size == 2
+
+            # The rollout continues with the newly created state.
+            selected_state, package_tuple = predictor.run()
+            assert selected_state is child
+
+            final_state = self._expand(child, package_tuple)
+            final_state.score = 1.5
+            predictor.set_reward_signal(final_state, package_tuple, math.inf)
+
+        # The final state is not kept, rewards were propagated to the root.
+        assert predictor.size == 2
+        assert list(predictor._visits[:3]) == [1, 1, 1]
+        assert list(predictor._values[:3]) == [1.5, 1.5, 1.5]
+        assert predictor._next_state is None
+
+    def test_set_reward_signal_nan(self, context: Context) -> None:
+        """Test dead ends are treated as the worst outcome observed."""
+        state = State()
+        state.add_unresolved_dependency(self._FLASK)
+        context.beam.add_state(state)
+
+        predictor = UCT()
+        with predictor.assigned_context(context):
+            predictor.pre_run()
+            predictor._value_min = -2.0
+            predictor.run()
+            predictor.set_reward_signal(state, self._FLASK, math.nan)
+
+        assert predictor._next_state is None
+        assert list(predictor._visits) == [1, 1]
+        assert list(predictor._values) == [-2.0, -2.0]
+
+    def test_finalize_state(self, context: Context) -> None:
+        """Test pruning nodes of states garbage collected."""
+        state = State()
+        state.add_unresolved_dependency(self._FLASK)
+        state.add_unresolved_dependency(self._NUMPY)
+        context.beam.add_state(state)
+
+        predictor = UCT()
+        with predictor.assigned_context(context):
+            predictor.pre_run()
+            _, package_tuple = predictor.run()
+            child = self._expand(state, package_tuple)
+            predictor.set_reward_signal(child, package_tuple, 0.0)
+
+        assert predictor.size == 2
+        predictor.finalize_state(id(state))
+        # The node of the initial state is kept as it has a child.
+        assert predictor.size == 2
+        predictor.finalize_state(id(child))
+        assert predictor.size == 0
+        assert predictor._fingerprints == {}
+
+        # Released nodes are reused.
+        with predictor.assigned_context(context):
+            predictor._next_state = None
+            predictor.run()
+        assert predictor.size == 1
+        assert len(predictor._node_fingerprints) == 3
+
+    def test_select_ucb1(self, context: Context) -> None:
+        """Test descending the tree based on UCB1."""
+        predictor = UCT(exploration=0.0)
+        states = []
+        with predictor.assigned_context(context):
+            predictor.pre_run()
+            for package_tuple, visits, value in ((self._FLASK, 2, 1.0), (self._NUMPY, 2, 3.0)):
+                state = State()
+                state.add_resolved_dependency(package_tuple)
+                state.add_unresolved_dependency(("spacy", "2.2.4", "https://pypi.org/simple"))
+                node = predictor._get_node(state)
+                predictor._visits[node] = visits
+                predictor._values[node] = value
+                predictor._backpropagate(node, value)
+                states.append(state)
+
+            assert predictor._select() is states[1]
+            predictor.exploration = 100.0
+            predictor._visits[predictor._get_node(states[0])] = 1
+            assert predictor._select() is states[0]
+
+    def test_exploit(self, context: Context) -> None:
+        """Test no new children are expanded when exploiting."""
+        state = State()
+        state.add_unresolved_dependency(self._FLASK)
+        state.add_unresolved_dependency(self._NUMPY)
+        context.beam.add_state(state)
+
+        predictor = UCT(widening_coefficient=100.0)
+        with predictor.assigned_context(context):
+            predictor.pre_run()
+            _, package_tuple = predictor.run()
+            child = self._expand(state, package_tuple)
+            predictor.set_reward_signal(child, package_tuple, 0.0)
+
+            # Progressive widening allows expanding the initial state again.
+            assert predictor._select() is state
+
+            predictor.exploit()
+            assert predictor._select() is child
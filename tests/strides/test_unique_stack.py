@@ -20,9 +20,11 @@
 from flexmock import flexmock
 import pytest
 
+from thoth.adviser.context import Context
 from thoth.adviser.enums import DecisionType
 from thoth.adviser.enums import RecommendationType
 from thoth.adviser.exceptions import NotAcceptable
+from thoth.adviser.exceptions import PipelineUnitConfigurationSchemaError
 from thoth.adviser.state import State
 from thoth.adviser.strides import UniqueStackStride
 from thoth.adviser.pipeline_builder import PipelineBuilderContext
@@ -76,3 +78,67 @@ class TestUniqueStackStride(AdviserUnitTestCase):
             # A stack with another package should be included.
             state.add_resolved_dependency(("numpy", "1.19.1", "https://pypi.org/simple"))
             assert unit.run(state) is None
+
+    @pytest.mark.parametrize("mode", ["exact", "fingerprint", "bloom"])
+    def test_run_mode(self, context: Context, mode: str) -> None:
+        """Test filtering same stacks regardless of order in which dependencies were resolved."""
+        state1 = State()
+        state1.add_resolved_dependency(("tensorflow", "2.2.0", "https://pypi.org/simple"))
+        state1.add_resolved_dependency(("numpy", "1.19.1", "https://pypi.org/simple"))
+        state2 = State()
+        state2.add_resolved_dependency(("numpy", "1.19.1", "https://pypi.org/simple"))
+        state2.add_resolved_dependency(("tensorflow", "2.2.0", "https://pypi.org/simple"))
+        state3 = State()
+        state3.add_resolved_dependency(("numpy", "1.19.0", "https://pypi.org/simple"))
+        state3.add_resolved_dependency(("tensorflow", "2.2.0", "https://pypi.org/simple"))
+
+        unit = UniqueStackStride()
+        unit.update_configuration({"mode": mode})
+        with unit.assigned_context(context):
+            unit.pre_run()
+            assert unit.run(state1) is None
+
+            with pytest.raises(NotAcceptable):
+                unit.run(state2)
+
+            assert unit.run(state3) is None
+            unit.post_run()
+
+        assert unit._duplicates == 1
+        if mode == "exact":
+            assert len(unit.stacks_seen) == 2
+            assert context.stack_info == []
+        else:
+            assert unit.stacks_seen == set()
+            assert len(context.stack_info) == 1
+            assert "1 stacks discarded as duplicates" in context.stack_info[0]["message"]
+
+    def test_compute_fingerprint(self) -> None:
+        """Test computing fingerprints of the configured size."""
+        state = State()
+        state.add_resolved_dependency(("tensorflow", "2.2.0", "https://pypi.org/simple"))
+        state.add_resolved_dependency(("numpy", "1.19.1", "https://pypi.org/simple"))
+
+        unit = UniqueStackStride()
+        unit.update_configuration({"mode": "fingerprint", "fingerprint_size": 8})
+        assert 0 <= unit._compute_fingerprint(state) < 2 ** 64
+
+        unit.update_configuration({"fingerprint_size": 16})
+        unit._package_tuple_hashes.clear()
+        assert 2 ** 64 <= unit._compute_fingerprint(state) < 2 ** 128
+
+    @pytest.mark.parametrize(
+        "configuration",
+        [
+            {"mode": "foo"},
+            {"fingerprint_size": 4},
+            {"false_positive_rate": 0.0},
+            {"false_positive_rate": 1.0},
+            {"initial_capacity": 0},
+        ],
+    )
+    def test_invalid_configuration(self, configuration) -> None:
+        """Test rejecting invalid configuration."""
+        unit = UniqueStackStride()
+        with pytest.raises(PipelineUnitConfigurationSchemaError):
+            unit.update_configuration(configuration)
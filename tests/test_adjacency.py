@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# thoth-adviser
+# Copyright(C) 2020 Fridolin Pokorny
+#
+# This program is free software: you can redistribute it and / or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Test compact storage of dependencies and dependents."""
+
+import pytest
+
+from thoth.adviser.adjacency import DependencyGraph
+
+from .base import AdviserTestCase
+
+
+class TestDependencyGraph(AdviserTestCase):
+    """Test compact storage of dependencies and dependents."""
+
+    _TENSORFLOW = ("tensorflow", "2.0.0", "https://pypi.org/simple")
+    _NUMPY_1 = ("numpy", "1.18.0", "https://pypi.org/simple")
+    _NUMPY_2 = ("numpy", "1.19.0", "https://pypi.org/simple")
+
+    def test_add(self) -> None:
+        """Test adding dependencies, duplicates are noted only once."""
+        graph = DependencyGraph()
+        graph.add(None, self._TENSORFLOW)
+        graph.add(self._TENSORFLOW, self._NUMPY_1, "fedora", "31", "3.7")
+        graph.add(self._TENSORFLOW, self._NUMPY_1, "fedora", "31", "3.7")
+        graph.add(self._TENSORFLOW, self._NUMPY_1, "rhel", "8", "3.6")
+        graph.add(self._TENSORFLOW, self._NUMPY_2, None, None, None)
+
+        assert set(graph.dependencies) == {"tensorflow"}
+        assert set(graph.dependencies["tensorflow"]) == {self._TENSORFLOW}
+        assert graph.dependencies["tensorflow"][self._TENSORFLOW] == {self._NUMPY_1, self._NUMPY_2}
+
+        assert set(graph.dependents) == {"tensorflow", "numpy"}
+        assert graph.dependents["tensorflow"][self._TENSORFLOW] == set()
+        assert graph.dependents["numpy"][self._NUMPY_1] == {
+            (self._TENSORFLOW, "fedora", "31", "3.7"),
+            (self._TENSORFLOW, "rhel", "8", "3.6"),
+        }
+        assert graph.dependents["numpy"][self._NUMPY_2] == {(self._TENSORFLOW, None, None, None)}
+        assert len(graph.dependents["numpy"]) == 2
+
+    def test_missing(self) -> None:
+        """Test accessing records not noted."""
+        graph = DependencyGraph()
+        graph.add(self._TENSORFLOW, self._NUMPY_1)
+
+        assert "numpy" not in graph.dependencies
+        assert self._NUMPY_2 not in graph.dependents["numpy"]
+        assert self._TENSORFLOW not in graph.dependents["numpy"]
+        assert graph.dependents["numpy"].get(self._NUMPY_2) is None
+        assert graph.dependencies.get("numpy") is None
+
+        with pytest.raises(KeyError):
+            graph.dependencies["numpy"]
+
+        with pytest.raises(KeyError):
+            graph.dependents["numpy"][self._NUMPY_2]
+
+    def test_setitem(self) -> None:
+        """Test replacing records using mapping views."""
+        graph = DependencyGraph()
+        graph.add(self._TENSORFLOW, self._NUMPY_1, "fedora", "31", "3.7")
+
+        graph.dependents["numpy"] = {self._NUMPY_1: {(self._TENSORFLOW, "rhel", "8", "3.6")}}
+        assert graph.dependents["numpy"][self._NUMPY_1] == {(self._TENSORFLOW, "rhel", "8", "3.6")}
+
+        graph.dependencies["tensorflow"] = {self._TENSORFLOW: {self._NUMPY_2}}
+        assert graph.dependencies["tensorflow"][self._TENSORFLOW] == {self._NUMPY_2}
+
+    def test_add_hub(self) -> None:
+        """Test adding many dependents of a single package, duplicates do not accumulate."""
+        graph = DependencyGraph()
+        dependents = [(f"package-{i}", "1.0.0", "https://pypi.org/simple") for i in range(1000)]
+        for _ in range(3):
+            for dependent in dependents:
+                graph.add(dependent, self._NUMPY_1, "rhel", "8", "3.6")
+
+        assert graph.dependents["numpy"][self._NUMPY_1] == {(dependent, "rhel", "8", "3.6") for dependent in dependents}
+        # Duplicates are removed once the number of records doubles.
+        assert len(graph._dependents[graph._tuple_ids[self._NUMPY_1]]) < 2 * len(dependents)
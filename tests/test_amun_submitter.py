@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+# thoth-adviser
+# Copyright(C) 2020 Fridolin Pokorny
+#
+# This program is free software: you can redistribute it and / or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Test concurrent submission of software stacks to Amun API."""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from typing import Any
+from typing import Generator
+from typing import List
+
+import amun
+import flexmock
+import pytest
+
+from thoth.adviser.amun_submitter import AmunSubmitter
+
+from .base import AdviserTestCase
+
+
+class _AmunHandler(BaseHTTPRequestHandler):
+    """A stand-in for Amun API inspection endpoint."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_POST(self) -> None:  # noqa: N802
+        """Accept an inspection request, respond with statuses configured on server first."""
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        server: Any = self.server
+        with server.lock:
+            server.requests.append((self.path, body, self.client_address))
+            status = server.statuses.pop(0) if server.statuses else 202
+
+        time.sleep(server.delay)
+        if status == 202:
+            data = json.dumps({"inspection_id": f"inspection-{body['python']['id']}", "parameters": body}).encode()
+        else:
+            data = json.dumps({"error": "An error"}).encode()
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *_: Any) -> None:
+        """Do not log requests."""
+
+
+@pytest.fixture
+def amun_server() -> Generator[Any, None, None]:
+    """Run a stand-in for Amun API on localhost."""
+    server: Any = ThreadingHTTPServer(("127.0.0.1", 0), _AmunHandler)
+    server.lock = threading.Lock()
+    server.requests = []
+    server.statuses = []
+    server.delay = 0.0
+    server.url = f"http://127.0.0.1:{server.server_address[1]}/api/v1"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+class TestAmunSubmitter(AdviserTestCase):
+    """Test concurrent submission of software stacks to Amun API."""
+
+    @staticmethod
+    def _get_products(count: int) -> List[Any]:
+        """Get products mocked for submission."""
+        products = []
+        for i in range(count):
+            project = flexmock()
+            project.should_receive("to_dict").with_args().and_return({"id": i, "runtime_environment": {"name": "ubi8"}})
+            product = flexmock(project=project)
+            product.should_receive("to_dict").with_args().and_return({"product": i})
+            products.append(product)
+
+        return products
+
+    def test_submit(self, amun_server: Any) -> None:
+        """Test submitting software stacks concurrently, reusing connections."""
+        products = self._get_products(8)
+        with AmunSubmitter(amun_server.url, {"base": "ubi:8"}, concurrency=2) as submitter:
+            for count, product in enumerate(products, start=1):
+                submitter.submit(count, product)
+
+        report = submitter.report.to_dict()
+        assert report["skipped"] == 0
+        assert sorted(report["responses"], key=lambda r: r["product"]["product"]) == [
+            {"response": f"inspection-{i}", "product": {"product": i}} for i in range(8)
+        ]
+
+        assert len(amun_server.requests) == 8
+        for path, body, _ in amun_server.requests:
+            assert path == "/api/v1/inspect"
+            assert body["base"] == "ubi:8"
+            assert "runtime_environment" not in body["python"]
+
+        # Each submitter keeps its connection open.
+        assert len({client_address for _, _, client_address in amun_server.requests}) <= 2
+
+    def test_submit_retry(self, amun_server: Any) -> None:
+        """Test retrying submissions on server errors."""
+        amun_server.statuses = [503, 500]
+        with AmunSubmitter(amun_server.url, {"base": "ubi:8"}, concurrency=1, retries=2, backoff=0.0) as submitter:
+            submitter.submit(1, self._get_products(1)[0])
+
+        assert submitter.report.to_dict() == {
+            "skipped": 0,
+            "responses": [{"response": "inspection-0", "product": {"product": 0}}],
+        }
+        assert len(amun_server.requests) == 3
+
+    def test_submit_retry_exhausted(self, amun_server: Any) -> None:
+        """Test the software stack is skipped once retries are exhausted."""
+        amun_server.statuses = [503, 503]
+        with AmunSubmitter(amun_server.url, {"base": "ubi:8"}, concurrency=1, retries=1, backoff=0.0) as submitter:
+            submitter.submit(1, self._get_products(1)[0])
+
+        assert submitter.report.to_dict() == {"skipped": 1, "responses": []}
+        assert len(amun_server.requests) == 2
+
+    def test_submit_rejected(self, amun_server: Any) -> None:
+        """Test requests rejected by Amun API are not retried."""
+        amun_server.statuses = [400]
+        products = self._get_products(2)
+        with AmunSubmitter(amun_server.url, {"base": "ubi:8"}, concurrency=1, retries=3, backoff=0.0) as submitter:
+            for count, product in enumerate(products, start=1):
+                submitter.submit(count, product)
+
+        assert submitter.report.to_dict() == {
+            "skipped": 1,
+            "responses": [{"response": "inspection-1", "product": {"product": 1}}],
+        }
+        assert len(amun_server.requests) == 2
+
+    def test_back_pressure(self, amun_server: Any) -> None:
+        """Test submitting blocks once the queue is full."""
+        amun_server.delay = 0.2
+        products = self._get_products(3)
+        with AmunSubmitter(amun_server.url, {"base": "ubi:8"}, concurrency=1, queue_size=1) as submitter:
+            start = time.monotonic()
+            for count, product in enumerate(products, start=1):
+                submitter.submit(count, product)
+
+            # The first software stack is being submitted, the second one is queued, the third one has to wait.
+            assert time.monotonic() - start >= 0.15
+
+        assert len(submitter.report.to_dict()["responses"]) == 3
+
+    @pytest.mark.parametrize(
+        "attribute,value", [("concurrency", 0), ("queue_size", 0), ("retries", -1), ("backoff", -0.5)]
+    )
+    def test_invalid_configuration(self, attribute: str, value: Any) -> None:
+        """Test rejecting invalid configuration."""
+        with pytest.raises(ValueError):
+            AmunSubmitter("http://amun-api", {}, **{attribute: value})
+
+    def test_client_error(self) -> None:
+        """Test producers are not blocked if submitters fail to instantiate Amun API client."""
+        flexmock(amun).should_receive("instantiate_inspection_api").and_raise(ValueError("Invalid URL"))
+
+        submitter = AmunSubmitter("http://amun-api", {}, concurrency=1, queue_size=1)
+        submitter.start()
+        with pytest.raises(ValueError, match="Invalid URL"):
+            for count, product in enumerate(self._get_products(5), start=1):
+                submitter.submit(count, product)
+
+        with pytest.raises(ValueError, match="Invalid URL"):
+            submitter.close()
+
+        assert submitter.report.to_dict()["responses"] == []
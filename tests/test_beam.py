@@ -227,6 +227,20 @@ class TestBeam(AdviserTestCase):
         assert state02 in beam.iter_states()
         assert beam.get_last() is state02
 
+    @pytest.mark.parametrize("backend", ["fext", "indexed_heap", "array"])
+    def test_contains(self, backend: str) -> None:
+        """Test checking a state is kept in beam."""
+        beam = Beam(width=1, backend=backend)
+
+        state1 = State(score=0.0)
+        beam.add_state(state1)
+        assert beam.contains(state1)
+
+        state2 = State(score=1.0)
+        beam.add_state(state2)
+        assert not beam.contains(state1)
+        assert beam.contains(state2)
+
     def test_remove(self) -> None:
         """Test removal of a state from beam."""
         beam = Beam(width=2)
@@ -270,3 +284,55 @@ class TestBeam(AdviserTestCase):
 
         assert beam.size == 0
         assert state3 not in beam.iter_states()
+
+    def test_iter_top(self) -> None:
+        """Test iterating over top rated states."""
+        beam = Beam()
+
+        states = [State(score=float(score)) for score in (1, 3, 0, 2)]
+        for state in states:
+            beam.add_state(state)
+
+        assert list(beam.iter_top(2)) == [states[1], states[3]]
+        assert list(beam.iter_top(10)) == list(beam.iter_states_sorted())
+        assert list(beam.iter_top(0)) == []
+
+    @pytest.mark.parametrize("backend", ["fext", "indexed_heap", "array", "spill"])
+    def test_shrink(self, backend: str) -> None:
+        """Test shrinking beam, width configured stays."""
+        beam = Beam(width=3, backend=backend)
+
+        states = [State(score=float(score)) for score in (1, 3, 0, 2)]
+        for state in states:
+            beam.add_state(state)
+
+        assert beam.get_last() is states[3]
+        beam.shrink(2)
+        assert beam.width == 3
+        assert list(beam.iter_states_sorted()) == [states[1], states[3]]
+        # The last state added is kept, rollouts of predictors continue with it.
+        assert beam.get_last() is states[3]
+
+        beam.add_state(State(score=-1.0))
+        assert beam.size == 3
+        beam.add_state(State(score=-2.0))
+        assert beam.size == 3
+
+        with pytest.raises(ValueError):
+            beam.shrink(0)
+
+    @pytest.mark.parametrize("backend", ["fext", "indexed_heap", "array", "spill"])
+    def test_expanding(self, backend: str) -> None:
+        """Test noting a state is being expanded."""
+        beam = Beam(backend=backend)
+        state = State(score=0.0)
+        beam.add_state(state)
+
+        with beam.expanding(state):
+            if backend == "spill":
+                assert beam._heap._pinned is state
+
+            assert beam.contains(state)
+
+        if backend == "spill":
+            assert beam._heap._pinned is None
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+# thoth-adviser
+# Copyright(C) 2020 Fridolin Pokorny
+#
+# This program is free software: you can redistribute it and / or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Test storage backends used by beam."""
+
+import gc
+import random
+from collections import Counter
+from typing import List
+from typing import Tuple
+
+import pytest
+
+from hypothesis import given
+from hypothesis.strategies import lists
+from hypothesis.strategies import integers
+from hypothesis.strategies import tuples
+from hypothesis.strategies import booleans
+
+from thoth.adviser.beam import Beam
+from thoth.adviser.beam_backends import ArrayBackend
+from thoth.adviser.beam_backends import BeamBackend
+from thoth.adviser.beam_backends import IndexedHeapBackend
+from thoth.adviser.beam_backends import SpillBackend
+from thoth.adviser.state import State
+
+from .base import AdviserTestCase
+
+
+class TestBeamBackends(AdviserTestCase):
+    """Test storage backends used by beam."""
+
+    @pytest.mark.parametrize("backend", ["indexed_heap", "array"])
+    def test_beam(self, backend: str) -> None:
+        """Test beam operations on top of the given backend."""
+        beam = Beam(width=2, backend=backend)
+        assert beam.backend == backend
+
+        state1 = State(score=1.0)
+        state2 = State(score=2.0)
+        state3 = State(score=3.0)
+        state0 = State(score=0.0)
+
+        beam.add_state(state1)
+        assert beam.get_last() is state1
+        beam.add_state(state2)
+        beam.add_state(state3)
+        assert beam.get_last() is state3
+        beam.add_state(state0)
+        assert beam.get_last() is None
+
+        assert set(map(id, beam.iter_states())) == {id(state2), id(state3)}
+        assert list(beam.iter_states_sorted()) == [state3, state2]
+        assert beam.max() is state3
+
+        # A state discarded based on beam width is not present in beam anymore.
+        beam.remove(state1)
+        assert beam.size == 2
+        with pytest.raises(ValueError):
+            beam._heap.remove(state1)
+
+        beam.remove(state3)
+        assert beam.max() is state2
+        assert beam.get_last() is None
+        assert beam.size == 1
+
+        beam.wipe()
+        assert beam.size == 0
+
+    def test_unknown_backend(self) -> None:
+        """Test an unknown backend is reported."""
+        with pytest.raises(ValueError):
+            Beam(backend="foo")
+
+    @given(
+        lists(tuples(integers(min_value=-5, max_value=5), booleans()), max_size=64),
+        integers(min_value=1, max_value=8),
+    )
+    def test_consistency(self, operations: List[Tuple[int, bool]], size: int) -> None:
+        """Test backends keep the same items as a naive implementation."""
+        for backend in (IndexedHeapBackend(size), ArrayBackend(size)):
+            kept = []
+            for score, remove in operations:
+                if remove and kept:
+                    item = kept.pop(len(kept) // 2)
+                    backend.remove(item)
+                else:
+                    item = State(score=float(score))
+                    backend.push(item.score, item)
+                    kept.append(item)
+                    if len(kept) > size:
+                        # One of the lowest rated states is discarded.
+                        kept.remove(min(kept, key=lambda s: s.score))
+                        assert sorted(s.score for s in backend.items()) == sorted(s.score for s in kept)
+                        kept = backend.items()
+
+                assert len(backend) == len(kept)
+                assert set(map(id, backend.items())) == set(map(id, kept))
+                if kept:
+                    assert backend.get_max().score == max(s.score for s in kept)
+                    assert backend.get_top().score == min(s.score for s in kept)
+
+            scores = sorted((s.score for s in kept), reverse=True)
+            backend.shrink(size // 2 + 1)
+            assert sorted((s.score for s in backend.items()), reverse=True) == scores[: size // 2 + 1]
+            # Size configured stays.
+            assert backend.size == size
+
+    def test_array_get_random_weighted(self) -> None:
+        """Test score weighted sampling prefers higher rated states."""
+        backend = ArrayBackend()
+        states = [State(score=float(score)) for score in range(3)]
+        for state in states:
+            backend.push(state.score, state)
+
+        backend.remove(states[0])
+        with pytest.raises(ValueError):
+            backend.remove(states[0])
+
+        random_state = random.getstate()
+        random.seed(42)
+        try:
+            counter = Counter(id(backend.get_random_weighted()) for _ in range(1000))
+        finally:
+            random.setstate(random_state)
+
+        assert set(counter) == {id(states[1]), id(states[2])}
+        assert counter[id(states[2])] > counter[id(states[1])]
+
+    def test_array_get_random_weighted_grow(self) -> None:
+        """Test score weighted sampling stays consistent when the internal buffers grow."""
+        backend = ArrayBackend()
+        states = [State(score=0.0) for _ in range(100)]
+        for state in states:
+            backend.push(state.score, state)
+
+        for state in states[:-1]:
+            backend.remove(state)
+
+        assert backend.get_random_weighted(lambda: 0.99) is states[-1]
+        assert backend.get_random_weighted(lambda: 0.0) is states[-1]
+
+    def test_array_get_random_weighted_rebase(self) -> None:
+        """Test weights are re-based as scores move so that sums of weights do not overflow."""
+        backend = ArrayBackend()
+        states = [State(score=score * 100.0) for score in range(20)]
+        for state in states:
+            backend.push(state.score, state)
+
+        assert backend._reference == states[-1].score
+        assert 0.0 < backend._total_weight() < float("inf")
+        assert backend.get_random_weighted(lambda: 0.99) is states[-1]
+
+        for state in states[2:]:
+            backend.remove(state)
+
+        assert backend.get_random_weighted(lambda: 0.5) is states[1]
+        assert backend._reference == states[1].score
+
+    def test_abstract_backend(self) -> None:
+        """Test backends have to implement the whole interface."""
+        with pytest.raises(TypeError):
+            BeamBackend()
+
+    def test_spill(self) -> None:
+        """Test spilling states to disk and bringing them back."""
+        backend = SpillBackend(memory_size=2)
+        states = [State(score=float(score), iteration=score) for score in (3, 1, 4, 0, 2)]
+        for state in states:
+            backend.push(state.score, state)
+
+        assert len(backend) == 5
+        assert backend.spilled_count == 2
+        # The last state added is kept in memory on top of the memory size.
+        assert set(map(id, backend.items())) == {id(states[0]), id(states[2]), id(states[4])}
+        assert backend.get_max() is states[2]
+        assert backend.get_last() is states[4]
+        assert all(backend.contains(state) for state in states)
+
+        backend.remove(states[2])
+        backend.remove(states[0])
+        backend.remove(states[4])
+        assert len(backend) == 2
+        assert backend.get_last() is None
+        # The spilled state is still referenced, the very same object is brought back.
+        assert backend.get_max() is states[1]
+        assert backend.loaded_count == 1
+
+        backend.clear()
+        assert len(backend) == 0
+        assert not backend.contains(states[1])
+
+    def test_spill_remove_spilled(self) -> None:
+        """Test removing a state spilled to disk."""
+        backend = SpillBackend(memory_size=2)
+        states = [State(score=score) for score in (0.1, 0.5, 0.9)]
+        for state in states:
+            backend.push(state.score, state)
+
+        assert backend.spilled_count == 1
+        assert not backend._memory.contains(states[0])
+        assert backend.contains(states[0])
+
+        backend.remove(states[0])
+        assert len(backend) == 2
+        assert not backend.contains(states[0])
+        assert backend._get_connection().execute("SELECT COUNT(*) FROM states").fetchone()[0] == 0
+
+        with pytest.raises(ValueError):
+            backend.remove(states[0])
+
+    def test_spill_load_new(self) -> None:
+        """Test states not referenced anymore are loaded as new objects."""
+        backend = SpillBackend(memory_size=1)
+        for score in (1, 0, 2):
+            backend.push(float(score), State(score=float(score), iteration=score))
+
+        gc.collect()
+        assert len(backend) == 3
+        assert backend.spilled_count == 2
+        assert backend._spilled == {}
+
+        state = backend.get_max()
+        backend.remove(state)
+        assert backend.get_max().iteration == 1
+        assert backend.loaded_count == 1
+
+    def test_spill_pin(self) -> None:
+        """Test the last state added and the pinned state are never spilled."""
+        backend = SpillBackend(memory_size=1)
+        expanded = State(score=0.0)
+        backend.push(expanded.score, expanded)
+        backend.pin(expanded)
+
+        state = State(score=-1.0)
+        backend.push(state.score, state)
+        assert backend._memory.contains(expanded)
+        assert backend._memory.contains(state)
+        assert backend.get_last() is state
+
+        backend.push(1.0, State(score=1.0))
+        assert backend._memory.contains(expanded)
+        assert not backend._memory.contains(state)
+        assert backend.contains(state)
+
+        backend.pin(None)
+        backend.push(2.0, State(score=2.0))
+        assert not backend._memory.contains(expanded)
+        assert backend.contains(expanded)
+
+    def test_spill_size(self) -> None:
+        """Test spilling states respects the size configured."""
+        beam = Beam(width=3, backend="spill")
+        beam._heap.memory_size = 1
+
+        states = [State(score=float(score)) for score in (3, 1, 4, 0, 2)]
+        for state in states:
+            beam.add_state(state)
+
+        assert beam.size == 3
+        assert beam.max() is states[2]
+
+        scores = []
+        while beam.size > 0:
+            state = beam.max()
+            scores.append(state.score)
+            beam.remove(state)
+
+        assert scores == [4.0, 3.0, 2.0]
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# thoth-adviser
+# Copyright(C) 2020 Fridolin Pokorny
+#
+# This program is free software: you can redistribute it and / or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Test Bloom filters used for approximate membership queries."""
+
+import random
+
+import pytest
+
+from thoth.adviser.bloom_filter import BloomFilter
+from thoth.adviser.bloom_filter import ScalableBloomFilter
+
+from .base import AdviserTestCase
+
+
+class TestBloomFilter(AdviserTestCase):
+    """Test Bloom filters used for approximate membership queries."""
+
+    def test_add(self) -> None:
+        """Test adding items to a Bloom filter."""
+        bloom_filter = BloomFilter(100, 0.01)
+        assert 42 not in bloom_filter
+        assert bloom_filter.add(42) is False
+        assert 42 in bloom_filter
+        assert bloom_filter.add(42) is True
+        assert bloom_filter.size == 1
+        assert bloom_filter.memory > 0
+
+    @pytest.mark.parametrize("capacity,false_positive_rate", [(0, 0.1), (10, 0.0), (10, 1.0), (10, 1)])
+    def test_invalid(self, capacity: int, false_positive_rate: float) -> None:
+        """Test rejecting invalid Bloom filter configuration."""
+        with pytest.raises(ValueError):
+            BloomFilter(capacity, false_positive_rate)
+
+    def test_false_positive_rate(self) -> None:
+        """Test there are no false negatives and false positive rate is bounded."""
+        rand = random.Random(42)
+        items = [rand.getrandbits(128) for _ in range(2000)]
+        bloom_filter = BloomFilter(len(items), 0.01)
+        for item in items:
+            bloom_filter.add(item)
+
+        assert all(item in bloom_filter for item in items)
+        false_positives = sum(rand.getrandbits(128) in bloom_filter for _ in range(10000))
+        assert false_positives / 10000 < 0.02
+        assert 0.005 < bloom_filter.estimated_false_positive_rate < 0.02
+
+
+class TestScalableBloomFilter(AdviserTestCase):
+    """Test scalable Bloom filter."""
+
+    def test_scale(self) -> None:
+        """Test new filters are created once capacity is reached, compound false positive rate stays bounded."""
+        rand = random.Random(42)
+        items = [rand.getrandbits(128) for _ in range(1000)]
+        bloom_filter = ScalableBloomFilter(100, 0.01)
+        assert bloom_filter.filter_count == 1
+
+        for item in items:
+            bloom_filter.add(item)
+
+        # Capacities 100, 200, 400, 800.
+        assert bloom_filter.filter_count == 4
+        assert all(item in bloom_filter for item in items)
+        assert bloom_filter.size <= len(items)
+        assert bloom_filter.estimated_false_positive_rate < 0.01
+
+        false_positives = sum(rand.getrandbits(128) in bloom_filter for _ in range(10000))
+        assert false_positives / 10000 < 0.01
+
+        bloom_filter.clear()
+        assert bloom_filter.filter_count == 1
+        assert bloom_filter.size == 0
+        assert items[0] not in bloom_filter
@@ -94,6 +94,40 @@ class TestContext(AdviserTestCase):
         assert context.register_accepted_final_state(state4) is None
         assert context.get_top_accepted_final_state() is state3
 
+    def test_get_top_accepted_final_state_count(self, context: Context) -> None:
+        """Test retrieval of top accepted final state when states are removed from the accepted ones."""
+        context.count = 1
+
+        state1 = State(score=1.0)
+        context.register_accepted_final_state(state1)
+        assert context.get_top_accepted_final_state() is state1
+
+        # The first one registered is preferred on the same score.
+        state2 = State(score=1.0)
+        context.register_accepted_final_state(state2)
+        assert context.get_top_accepted_final_state() is state1
+
+        state3 = State(score=0.0)
+        context.register_accepted_final_state(state3)
+        assert context.get_top_accepted_final_state() is state1
+        assert list(context.iter_accepted_final_states()) == [state1]
+
+        state4 = State(score=2.0)
+        context.register_accepted_final_state(state4)
+        assert context.get_top_accepted_final_state() is state4
+        assert list(context.iter_accepted_final_states()) == [state4]
+
+    def test_iter_top_accepted_final_states(self, context: Context) -> None:
+        """Test iterating over top accepted final states."""
+        context.count = 10
+
+        states = [State(score=float(score)) for score in (1, 3, 0, 3)]
+        for state in states:
+            context.register_accepted_final_state(state)
+
+        assert list(context.iter_top_accepted_final_states(2)) == [states[1], states[3]]
+        assert list(context.iter_top_accepted_final_states(10)) == list(context.iter_accepted_final_states_sorted())
+
     def test_register_accepted_final_state(self, context: Context) -> None:
         """Test registering accepted final state and final state manipulation."""
         context.count = 2
@@ -152,10 +186,16 @@ class TestContext(AdviserTestCase):
             context.register_package_tuple(
                 package_tuple, develop=True, extras=extras, os_name="rhel", os_version="8.1", python_version="3.6"
             )
-            is not None
+            is None
         )
 
+        # Package version is instantiated lazily.
+        assert package_tuple not in context.package_versions
+        assert context.is_package_tuple_registered(package_tuple)
+
         package_version = context.get_package_version(package_tuple)
+        assert package_tuple in context.package_versions
+        assert context.get_package_version(package_tuple) is package_version
 
         assert package_version.name == "selinon"
         assert package_version.version == "==1.0.0"
@@ -172,17 +212,36 @@ class TestContext(AdviserTestCase):
 
         extras = ["postgresql"]
 
-        package_version_registered = context.register_package_tuple(
-            package_tuple, develop=True, extras=extras, os_name="fedora", os_version="31", python_version="3.7"
+        context.register_package_tuple(
+            package_tuple, develop=False, extras=extras, os_name="fedora", os_version="31", python_version="3.7"
+        )
+        context.register_package_tuple(
+            package_tuple, develop=True, extras=None, os_name="fedora", os_version="31", python_version="3.7"
         )
 
-        assert package_version_registered is not None
+        package_version_registered = context.get_package_version(package_tuple)
+        assert package_version_registered.develop is True
+        assert package_version_registered.extras == extras
 
-        package_version_another = context.register_package_tuple(
-            package_tuple, develop=True, extras=extras, os_name="fedora", os_version="31", python_version="3.7"
+        context.register_package_tuple(
+            package_tuple, develop=False, extras=extras, os_name="fedora", os_version="31", python_version="3.7"
         )
 
+        package_version_another = context.get_package_version(package_tuple)
         assert package_version_registered is package_version_another, "Different instances returned"
+        assert package_version_another.develop is True
+
+    def test_register_package_version_lazy(self, context: Context, package_version: PackageVersion) -> None:
+        """Test registering a package version which was already registered as a package tuple."""
+        package_tuple = package_version.to_tuple()
+        context.register_package_tuple(package_tuple, develop=True, os_name=None, os_version=None, python_version=None)
+        assert context.package_tuples_count == 1
+        assert package_tuple not in context.package_versions
+
+        assert context.register_package_version(package_version) is True
+        assert context.get_package_version(package_tuple) is package_version
+        assert package_version.develop is True
+        assert context.package_tuples_count == 1
 
     def test_note_dependencies(self, context: Context) -> None:
         """Test noting dependencies to the context."""
@@ -234,6 +293,81 @@ class TestContext(AdviserTestCase):
         assert package_tuple in context.dependents[package_tuple[0]]
         assert context.dependents[package_tuple[0]][package_tuple] == set()
 
+    def test_get_package_version_rank(self, context: Context) -> None:
+        """Test ranks of package versions are maintained as new package tuples are registered."""
+        with pytest.raises(NotFound):
+            context.get_package_version_rank(("flask", "1.0.0", "https://pypi.org/simple"))
+
+        context.register_package_version(
+            PackageVersion(
+                name="flask",
+                version="==1.0.0",
+                index=Source("https://pypi.org/simple"),
+                develop=False,
+            )
+        )
+
+        for package_tuple in (
+            ("flask", "0.12.0", "https://pypi.org/simple"),
+            ("flask", "1.1.0", "https://pypi.org/simple"),
+            ("flask", "1.0.0", "https://thoth-station.ninja/simple"),
+            ("flask", "1.0", "https://pypi.org/simple"),
+            ("flask", "0.9", "https://pypi.org/simple"),
+        ):
+            context.register_package_tuple(
+                package_tuple, develop=False, os_name=None, os_version=None, python_version=None
+            )
+
+        assert context.get_package_version_rank(("flask", "0.9", "https://pypi.org/simple")) == 0
+        assert context.get_package_version_rank(("flask", "0.12.0", "https://pypi.org/simple")) == 1
+        assert context.get_package_version_rank(("flask", "1.0.0", "https://pypi.org/simple")) == 2
+        assert context.get_package_version_rank(("flask", "1.0.0", "https://thoth-station.ninja/simple")) == 2
+        assert context.get_package_version_rank(("flask", "1.0", "https://pypi.org/simple")) == 2
+        assert context.get_package_version_rank(("flask", "1.1.0", "https://pypi.org/simple")) == 3
+
+        package_tuples = [
+            ("flask", "1.0", "https://pypi.org/simple"),
+            ("flask", "0.9", "https://pypi.org/simple"),
+            ("flask", "1.1.0", "https://pypi.org/simple"),
+            ("flask", "0.12.0", "https://pypi.org/simple"),
+        ]
+        assert sorted(package_tuples, key=context.get_package_version_rank, reverse=True) == sorted(
+            package_tuples, key=lambda t: context.get_package_version(t).semantic_version, reverse=True
+        )
+
+    def test_get_package_version_rank_deferred(self, context: Context) -> None:
+        """Test ranks are computed on the first query, a new version registered invalidates them."""
+        for version in ("1.0.0", "2.0.0"):
+            context.register_package_tuple(
+                ("flask", version, "https://pypi.org/simple"),
+                develop=False,
+                os_name=None,
+                os_version=None,
+                python_version=None,
+            )
+
+        # Versions are not parsed on registration.
+        assert context._versions_seen["flask"] == {"1.0.0": None, "2.0.0": None}
+        assert "flask" not in context._version_ranks
+
+        assert context.get_package_version_rank(("flask", "2.0.0", "https://pypi.org/simple")) == 1
+        assert context.get_package_version_rank(("flask", "1.0.0", "https://pypi.org/simple")) == 0
+
+        context.register_package_tuple(
+            ("flask", "0.9", "https://pypi.org/simple"),
+            develop=False,
+            os_name=None,
+            os_version=None,
+            python_version=None,
+        )
+        assert "flask" not in context._version_ranks
+        assert context._versions_seen["flask"]["0.9"] is None
+        assert context.get_package_version_rank(("flask", "2.0.0", "https://pypi.org/simple")) == 2
+        assert context.get_package_version_rank(("flask", "0.9", "https://pypi.org/simple")) == 0
+
+        with pytest.raises(NotFound):
+            context.get_package_version_rank(("flask", "3.0.0", "https://pypi.org/simple"))
+
     def test_is_dependency_monkey(self) -> None:
         """Test checking if the given context is an adviser context."""
         context = Context(
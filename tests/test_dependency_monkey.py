@@ -27,6 +27,8 @@ import json
 
 import flexmock
 import amun
+from amun.swagger_client import InspectionSpecification
+import pytest
 
 from thoth.adviser.enums import DecisionType
 from thoth.adviser.product import Product
@@ -34,6 +36,7 @@ from thoth.adviser.pipeline_config import PipelineConfig
 from thoth.adviser.resolver import Resolver
 from thoth.adviser.dependency_monkey import DependencyMonkey
 from thoth.adviser.dm_report import DependencyMonkeyReport
+from thoth.adviser.stack_archive import StackArchiveReader
 
 from .base import AdviserTestCase
 
@@ -47,7 +50,12 @@ class TestDependencyMonkey(AdviserTestCase):
     ) -> DependencyMonkey:
         """Get instantiated dependency monkey ready to be tested."""
         flexmock(Resolver)
-        (Resolver.should_receive("resolve_products").with_args(with_devel=with_devel).and_return(products).once())
+        (
+            Resolver.should_receive("resolve_products")
+            .with_args(with_devel=with_devel, offset=0)
+            .and_return(products)
+            .once()
+        )
 
         flexmock(PipelineConfig)
         (PipelineConfig.should_receive("call_post_run_report").and_return(None).once())
@@ -90,6 +98,152 @@ class TestDependencyMonkey(AdviserTestCase):
         # This test actually just makes sure we have predictor property available :)
         assert dependency_monkey.predictor is resolver.predictor
 
+    def test_offset(self) -> None:
+        """Test skipping stacks resolved first when resuming a previous run."""
+        project = flexmock()
+        project.should_receive("to_files").with_args("/tmp/3/Pipfile", "/tmp/3/Pipfile.lock").once()
+        product = flexmock(
+            project=project,
+            score=random.random(),
+            justification=[],
+            advised_runtime_environment=flexmock(),
+        )
+        product.should_receive("to_dict").with_args().and_return({}).once()
+
+        flexmock(Resolver)
+        Resolver.should_receive("resolve_products").with_args(with_devel=False, offset=2).and_return([product]).once()
+        flexmock(PipelineConfig)
+        PipelineConfig.should_receive("call_post_run_report").and_return(None).once()
+
+        resolver = Resolver(pipeline=PipelineConfig(), project=None, library_usage=None, graph=None, predictor=None)
+        resolver.count = 5
+        dependency_monkey = DependencyMonkey(resolver=resolver, stack_output="/tmp", offset=2)
+        report = dependency_monkey.resolve(with_devel=False)
+
+        assert resolver.limit == 7
+        assert report.to_dict() == {"skipped": 0, "responses": [{"response": "/tmp/3", "product": {}}]}
+
+    def test_offset_responses_output(self, tmp_path) -> None:
+        """Test responses of a resumed run are appended to responses of the previous run."""
+        project = flexmock()
+        project.should_receive("to_files").with_args("/tmp/3/Pipfile", "/tmp/3/Pipfile.lock").once()
+        product = flexmock(
+            project=project,
+            score=random.random(),
+            justification=[],
+            advised_runtime_environment=flexmock(),
+        )
+        product.should_receive("to_dict").with_args().and_return({"score": 2.0}).once()
+
+        flexmock(Resolver)
+        Resolver.should_receive("resolve_products").with_args(with_devel=False, offset=2).and_return([product]).once()
+        flexmock(PipelineConfig)
+        PipelineConfig.should_receive("call_post_run_report").and_return(None).once()
+
+        responses_output = tmp_path / "responses.jsonl"
+        previous_responses = [
+            {"response": "/tmp/1", "product": {"score": 0.0}},
+            {"response": "/tmp/2", "product": {"score": 1.0}},
+        ]
+        responses_output.write_text("".join(json.dumps(record) + "\n" for record in previous_responses))
+
+        resolver = Resolver(pipeline=PipelineConfig(), project=None, library_usage=None, graph=None, predictor=None)
+        resolver.count = 5
+        dependency_monkey = DependencyMonkey(
+            resolver=resolver, stack_output="/tmp", offset=2, responses_output=str(responses_output)
+        )
+        report = dependency_monkey.resolve(with_devel=False)
+
+        assert report.to_dict() == {
+            "skipped": 0,
+            "responses_output": str(responses_output),
+            "responses_count": 3,
+            "score": {"count": 3, "min": 0.0, "max": 2.0, "mean": 1.0},
+        }
+        assert list(report.iter_responses()) == [
+            *previous_responses,
+            {"response": "/tmp/3", "product": {"score": 2.0}},
+        ]
+        report.close()
+
+    def test_offset_invalid(self) -> None:
+        """Test rejecting a negative offset."""
+        with pytest.raises(ValueError):
+            DependencyMonkey(resolver=flexmock(), offset=-1)
+
+    def test_workers_stdout_invalid(self) -> None:
+        """Test stacks cannot be printed to standard output by multiple workers."""
+        with pytest.raises(ValueError):
+            DependencyMonkey(resolver=flexmock(), stack_output="-", workers=2)
+
+        with pytest.raises(ValueError):
+            DependencyMonkey(resolver=flexmock(), stack_output="/tmp", workers=0)
+
+        DependencyMonkey(resolver=flexmock(), stack_output="-", workers=2, dry_run=True)
+
+    def test_workers_offset_invalid(self) -> None:
+        """Test resuming a previous run is not supported with multiple workers."""
+        with pytest.raises(ValueError):
+            DependencyMonkey(resolver=flexmock(), stack_output="/tmp", workers=2, offset=10)
+
+    def test_resolve_sharded_shortfall(self, tmp_path, caplog) -> None:
+        """Test logging workers that resolved fewer stacks than requested."""
+
+        def resolve_products(stack_output, *, with_devel):
+            # The first worker runs out of stacks in its shard.
+            dependency_monkey._stack_count = 1 if resolver.shard_index == 0 else resolver.count
+            return DependencyMonkeyReport()
+
+        flexmock(DependencyMonkey)
+        DependencyMonkey.should_receive("_resolve_products").replace_with(resolve_products)
+        flexmock(PipelineConfig)
+        PipelineConfig.should_receive("call_post_run_report").and_return(None).once()
+
+        resolver = Resolver(pipeline=PipelineConfig(), project=None, library_usage=None, graph=None, predictor=None)
+        resolver.count = 6
+        dependency_monkey = DependencyMonkey(resolver=resolver, stack_output=str(tmp_path), workers=2)
+        dependency_monkey.resolve(with_devel=False)
+
+        assert "Worker 0 resolved 1 stacks out of 3 requested" in caplog.text
+        assert "Worker 1 resolved" not in caplog.text
+        assert "Resolved 4 stacks out of 6 requested" in caplog.text
+
+    def test_resolve_sharded(self, tmp_path) -> None:
+        """Test resolving shards in worker processes and merging their reports."""
+
+        def resolve_products(stack_output, *, with_devel):
+            # Run in a worker process with the resolver configured for the shard.
+            assert resolver.shard_count == 3
+            assert with_devel is False
+            if resolver.shard_index == 2:
+                raise ValueError("A worker failure")
+
+            return DependencyMonkeyReport(
+                skipped=1,
+                responses=[{"response": stack_output, "product": {"count": resolver.count}}],
+            )
+
+        flexmock(DependencyMonkey)
+        DependencyMonkey.should_receive("_resolve_products").replace_with(resolve_products)
+        flexmock(PipelineConfig)
+        PipelineConfig.should_receive("call_post_run_report").and_return(None).once()
+
+        resolver = Resolver(pipeline=PipelineConfig(), project=None, library_usage=None, graph=None, predictor=None)
+        resolver.count = 5
+        dependency_monkey = DependencyMonkey(resolver=resolver, stack_output=str(tmp_path), workers=3)
+        report = dependency_monkey.resolve(with_devel=False)
+
+        assert report.to_dict() == {
+            "skipped": 2,
+            "responses": [
+                {"response": str(tmp_path / "shard-0"), "product": {"count": 2}},
+                {"response": str(tmp_path / "shard-1"), "product": {"count": 2}},
+            ],
+        }
+        # The parent process is not affected by workers.
+        assert resolver.count == 5
+        assert resolver.shard_count == 1
+
     def test_amun_output(self) -> None:
         """Test Amun API stack submissions."""
         project = flexmock()
@@ -107,9 +261,13 @@ class TestDependencyMonkey(AdviserTestCase):
 
         amun_api = "http://amun-api"
         amun_context = {"base": "ubi:8"}
-        flexmock(amun).should_receive("inspect").with_args(
-            amun_api, base=amun_context["base"], python=generated_project_dict
-        ).and_return({"inspection_id": "inspection-deadbeef"}).once()
+        response = flexmock()
+        response.should_receive("to_dict").with_args().and_return({"inspection_id": "inspection-deadbeef"}).once()
+        api = flexmock()
+        api.should_receive("post_inspection").with_args(
+            InspectionSpecification(base=amun_context["base"], python=generated_project_dict)
+        ).and_return(response).once()
+        flexmock(amun).should_receive("instantiate_inspection_api").with_args(amun_api).and_return(api)
 
         dependency_monkey = self._get_test_dm(
             stack_output=amun_api,
@@ -148,6 +306,32 @@ class TestDependencyMonkey(AdviserTestCase):
             "responses": [{"response": "/tmp/1", "product": product_dict}],
         }
 
+    def test_archive_output(self, tmp_path) -> None:
+        """Test appending output to an indexed archive."""
+        project = flexmock()
+        project.should_receive("to_dict").with_args().and_return({"bar": 1}).once()
+
+        product = flexmock(
+            project=project,
+            score=random.random(),
+            justification=[{"justification": "some justification"}],
+            advised_runtime_environment=flexmock(),
+        )
+        product_dict = {"baz": 2}
+        product.should_receive("to_dict").with_args().and_return(product_dict).once()
+
+        stack_output = str(tmp_path / "stacks.jsonl")
+        dependency_monkey = self._get_test_dm(stack_output=stack_output, with_devel=False, products=[product])
+        report: DependencyMonkeyReport = dependency_monkey.resolve(with_devel=False)
+
+        assert report.to_dict() == {
+            "skipped": 0,
+            "responses": [{"response": f"{stack_output}#1", "product": product_dict}],
+        }
+        with StackArchiveReader(stack_output) as reader:
+            assert list(reader) == [1]
+            assert reader.get(1) == {"bar": 1}
+
     def test_stdout_output(self) -> None:
         """Test writing output to standard output."""
         project = flexmock()
@@ -169,3 +353,63 @@ class TestDependencyMonkey(AdviserTestCase):
 
         # When stdout is used, products are not carried in the final report.
         assert report.to_dict() == {"skipped": 0, "responses": []}
+
+    def test_responses_output(self, tmp_path) -> None:
+        """Test streaming responses to a file."""
+        project = flexmock()
+        project.should_receive("to_files").with_args("/tmp/1/Pipfile", "/tmp/1/Pipfile.lock").once()
+        product = flexmock(
+            project=project,
+            score=random.random(),
+            justification=[],
+            advised_runtime_environment=flexmock(),
+        )
+        product.should_receive("to_dict").with_args().and_return({"score": 1.0}).once()
+
+        responses_output = str(tmp_path / "responses.jsonl")
+        dependency_monkey = self._get_test_dm(stack_output="/tmp", with_devel=False, products=[product])
+        dependency_monkey.responses_output = responses_output
+        report: DependencyMonkeyReport = dependency_monkey.resolve(with_devel=False)
+
+        assert report.to_dict() == {
+            "skipped": 0,
+            "responses_output": responses_output,
+            "responses_count": 1,
+            "score": {"count": 1, "min": 1.0, "max": 1.0, "mean": 1.0},
+        }
+        with open(responses_output) as responses_file:
+            assert [json.loads(line) for line in responses_file] == [{"response": "/tmp/1", "product": {"score": 1.0}}]
+
+    def test_resolve_sharded_responses_output(self, tmp_path) -> None:
+        """Test merging responses streamed by worker processes."""
+
+        def resolve_products(stack_output, *, with_devel):
+            # Run in a worker process, responses are streamed to a file of the worker.
+            assert dependency_monkey.responses_output != responses_output
+            report = dependency_monkey._get_report()
+            report.add_response(stack_output, flexmock(to_dict=lambda: {"score": float(resolver.shard_index)}))
+            return report
+
+        flexmock(DependencyMonkey)
+        DependencyMonkey.should_receive("_resolve_products").replace_with(resolve_products)
+        flexmock(PipelineConfig)
+        PipelineConfig.should_receive("call_post_run_report").and_return(None).once()
+
+        resolver = Resolver(pipeline=PipelineConfig(), project=None, library_usage=None, graph=None, predictor=None)
+        resolver.count = 2
+        responses_output = str(tmp_path / "responses.jsonl")
+        dependency_monkey = DependencyMonkey(
+            resolver=resolver, stack_output=str(tmp_path), workers=2, responses_output=responses_output
+        )
+        report = dependency_monkey.resolve(with_devel=False)
+
+        assert report.to_dict() == {
+            "skipped": 0,
+            "responses_output": responses_output,
+            "responses_count": 2,
+            "score": {"count": 2, "min": 0.0, "max": 1.0, "mean": 0.5},
+        }
+        assert list(report.iter_responses()) == [
+            {"response": str(tmp_path / "shard-0"), "product": {"score": 0.0}},
+            {"response": str(tmp_path / "shard-1"), "product": {"score": 1.0}},
+        ]
@@ -17,6 +17,8 @@
 
 """Test adviser's context passed to pipeline units."""
 
+import json
+
 import flexmock
 
 from .base import AdviserTestCase
@@ -73,3 +75,107 @@ class TestDependencyMonkeyReport(AdviserTestCase):
         assert report.to_dict()["responses"][-2]["product"] is product_dict1
         assert report.to_dict()["responses"][-1]["response"] == response2
         assert report.to_dict()["responses"][-1]["product"] is product_dict2
+
+    def test_merge(self) -> None:
+        """Test merging reports of Dependency Monkey workers."""
+        report = DependencyMonkeyReport(skipped=1, responses=[{"response": "foo", "product": {"foo": 1}}])
+        other = DependencyMonkeyReport.from_dict(
+            {"skipped": 2, "responses": [{"response": "bar", "product": {"bar": 1}}]}
+        )
+
+        report.merge(other)
+        assert report.to_dict() == {
+            "skipped": 3,
+            "responses": [
+                {"response": "foo", "product": {"foo": 1}},
+                {"response": "bar", "product": {"bar": 1}},
+            ],
+        }
+
+    def test_streaming(self, tmp_path) -> None:
+        """Test streaming responses to a file, keeping only summary statistics in memory."""
+        responses_output = str(tmp_path / "responses.jsonl")
+        report = DependencyMonkeyReport(responses_output=responses_output)
+
+        for i, score in enumerate((0.5, 1.5, 1.0)):
+            product = flexmock()
+            product.should_receive("to_dict").with_args().and_return({"score": score}).once()
+            report.add_response(f"response-{i}", product)
+
+        report.skipped += 1
+        assert report._responses == []
+        assert report.to_dict() == {
+            "skipped": 1,
+            "responses_output": responses_output,
+            "responses_count": 3,
+            "score": {"count": 3, "min": 0.5, "max": 1.5, "mean": 1.0},
+        }
+        assert list(report.iter_responses()) == [
+            {"response": "response-0", "product": {"score": 0.5}},
+            {"response": "response-1", "product": {"score": 1.5}},
+            {"response": "response-2", "product": {"score": 1.0}},
+        ]
+
+        report.close()
+        with open(responses_output) as responses_file:
+            assert len(responses_file.readlines()) == 3
+
+    def test_streaming_empty(self, tmp_path) -> None:
+        """Test a streamed report without responses references an existing file."""
+        responses_output = tmp_path / "responses.jsonl"
+        responses_output.write_text("stale\n")
+
+        report = DependencyMonkeyReport(responses_output=str(responses_output))
+        assert report.to_dict() == {
+            "skipped": 0,
+            "responses_output": str(responses_output),
+            "responses_count": 0,
+            "score": {"count": 0, "min": None, "max": None, "mean": None},
+        }
+        assert responses_output.read_text() == ""
+
+    def test_streaming_append(self, tmp_path) -> None:
+        """Test responses already present in the responses output are kept and accounted when appending."""
+        responses_output = tmp_path / "responses.jsonl"
+        responses_output.write_text(json.dumps({"response": "foo", "product": {"score": 1.0}}) + "\n")
+
+        report = DependencyMonkeyReport(responses_output=str(responses_output), append=True)
+        assert [record["response"] for record in report.iter_responses()] == ["foo"]
+
+        report.add_response("bar", flexmock(to_dict=lambda: {"score": 3.0}))
+        assert report.to_dict() == {
+            "skipped": 0,
+            "responses_output": str(responses_output),
+            "responses_count": 2,
+            "score": {"count": 2, "min": 1.0, "max": 3.0, "mean": 2.0},
+        }
+        report.close()
+        assert [json.loads(line)["response"] for line in responses_output.read_text().splitlines()] == ["foo", "bar"]
+
+    def test_streaming_append_empty(self, tmp_path) -> None:
+        """Test appending creates the responses output if it does not exist yet."""
+        responses_output = tmp_path / "responses.jsonl"
+
+        report = DependencyMonkeyReport(responses_output=str(responses_output), append=True)
+        assert report.to_dict()["responses_count"] == 0
+        report.close()
+        assert responses_output.read_text() == ""
+
+    def test_streaming_merge(self, tmp_path) -> None:
+        """Test merging streamed reports of Dependency Monkey workers."""
+        report = DependencyMonkeyReport(responses_output=str(tmp_path / "responses.jsonl"))
+        report.add_response("foo", flexmock(to_dict=lambda: {"score": 2.0}))
+
+        worker_report = DependencyMonkeyReport(skipped=2, responses_output=str(tmp_path / "shard-0.jsonl"))
+        worker_report.add_response("bar", flexmock(to_dict=lambda: {"score": 4.0}))
+        other = DependencyMonkeyReport.from_dict(worker_report.to_dict())
+        worker_report.close()
+
+        report.merge(other)
+        assert report.to_dict() == {
+            "skipped": 2,
+            "responses_output": str(tmp_path / "responses.jsonl"),
+            "responses_count": 2,
+            "score": {"count": 2, "min": 2.0, "max": 4.0, "mean": 3.0},
+        }
+        assert [record["response"] for record in report.iter_responses()] == ["foo", "bar"]
@@ -227,28 +227,24 @@ class TestPipelineBuilder(AdviserTestCase):
     ) -> None:
         """Test building configuration."""
         # All test units do not register themselves - let's cherry-pick ones that should be present.
-        # There are done 3 iterations in total during pipeline configuration creation.
+        # Units are evaluated once and re-evaluated each time they are included.
         flexmock(units.boots.Boot1).should_receive("should_include").and_return({"some_parameter": 1.0}).and_return(
             None
-        ).and_return(None).times(3)
-        flexmock(units.pseudonyms.Pseudonym2).should_receive("should_include").and_return({}).and_return(
-            None
-        ).and_return(None).times(3)
+        ).times(2)
+        flexmock(units.pseudonyms.Pseudonym2).should_receive("should_include").and_return({}).and_return(None).times(2)
         flexmock(units.sieves.Sieve2).should_receive("should_include").and_return({"foo": "bar"}).and_return(
             None
-        ).and_return(None).times(3)
-        flexmock(units.steps.Step1).should_receive("should_include").and_return({}).and_return(None).and_return(
-            None
-        ).times(3)
-        flexmock(units.strides.Stride2).should_receive("should_include").and_return({}).and_return(None).and_return(
-            None
-        ).times(3)
+        ).times(2)
+        flexmock(units.steps.Step1).should_receive("should_include").and_return({}).and_return(None).times(2)
+        flexmock(units.strides.Stride2).should_receive("should_include").and_return({}).and_return(None).times(2)
+        # Stride1 is included once Wrap2 is included.
+        flexmock(units.strides.Stride1, SHOULD_INCLUDE_TRIGGERS=frozenset({"Wrap2"}))
         flexmock(units.strides.Stride1).should_receive("should_include").and_return(None).and_return(
             {"linus": "torvalds"}
         ).and_return(None).times(3)
-        flexmock(units.wraps.Wrap2).should_receive("should_include").and_return({}).and_return(None).and_return(
-            None
-        ).times(3)
+        flexmock(units.wraps.Wrap2).should_receive("should_include").and_return({}).and_return(None).times(2)
+        # Units not triggered by any other unit are evaluated only once.
+        flexmock(units.wraps.Wrap1).should_receive("should_include").and_return(None).once()
 
         # It is not relevant if adviser/dependency monkey is called in this case.
         pipeline = getattr(PipelineBuilder, pipeline_config_method)(
@@ -292,6 +288,21 @@ class TestPipelineBuilder(AdviserTestCase):
             "wraps": [{"name": "Wrap2", "configuration": {"package_name": "hexsticker"}, "unit_run": False}],
         }
 
+    @use_test_units
+    def test_build_configuration_triggers_any(self) -> None:
+        """Test re-evaluating a unit on any unit included if the unit does not state its triggers."""
+        flexmock(units.boots.Boot1).should_receive("should_include").and_return({}).and_return({}).and_return(
+            None
+        ).times(3)
+        # Evaluated in the first round and once Boot1 is included for the second time.
+        flexmock(units.wraps.Wrap1, SHOULD_INCLUDE_TRIGGERS=None)
+        flexmock(units.wraps.Wrap1).should_receive("should_include").and_return(None).times(2)
+
+        pipeline = PipelineBuilder.get_dependency_monkey_pipeline_config(
+            decision_type=DecisionType.RANDOM, graph=None, project=None, library_usage=None
+        )
+        assert [unit.__class__ for unit in pipeline.iter_units()] == [units.boots.Boot1, units.boots.Boot1]
+
     @use_test_units
     def test_blocked_units(self, project: Project) -> None:
         """Test preventing a pipeline unit from being added to pipeline configuration."""
@@ -330,6 +341,68 @@ class TestPipelineBuilder(AdviserTestCase):
         finally:
             os.environ.pop("THOTH_ADVISER_BLOCKED_UNITS")
 
+    @use_test_units
+    def test_build_configuration_cache(self, project: Project, tmp_path: Path) -> None:
+        """Test pipeline configuration is built once and loaded from the pipeline cache afterwards."""
+        flexmock(units.boots.Boot1).should_receive("should_include").and_return({"some_parameter": 1.0}).and_return(
+            None
+        ).times(2)
+        flexmock(units.steps.Step1).should_receive("should_include").and_return({}).and_return(None).times(2)
+
+        assert "THOTH_ADVISER_PIPELINE_CACHE_DIR" not in os.environ
+        try:
+            os.environ["THOTH_ADVISER_PIPELINE_CACHE_DIR"] = str(tmp_path)
+            pipelines = [
+                PipelineBuilder.get_adviser_pipeline_config(
+                    recommendation_type=RecommendationType.LATEST,
+                    graph=None,
+                    project=project,
+                    library_usage=None,
+                )
+                for _ in range(2)
+            ]
+        finally:
+            os.environ.pop("THOTH_ADVISER_PIPELINE_CACHE_DIR")
+
+        assert pipelines[0] is not pipelines[1]
+        assert pipelines[0].to_dict() == pipelines[1].to_dict()
+        assert [unit.__class__ for unit in pipelines[1].iter_units()] == [units.boots.Boot1, units.steps.Step1]
+        assert len(list(tmp_path.iterdir())) == 1
+
+    def test_get_cache_key(self, project: Project) -> None:
+        """Test computing key of a pipeline configuration in the pipeline cache."""
+        ctx = PipelineBuilderContext(project=project, recommendation_type=RecommendationType.LATEST)
+        key = PipelineBuilder._get_cache_key(ctx, set())
+
+        assert key == PipelineBuilder._get_cache_key(
+            PipelineBuilderContext(project=project, recommendation_type=RecommendationType.LATEST), set()
+        )
+        assert key != PipelineBuilder._get_cache_key(ctx, {"CvePenalizationStep"})
+        assert key != PipelineBuilder._get_cache_key(
+            PipelineBuilderContext(project=project, recommendation_type=RecommendationType.STABLE), set()
+        )
+        assert key != PipelineBuilder._get_cache_key(
+            PipelineBuilderContext(project=project, decision_type=DecisionType.ALL), set()
+        )
+        assert key != PipelineBuilder._get_cache_key(
+            PipelineBuilderContext(
+                project=project,
+                library_usage={"report": {"tensorflow": ["tensorflow.keras"]}},
+                recommendation_type=RecommendationType.LATEST,
+            ),
+            set(),
+        )
+
+        # Moving a package between default and development packages changes the key.
+        package_name = next(iter(project.pipfile.packages.packages))
+        package_version = project.pipfile.packages.packages.pop(package_name)
+        project.pipfile.dev_packages.packages[package_name] = package_version
+        moved_key = PipelineBuilder._get_cache_key(ctx, set())
+        assert key != moved_key
+
+        project.runtime_environment.python_version = "3.9"
+        assert moved_key != PipelineBuilder._get_cache_key(ctx, set())
+
     @use_test_units
     def test_from_dict(self) -> None:
         """Test instantiation of a pipeline from a dictionary."""
@@ -115,3 +115,32 @@ class TestPipelineConfig(AdviserTestCase):
             flexmock(unit).should_receive("post_run_report").with_args(report=report).and_return(None).once()
 
         pipeline_config.call_post_run_report(report)
+
+    def test_dispatch_tables(self) -> None:
+        """Test looking up pipeline units run for packages using precompiled dispatch tables."""
+        sieve1, sieve2, step1, stride1, stride2, stride3, wrap1 = (flexmock() for _ in range(7))
+        pipeline_config = PipelineConfig(
+            sieves={"tensorflow": [sieve1], None: [sieve2]},
+            steps={"flask": [step1], "numpy": []},
+            strides={None: [stride1], "flask": [stride2], "tensorflow": [stride3]},
+            wraps={None: [wrap1]},
+        )
+
+        assert pipeline_config.get_sieves("tensorflow") == (sieve1, sieve2)
+        assert pipeline_config.get_sieves("flask") == (sieve2,)
+        assert pipeline_config.get_steps("flask") == (step1,)
+        assert pipeline_config.get_steps("numpy") == ()
+        assert pipeline_config.get_steps("tensorflow") == ()
+        assert pipeline_config.get_strides({"tensorflow": None, "numpy": None, "flask": None}) == (
+            stride3,
+            stride2,
+            stride1,
+        )
+        assert pipeline_config.get_strides(["numpy"]) == (stride1,)
+        assert pipeline_config.get_wraps(["tensorflow"]) == (wrap1,)
+
+        # Dispatch tables are compiled on first use, compile them again on changes.
+        pipeline_config.sieves_dict["tensorflow"].append(sieve2)
+        assert pipeline_config.get_sieves("tensorflow") == (sieve1, sieve2)
+        pipeline_config.compile()
+        assert pipeline_config.get_sieves("tensorflow") == (sieve1, sieve2, sieve2)
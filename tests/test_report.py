@@ -108,6 +108,7 @@ class TestReport(AdviserTestCase):
         assert report.product_count() == 2
         assert set(report.iter_products()) == {product3, product4}
         assert list(report.iter_products_sorted()) == [product3, product4]
+        assert list(report.iter_top_products(1)) == [product3]
         assert list(report.iter_products_sorted(reverse=True)) == [product3, product4]
         assert list(report.iter_products_sorted(reverse=False)) == [product4, product3]
 
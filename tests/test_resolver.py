@@ -32,9 +32,14 @@ from typing import Dict
 import random
 
 from thoth.adviser.beam import Beam
+from thoth.adviser.beam_backends import BEAM_BACKENDS
+from thoth.adviser.context import Context
 from thoth.adviser.resolver import Resolver
+from thoth.adviser.resolver import _state_finalizer
 from thoth.adviser.state import State
 from thoth.adviser.predictor import Predictor
+from thoth.adviser.predictors import MCTS
+from thoth.adviser.predictors import TemporalDifference
 from thoth.adviser.product import Product
 from thoth.adviser.pipeline_config import PipelineConfig
 from thoth.adviser.pipeline_builder import PipelineBuilder
@@ -71,6 +76,8 @@ import tests.units.strides as strides
 import tests.units.wraps as wraps
 
 from .base import AdviserTestCase
+from .graph_mock import SyntheticGraphDatabase
+from .graph_mock import SyntheticScoreStep
 
 
 @pytest.fixture
@@ -680,6 +687,69 @@ class TestResolver(AdviserTestCase):
         )
         assert list(state.iter_resolved_dependencies()) == []
 
+    def test_prepare_initial_state_shard(
+        self,
+        resolver: Resolver,
+        tf_package_versions: List[PackageVersion],
+        numpy_package_versions: List[PackageVersion],
+    ) -> None:
+        """Test partitioning versions of the direct dependency with the most versions into shards."""
+        assert len(numpy_package_versions) > len(tf_package_versions)
+        resolver.shard_count = 2
+        resolver.shard_index = 1
+        # Versions as returned by sieves are partitioned.
+        shard_package_versions = numpy_package_versions[1::2]
+        resolver.should_receive("_resolve_direct_dependencies").with_args(with_devel=True).and_return(
+            {"numpy": list(numpy_package_versions), "tensorflow": tf_package_versions}
+        ).once()
+        resolver.should_receive("_run_sieves").with_args(object).and_yield(*numpy_package_versions).ordered()
+        resolver.should_receive("_run_sieves").with_args(object).and_yield(*tf_package_versions).ordered()
+
+        resolver._init_context()
+        resolver._prepare_initial_state(with_devel=True)
+
+        state = resolver.beam.max()
+        assert set(state.iter_unresolved_dependencies()) == (
+            {pv.to_tuple() for pv in shard_package_versions} | {pv.to_tuple() for pv in tf_package_versions}
+        )
+
+    def test_prepare_initial_state_shard_empty(
+        self, resolver: Resolver, numpy_package_versions: List[PackageVersion]
+    ) -> None:
+        """Test no stack can be produced if no versions are assigned to the shard."""
+        resolver.shard_count = len(numpy_package_versions) + 1
+        resolver.shard_index = len(numpy_package_versions)
+        resolver.should_receive("_resolve_direct_dependencies").with_args(with_devel=True).and_return(
+            {"numpy": numpy_package_versions}
+        ).once()
+        resolver.should_receive("_run_sieves").with_args(object).and_yield(*numpy_package_versions).once()
+
+        resolver._init_context()
+        with pytest.raises(CannotProduceStack, match="shard"):
+            resolver._prepare_initial_state(with_devel=True)
+
+    @pytest.mark.parametrize("shard_count,shard_index", [(0, 0), (2, 2), (2, -1)])
+    def test_shard_validator(
+        self,
+        pipeline_config: PipelineConfig,
+        project: Project,
+        predictor_mock: Predictor,
+        shard_count: int,
+        shard_index: int,
+    ) -> None:
+        """Test validating configuration of shards."""
+        with pytest.raises(ValueError):
+            Resolver(
+                pipeline=pipeline_config,
+                project=project,
+                library_usage={},
+                graph=GraphDatabase(),
+                predictor=predictor_mock,
+                recommendation_type=RecommendationType.LATEST,
+                shard_count=shard_count,
+                shard_index=shard_index,
+            )
+
     def test_expand_state_not_found_one_unresolved(self, resolver: Resolver, state: State) -> None:
         """Test expanding a state (with one unresolved dependency) when a package was not found."""
         assert len(list(state.iter_unresolved_dependencies())) == 1
@@ -1354,6 +1424,7 @@ class TestResolver(AdviserTestCase):
             state=state,
             package_version=package_version,
             dependencies=[(pv.name, pv.locked_version) for pv in dep_package_versions],
+            records=None,
         ).and_return(None).once()
 
         assert resolver._expand_state(state, to_expand_package_tuple) is None
@@ -1533,13 +1604,14 @@ class TestResolver(AdviserTestCase):
 
         resolver.project.runtime_environment.should_receive("is_fully_specified").and_return(True).once()
 
-        package_version = resolver.context.register_package_tuple(
+        resolver.context.register_package_tuple(
             package_tuple,
             develop=False,
             os_name=None,
             os_version=None,
             python_version=None,
         )
+        package_version = resolver.context.get_package_version(package_tuple)
 
         step = steps.Step1()
         step.should_receive("run").with_args(state, package_version).and_return((0.1, [])).once()
@@ -1606,6 +1678,174 @@ class TestResolver(AdviserTestCase):
         assert resolver.context.discarded_final_states_count == 0
         assert resolver.beam.size == 0
 
+    def test_check_memory_usage(self, resolver: Resolver) -> None:
+        """Test shrinking beam and switching predictor to exploitation on memory pressure."""
+        import thoth.adviser.resolver as resolver_module
+
+        resolver.memory_soft_limit = 100
+        resolver.memory_hard_limit = 200
+        resolver._init_context()
+        for score in range(8):
+            resolver.beam.add_state(State(score=float(score)))
+
+        flexmock(resolver_module)
+
+        # Below the soft limit.
+        resolver_module.should_receive("get_memory_usage").and_return(99).once()
+        resolver.predictor.should_receive("exploit").never()
+        resolver._check_memory_usage()
+        assert resolver.beam.size == 8
+
+        # Above the soft limit, beam is shrunk, width configured stays.
+        width = resolver.beam.width
+        resolver_module.should_receive("get_memory_usage").and_return(150).once()
+        resolver._check_memory_usage()
+        assert resolver.beam.size == 4
+        assert resolver.beam.width == width
+        assert resolver.beam.max().score == 7.0
+
+        # Memory did not grow enough, freed memory is reused.
+        resolver_module.should_receive("get_memory_usage").and_return(160).once()
+        resolver._check_memory_usage()
+        assert resolver.beam.size == 4
+
+        # Memory grew, beam is shrunk again.
+        resolver_module.should_receive("get_memory_usage").and_return(170).once()
+        resolver._check_memory_usage()
+        assert resolver.beam.size == 2
+
+        # Above the hard limit, predictor is asked to exploit.
+        resolver_module.should_receive("get_memory_usage").and_return(250).once()
+        resolver.predictor.should_receive("exploit").with_args().and_return(None).once()
+        resolver._check_memory_usage()
+        assert resolver.beam.size == 1
+        assert resolver.beam.width == width
+        assert resolver.beam.max().score == 7.0
+
+        # Beam is refilled up to the width configured.
+        for score in range(8):
+            resolver.beam.add_state(State(score=float(score)))
+
+        assert resolver.beam.size == 9
+
+    def test_get_expansion_batch(self, resolver: Resolver) -> None:
+        """Test expansions are obtained in batches, invalidated expansions are skipped."""
+        flask = ("flask", "1.1.0", "https://pypi.org/simple")
+        numpy = ("numpy", "1.19.0", "https://pypi.org/simple")
+
+        resolver.batch_size = 4
+        resolver._init_context()
+        state1 = State(score=1.0)
+        state1.add_unresolved_dependency(flask)
+        state1.add_unresolved_dependency(numpy)
+        state2 = State(score=0.5)
+        state2.add_unresolved_dependency(flask)
+        state3 = State(score=0.2)
+        state3.add_unresolved_dependency(numpy)
+        for state in (state1, state2, state3):
+            resolver.beam.add_state(state)
+
+        resolver.predictor.should_receive("run_batch").with_args(4).and_return(
+            [(state1, flask), (state1, numpy), (state2, flask), (state3, numpy)]
+        ).once()
+        resolver.should_receive("_prefetch_dependencies").with_args([flask, numpy, flask, numpy]).once()
+
+        assert resolver._get_expansion() == (state1, flask)
+        # The dependency is no longer unresolved in state2, state3 is removed from beam.
+        state2.remove_unresolved_dependency(flask)
+        resolver.beam.remove(state3)
+
+        # The state was already expanded in the batch, others are not valid anymore.
+        resolver.predictor.should_receive("run_batch").with_args(4).and_return([(state1, numpy)]).once()
+        resolver.should_receive("_prefetch_dependencies").with_args([numpy]).once()
+        assert resolver._get_expansion() == (state1, numpy)
+        assert not resolver._batch
+
+        resolver._reset_batch()
+        assert not resolver._batch_expanded
+
+    def test_get_expansion_no_batch(self, resolver: Resolver) -> None:
+        """Test predictor is asked for a single expansion if no batching is configured."""
+        state = State()
+        package_tuple = ("flask", "1.1.0", "https://pypi.org/simple")
+        resolver.predictor.should_receive("run").with_args().and_return((state, package_tuple)).once()
+        resolver.predictor.should_receive("run_batch").never()
+
+        assert resolver.batch_size == 1
+        assert resolver._get_expansion() == (state, package_tuple)
+
+    def test_expand_state_prefetched(self, resolver: Resolver, state: State) -> None:
+        """Test expanding a state with dependencies queried concurrently."""
+        to_expand_package_tuple = ("tensorflow", "2.0.0", "https://pypi.org/simple")
+        dependency_tuple = ("absl-py", "0.8.1", "https://pypi.org/simple")
+        record = {
+            "package_name": dependency_tuple[0],
+            "package_version": dependency_tuple[1],
+            "index_url": dependency_tuple[2],
+            "os_name": "fedora",
+            "os_version": "31",
+            "python_version": "3.7",
+        }
+
+        resolver.graph.should_receive("get_depends_on").and_return({None: [dependency_tuple[:2]]}).once()
+        resolver.graph.should_receive("get_python_package_version_records").with_args(
+            package_name=dependency_tuple[0],
+            package_version=dependency_tuple[1],
+            index_url=None,
+            os_name=resolver.project.runtime_environment.operating_system.name,
+            os_version=resolver.project.runtime_environment.operating_system.version,
+            python_version=resolver.project.runtime_environment.python_version,
+        ).and_return([record]).once()
+
+        resolver._init_context()
+        resolver.beam.add_state(state)
+        resolver.context.register_package_tuple(
+            to_expand_package_tuple,
+            develop=False,
+            extras=None,
+            os_name="fedora",
+            os_version="31",
+            python_version="3.7",
+        )
+        package_version = resolver.context.get_package_version(to_expand_package_tuple)
+
+        try:
+            resolver._prefetch_dependencies([to_expand_package_tuple])
+            assert to_expand_package_tuple in resolver._prefetched
+            resolver.should_receive("_expand_state_add_dependencies").with_args(
+                state=state,
+                package_version=package_version,
+                dependencies=[dependency_tuple[:2]],
+                records={dependency_tuple[:2]: [record]},
+            ).and_return(None).once()
+
+            assert resolver._expand_state(state, to_expand_package_tuple) is None
+            assert not resolver._prefetched
+        finally:
+            resolver._reset_batch()
+
+        assert resolver._batch_executor is None
+
+    @pytest.mark.parametrize("attribute", ["batch_size", "batch_workers"])
+    def test_batch_validator(
+        self,
+        pipeline_config: PipelineConfig,
+        project: Project,
+        predictor_mock: Predictor,
+        attribute: str,
+    ) -> None:
+        """Test validating configuration of batched expansions."""
+        with pytest.raises(ValueError):
+            Resolver(
+                pipeline=pipeline_config,
+                project=project,
+                library_usage={},
+                graph=GraphDatabase(),
+                predictor=predictor_mock,
+                recommendation_type=RecommendationType.LATEST,
+                **{attribute: 0},
+            )
+
     def test_resolve_products(self, resolver: Resolver) -> None:
         """Test resolving products."""
         # Check resolver adjusts count if it is more than limit.
@@ -1647,6 +1887,24 @@ class TestResolver(AdviserTestCase):
         assert resolver.count == 3, "Count was not adjusted based on limit"
         assert resolver.limit == 3, "Limit was not left untouched"
 
+    def test_resolve_products_offset(self, resolver: Resolver) -> None:
+        """Test skipping final states resolved first without creating products out of them."""
+        final_state1 = State(score=0.3)
+        final_state2 = State(score=0.2)
+        product2 = flexmock()
+
+        resolver.should_receive("_do_resolve_states").with_args(with_devel=False, user_stack_scoring=False).and_yield(
+            final_state1, final_state2
+        ).once()
+        resolver.should_receive("_run_wraps").with_args(final_state2).once()
+
+        flexmock(Product)
+        Product.should_receive("from_final_state").with_args(context=object, state=final_state2).and_return(
+            product2
+        ).once()
+
+        assert list(resolver.resolve_products(with_devel=False, user_stack_scoring=False, offset=1)) == [product2]
+
     def test_resolve_products_eager_stop(self, resolver: Resolver) -> None:
         """Test resolving products with eager stopping."""
         final_state1 = State(score=0.3)
@@ -1831,39 +2089,33 @@ class TestResolver(AdviserTestCase):
 
     def test_finalize_initial_state(self, resolver: Resolver, tf_package_versions: List[PackageVersion]) -> None:
         """Test finalization of an initial state objects."""
-        initial_state_id_called = None
-
-        def finalize_state(state_id: int) -> None:
-            nonlocal initial_state_id_called
-            initial_state_id_called = state_id
+        initial_state_id_called = []
 
         resolver.should_receive("_resolve_direct_dependencies").with_args(with_devel=False).and_return(
             {"tensorflow": tf_package_versions}
         ).once()
 
-        resolver.predictor.finalize_state = finalize_state
+        resolver.predictor.finalize_state = initial_state_id_called.append
 
         resolver._init_context()
-        resolver._prepare_initial_state(with_devel=False)
-        assert resolver.beam.size == 1
+        with _state_finalizer(resolver.predictor):
+            resolver._prepare_initial_state(with_devel=False)
+            assert resolver.beam.size == 1
 
-        initial_state = resolver.beam.pop(0)
+            initial_state = resolver.beam.pop(0)
 
-        assert resolver.beam.size == 0
+            assert resolver.beam.size == 0
 
-        initial_state_id = id(initial_state)
-        del initial_state
-        gc.collect()
+            initial_state_id = id(initial_state)
+            del initial_state
+            gc.collect()
 
-        assert initial_state_id_called == initial_state_id
+        # States left behind by other tests can be collected in the meantime.
+        assert initial_state_id in initial_state_id_called
 
     def test_finalize_state(self, resolver: Resolver, state: State) -> None:
         """Test finalization of a state objects."""
-        state_id_called = None
-
-        def finalize_state(state_id: int) -> None:
-            nonlocal state_id_called
-            state_id_called = state_id
+        state_id_called = []
 
         # Keep just one state - the one expanded, we do not care about initial state.
         resolver.beam.width = 1
@@ -1877,7 +2129,7 @@ class TestResolver(AdviserTestCase):
 
         resolver._init_context()
         resolver.context.iteration = 42
-        resolver.predictor.finalize_state = finalize_state
+        resolver.predictor.finalize_state = state_id_called.append
 
         resolver.graph.should_receive("get_depends_on").with_args(
             *package_tuple,
@@ -1916,17 +2168,138 @@ class TestResolver(AdviserTestCase):
             python_version=None,
         )
 
-        state_returned = resolver._expand_state(state, package_tuple)
-        assert state_returned is not state
-        assert resolver.beam.size == 1
-        assert resolver.beam.pop(0) is state_returned
-        assert resolver.beam.size == 0
+        with _state_finalizer(resolver.predictor):
+            state_returned = resolver._expand_state(state, package_tuple)
+            assert state_returned is not state
+            assert resolver.beam.size == 1
+            assert resolver.beam.pop(0) is state_returned
+            assert resolver.beam.size == 0
+
+            state_id = id(state_returned)
+            del state_returned
+            gc.collect()
+
+        # States left behind by other tests can be collected in the meantime.
+        assert state_id in state_id_called
+
+    @pytest.mark.parametrize("register_skipped_dependencies", [True, False])
+    def test_expand_state_skipped_dependency(self, resolver: Resolver, register_skipped_dependencies: bool) -> None:
+        """Test registering dependencies skipped as a different version is already resolved only on request."""
+        package_tuple = ("hexsticker", "1.0.0", "https://pypi.org/simple")
+        state = State(score=1.0)
+        state.add_unresolved_dependency(package_tuple)
+        state.add_resolved_dependency(("click", "2.0.0", "https://pypi.org/simple"))
+
+        resolver._init_context()
+        flexmock(type(resolver.predictor), REGISTER_SKIPPED_DEPENDENCIES=register_skipped_dependencies)
+
+        resolver.graph.should_receive("get_depends_on").with_args(
+            *package_tuple,
+            os_name=resolver.project.runtime_environment.operating_system.name,
+            os_version=resolver.project.runtime_environment.operating_system.version,
+            python_version=resolver.project.runtime_environment.python_version,
+            extras=frozenset({None}),
+            marker_evaluation_result=None,
+            is_missing=False,
+        ).and_return({"click": [("click", "1.0.0")]}).once()
+
+        click_records = [
+            {
+                "package_name": "click",
+                "package_version": "1.0.0",
+                "index_url": "https://pypi.org/simple",
+                "os_name": resolver.project.runtime_environment.operating_system.name,
+                "os_version": resolver.project.runtime_environment.operating_system.version,
+                "python_version": resolver.project.runtime_environment.python_version,
+            }
+        ]
+        resolver.graph.should_receive("get_python_package_version_records").with_args(
+            package_name="click",
+            package_version="1.0.0",
+            index_url=None,
+            os_name=resolver.project.runtime_environment.operating_system.name,
+            os_version=resolver.project.runtime_environment.operating_system.version,
+            python_version=resolver.project.runtime_environment.python_version,
+        ).and_return(click_records).once()
+
+        resolver.context.register_package_tuple(
+            package_tuple,
+            develop=False,
+            os_name=None,
+            os_version=None,
+            python_version=None,
+        )
 
-        state_id = id(state_returned)
-        del state_returned
-        gc.collect()
+        flexmock(Context).should_receive("register_package_tuple").with_args(
+            ("click", "1.0.0", "https://pypi.org/simple"),
+            dependent_tuple=package_tuple,
+            develop=False,
+            extras=None,
+            os_name=resolver.project.runtime_environment.operating_system.name,
+            os_version=resolver.project.runtime_environment.operating_system.version,
+            python_version=resolver.project.runtime_environment.python_version,
+        ).times(1 if register_skipped_dependencies else 0)
+
+        resolver._expand_state(state, package_tuple)
+
+    @pytest.mark.parametrize("backend", sorted(BEAM_BACKENDS))
+    @pytest.mark.parametrize("predictor_class", [TemporalDifference, MCTS])
+    def test_resolve_beam_backends(self, backend: str, predictor_class: type) -> None:
+        """Test resolving with predictors keeping states that were discarded from beam based on its width."""
+        random.seed(42)
+        graph = SyntheticGraphDatabase(layers=3, width=3)
+        resolver = Resolver(
+            pipeline=PipelineConfig(steps={None: [SyntheticScoreStep(scores=graph.scores)]}),
+            project=graph.get_project(),
+            library_usage=None,
+            graph=graph,
+            predictor=predictor_class(keep_history=False),
+            beam=Beam(width=5, backend=backend),
+            limit=500,
+            count=500,
+            recommendation_type=RecommendationType.STABLE,
+            solver=graph,
+        )
 
-        assert state_id_called == state_id
+        products = list(resolver.resolve_products(with_devel=False))
+        assert products
+        for product in products:
+            assert {pv.name for pv in product.project.iter_dependencies_locked()} >= set(graph.get_layer(0))
+
+    @pytest.mark.parametrize("predictor_class", [TemporalDifference, MCTS])
+    def test_resolve_beam_spill(self, predictor_class: type) -> None:
+        """Test resolving with most of the states spilled to disk."""
+        random.seed(42)
+        graph = SyntheticGraphDatabase(layers=3, width=3)
+        beam = Beam(width=None, backend="spill")
+        beam._heap.memory_size = 2
+        resolver = Resolver(
+            pipeline=PipelineConfig(steps={None: [SyntheticScoreStep(scores=graph.scores)]}),
+            project=graph.get_project(),
+            library_usage=None,
+            graph=graph,
+            predictor=predictor_class(keep_history=False),
+            beam=beam,
+            limit=100,
+            count=100,
+            recommendation_type=RecommendationType.STABLE,
+            solver=graph,
+        )
+
+        products = list(resolver.resolve_products(with_devel=False))
+        assert products
+        assert beam._heap.spilled_count > 0
+
+    def test_state_finalizer_not_implemented(self, resolver: Resolver) -> None:
+        """Test no finalizer is assigned to states if predictor does not implement state finalization."""
+        with _state_finalizer(resolver.predictor):
+            assert State._FINALIZERS == []
+
+        resolver.predictor.finalize_state = lambda state_id: None
+        with _state_finalizer(resolver.predictor):
+            assert State._FINALIZERS == [resolver.predictor.finalize_state]
+
+        assert State._FINALIZERS == []
 
     @pytest.mark.parametrize(
         "score_returned, score_expected",
@@ -2197,6 +2570,69 @@ class TestResolver(AdviserTestCase):
         resolver._prepare_user_lock_file()
         assert package_version.index == thoth_station_source
 
+    def test_prepare_user_lock_file_multiple_packages(self, resolver: Resolver) -> None:
+        """Test assigning indexes to multiple packages, packages with an assigned index are not queried again."""
+        resolver._init_context()
+
+        tensorflow = PackageVersion(
+            name="tensorflow",
+            version="==2.0.0",
+            index=None,
+            develop=False,
+            hashes=["sha256:foo", "sha256:bar"],
+        )
+        numpy = PackageVersion(
+            name="numpy",
+            version="==1.19.4",
+            index=None,
+            develop=False,
+            hashes=["sha256:baz"],
+        )
+
+        thoth_station_source = Source("https://thoth-station.ninja/simple")
+        pypi_source = Source("https://pypi.org/simple")
+
+        # We do not care about the linkage to not relevant Pipfile here.
+        pipfile_lock = PipfileLock.from_package_versions(
+            pipfile=resolver.project.pipfile,
+            packages=[tensorflow, numpy],
+            meta=resolver.project.pipfile.meta,
+        )
+        resolver.project.pipfile_lock = pipfile_lock
+        resolver.project.pipfile_lock.meta.sources = {
+            "thoth-station": thoth_station_source,
+            "pypi": pypi_source,
+        }
+
+        resolver.graph.should_receive("get_python_package_index_urls_all").with_args(enabled=True).and_return(
+            [pypi_source.url, thoth_station_source.url]
+        ).once()
+
+        resolver.graph.should_receive("get_python_package_hashes_sha256").with_args(
+            tensorflow.name,
+            tensorflow.locked_version,
+            thoth_station_source.url,
+        ).and_return(["foo"]).once()
+        resolver.graph.should_receive("get_python_package_hashes_sha256").with_args(
+            numpy.name,
+            numpy.locked_version,
+            thoth_station_source.url,
+        ).and_return([]).once()
+        resolver.graph.should_receive("get_python_package_hashes_sha256").with_args(
+            tensorflow.name,
+            tensorflow.locked_version,
+            pypi_source.url,
+        ).times(0)
+        resolver.graph.should_receive("get_python_package_hashes_sha256").with_args(
+            numpy.name,
+            numpy.locked_version,
+            pypi_source.url,
+        ).and_return(["baz"]).once()
+
+        resolver._prepare_user_lock_file()
+        assert tensorflow.index == thoth_station_source
+        assert numpy.index == pypi_source
+
     def test_sieve_skip_package_exception(self, resolver: Resolver, tf_package_versions: List[PackageVersion]) -> None:
         """Test propagation of an exception caused to skip a package."""
         flexmock(sieves.Sieve1)
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# thoth-adviser
+# Copyright(C) 2020 Fridolin Pokorny
+#
+# This program is free software: you can redistribute it and / or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Test an indexed archive of software stacks produced by Dependency Monkey."""
+
+import os
+
+import pytest
+from thoth.python import Project
+
+from thoth.adviser.stack_archive import StackArchiveReader
+from thoth.adviser.stack_archive import StackArchiveWriter
+from thoth.adviser.stack_archive import get_index_path
+
+from .base import AdviserTestCase
+
+
+class TestStackArchive(AdviserTestCase):
+    """Test an indexed archive of software stacks produced by Dependency Monkey."""
+
+    def test_write_read(self, tmp_path) -> None:
+        """Test writing software stacks and reading them back by stack number."""
+        path = str(tmp_path / "output" / "stacks.jsonl")
+        with StackArchiveWriter(path, queue_size=2) as writer:
+            for count in range(1, 11):
+                assert writer.write(count, {"id": count}) == f"{path}#{count}"
+
+        assert os.path.isfile(get_index_path(path))
+        with StackArchiveReader(path) as reader:
+            assert len(reader) == 10
+            assert list(reader) == list(range(1, 11))
+            assert 5 in reader
+            assert 11 not in reader
+            assert reader.get(7) == {"id": 7}
+            assert reader.get(1) == {"id": 1}
+            with pytest.raises(KeyError):
+                reader.get(0)
+
+    def test_append(self, tmp_path) -> None:
+        """Test appending to an existing archive, stacks written again replace the previous ones."""
+        path = str(tmp_path / "stacks.jsonl")
+        with StackArchiveWriter(path) as writer:
+            for count in (1, 2, 3):
+                writer.write(count, {"id": count, "run": 1})
+
+        with StackArchiveWriter(path) as writer:
+            for count in (3, 4):
+                writer.write(count, {"id": count, "run": 2})
+
+        with StackArchiveReader(path) as reader:
+            assert list(reader) == [1, 2, 3, 4]
+            assert reader.get(2) == {"id": 2, "run": 1}
+            assert reader.get(3) == {"id": 3, "run": 2}
+
+    def test_partial_index_entry(self, tmp_path) -> None:
+        """Test an index entry written partially is ignored."""
+        path = str(tmp_path / "stacks.jsonl")
+        with StackArchiveWriter(path) as writer:
+            writer.write(1, {"id": 1})
+
+        with open(get_index_path(path), "ab") as index_file:
+            index_file.write(b"\x02\x00")
+
+        with StackArchiveReader(path) as reader:
+            assert list(reader) == [1]
+
+    def test_resume_after_partial_write(self, tmp_path) -> None:
+        """Test a partially written index entry and archive line are dropped before appending to the archive."""
+        path = str(tmp_path / "stacks.jsonl")
+        with StackArchiveWriter(path) as writer:
+            for count in (1, 2, 3):
+                writer.write(count, {"id": count})
+
+        with open(get_index_path(path), "ab") as index_file:
+            index_file.write(b"\x04\x00")
+
+        with open(path, "ab") as archive_file:
+            archive_file.write(b'{"stack": 4, "proj')
+
+        with StackArchiveWriter(path) as writer:
+            for count in (4, 5, 6):
+                writer.write(count, {"id": count})
+
+        assert os.path.getsize(get_index_path(path)) % 24 == 0
+        with StackArchiveReader(path) as reader:
+            assert list(reader) == [1, 2, 3, 4, 5, 6]
+            for count in range(1, 7):
+                assert reader.get(count) == {"id": count}
+
+    def test_get_project(self, tmp_path, project: Project) -> None:
+        """Test obtaining a project stored in the archive."""
+        path = str(tmp_path / "stacks.jsonl")
+        with StackArchiveWriter(path) as writer:
+            writer.write(42, project.to_dict())
+
+        with StackArchiveReader(path) as reader:
+            assert reader.get_project(42).to_dict() == project.to_dict()
+
+    def test_write_error(self, tmp_path) -> None:
+        """Test errors in the writer thread are propagated."""
+        path = str(tmp_path / "stacks.jsonl")
+        os.makedirs(path)
+        writer = StackArchiveWriter(path)
+        writer.start()
+        with pytest.raises(IsADirectoryError):
+            writer.close()
+
+    def test_invalid_queue_size(self) -> None:
+        """Test rejecting an invalid queue size."""
+        with pytest.raises(ValueError):
+            StackArchiveWriter("stacks.jsonl", queue_size=0)
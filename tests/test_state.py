@@ -133,6 +133,73 @@ class TestState(AdviserTestCase):
 
         assert cloned_state.parent is None
 
+    def test_assigned_finalizer(self) -> None:
+        """Test notifying the finalizer assigned about states being destructed."""
+        finalized = []
+        state = State()
+        state_id = id(state)
+
+        with State.assigned_finalizer(finalized.append):
+            cloned_state = state.clone()
+            cloned_state_id = id(cloned_state)
+            del cloned_state
+            gc.collect()
+
+        del state
+        gc.collect()
+
+        assert cloned_state_id in finalized
+        assert state_id not in finalized
+        assert not hasattr(State, "__del__")
+
+    def test_assigned_finalizer_nested(self) -> None:
+        """Test all the finalizers assigned are notified, the hook is uninstalled once none is assigned."""
+        outer_finalized = []
+        inner_finalized = []
+
+        with State.assigned_finalizer(outer_finalized.append):
+            with State.assigned_finalizer(inner_finalized.append):
+                state = State()
+                inner_state_id = id(state)
+                del state
+                gc.collect()
+
+            assert State._FINALIZERS == [outer_finalized.append]
+            state = State()
+            outer_state_id = id(state)
+            del state
+            gc.collect()
+
+        assert inner_state_id in inner_finalized
+        assert inner_state_id in outer_finalized
+        assert outer_state_id in outer_finalized
+        assert State._FINALIZERS == []
+        assert not hasattr(State, "__del__")
+
+    def test_assigned_finalizer_interleaved(self) -> None:
+        """Test finalizers assigned by concurrently running resolvers exiting in a different order."""
+        first_finalized = []
+        second_finalized = []
+
+        first = State.assigned_finalizer(first_finalized.append)
+        second = State.assigned_finalizer(second_finalized.append)
+        first.__enter__()
+        second.__enter__()
+        first.__exit__(None, None, None)
+
+        # The hook stays installed for the finalizer still assigned.
+        assert State._FINALIZERS == [second_finalized.append]
+        state = State()
+        state_id = id(state)
+        del state
+        gc.collect()
+
+        second.__exit__(None, None, None)
+        assert state_id in second_finalized
+        assert state_id not in first_finalized
+        assert State._FINALIZERS == []
+        assert not hasattr(State, "__del__")
+
     @pytest.mark.parametrize("n", range(5))
     def test_dict_order(self, n: int) -> None:
         """Test relative insertion into dict preserves order.
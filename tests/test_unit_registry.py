@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# thoth-adviser
+# Copyright(C) 2020 Fridolin Pokorny
+#
+# This program is free software: you can redistribute it and / or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Test the registry of pipeline units implemented in adviser."""
+
+import importlib
+import inspect
+import pkgutil
+import subprocess
+import sys
+from typing import Any
+from typing import Dict
+
+import flexmock
+import pytest
+from thoth.common import RuntimeEnvironment
+from thoth.python import Project
+from thoth.storages import GraphDatabase
+
+from thoth.adviser.enums import DecisionType
+from thoth.adviser.enums import RecommendationType
+from thoth.adviser.pipeline_builder import PipelineBuilder
+from thoth.adviser.pipeline_builder import PipelineBuilderContext
+from thoth.adviser.unit import Unit
+from thoth.adviser.unit_registry import UNIT_REGISTRY
+from thoth.adviser.unit_registry import get_unit_registry_entry
+
+from .base import AdviserTestCase
+
+_UNIT_PACKAGES = ("boots", "pseudonyms", "sieves", "steps", "strides", "wraps")
+
+
+def _get_unit_classes() -> Dict[str, type]:
+    """Get all the pipeline units implemented, by importing all the modules in pipeline unit packages."""
+    result = {}
+    for package_name in _UNIT_PACKAGES:
+        package = importlib.import_module(f"thoth.adviser.{package_name}")
+        for module_info in pkgutil.walk_packages(package.__path__, prefix=f"{package.__name__}."):
+            module = importlib.import_module(module_info.name)
+            for name, obj in vars(module).items():
+                if (
+                    inspect.isclass(obj)
+                    and issubclass(obj, Unit)
+                    and obj.__module__ == module.__name__
+                    and not inspect.isabstract(obj)
+                ):
+                    result[name] = obj
+
+    return result
+
+
+@pytest.fixture
+def project() -> Project:
+    """Create a project with a runtime environment that makes pipeline units consider their inclusion."""
+    return Project.from_files(
+        pipfile_path=str(AdviserTestCase.data_dir / "projects" / "Pipfile"),
+        pipfile_lock_path=str(AdviserTestCase.data_dir / "projects" / "Pipfile.lock"),
+        runtime_environment=RuntimeEnvironment.from_dict(
+            {
+                "python_version": "3.8",
+                "operating_system": {"name": "rhel", "version": "8"},
+                "hardware": {"cpu_family": 6, "cpu_model": 94},
+                "cuda_version": "10.1",
+            }
+        ),
+    )
+
+
+class TestUnitRegistry(AdviserTestCase):
+    """Test the registry of pipeline units implemented in adviser."""
+
+    def test_registry_consistency(self) -> None:
+        """Test all the pipeline units implemented are registered with the module they are implemented in."""
+        unit_classes = _get_unit_classes()
+        assert {entry.name for entry in UNIT_REGISTRY} == set(unit_classes)
+        assert len(UNIT_REGISTRY) == len(unit_classes)
+
+        for entry in UNIT_REGISTRY:
+            assert entry.load() is unit_classes[entry.name]
+            assert entry.module == unit_classes[entry.name].__module__
+
+    def test_package_exports(self) -> None:
+        """Test pipeline units are exported by their packages, only registered pipeline units are exported."""
+        for package_name in _UNIT_PACKAGES:
+            package: Any = importlib.import_module(f"thoth.adviser.{package_name}")
+            for unit_name in package.__all__:
+                assert getattr(package, unit_name) is get_unit_registry_entry(unit_name).load()  # type: ignore
+
+            with pytest.raises(AttributeError):
+                getattr(package, "UnknownUnit")
+
+    @pytest.mark.parametrize(
+        "recommendation_type,decision_type",
+        [(recommendation_type, None) for recommendation_type in RecommendationType]
+        + [(None, decision_type) for decision_type in DecisionType],
+    )
+    def test_inclusion_metadata(
+        self, project: Project, recommendation_type: RecommendationType, decision_type: DecisionType
+    ) -> None:
+        """Test pipeline units are not included in pipelines their registry entry excludes them from."""
+        flexmock(GraphDatabase)
+        builder_context = PipelineBuilderContext(
+            graph=GraphDatabase(),
+            project=project,
+            library_usage={"report": {"tensorflow": ["tensorflow.keras.layers.Embedding"]}},
+            recommendation_type=recommendation_type,
+            decision_type=decision_type,
+        )
+
+        for entry in UNIT_REGISTRY:
+            if recommendation_type is not None and entry.adviser:
+                continue
+
+            if decision_type is not None and entry.dependency_monkey:
+                continue
+
+            assert entry.load().should_include(builder_context) is None, entry.name  # type: ignore
+            assert not PipelineBuilder._may_include(entry.name, builder_context)
+
+    def test_lazy_import(self) -> None:
+        """Test importing adviser does not import pipeline units and plotting libraries."""
+        code = (
+            "import sys\n"
+            "import thoth.adviser.cli\n"
+            "print(sorted(m for m in sys.modules if m.startswith(('matplotlib', 'thoth.adviser.sieves.'))))\n"
+        )
+        output = subprocess.check_output(
+            [sys.executable, "-c", code],
+            stderr=subprocess.DEVNULL,
+            universal_newlines=True,
+            cwd=str(AdviserTestCase.data_dir.parent.parent),
+        )
+        assert output.splitlines()[-1] == "[]"
@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+# thoth-adviser
+# Copyright(C) 2020 Fridolin Pokorny
+#
+# This program is free software: you can redistribute it and / or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Compact storage of dependencies and dependents noted during a resolver run.
+
+Package tuples and environments are interned to integer ids, edges are kept in arrays of integers. Mapping views
+provide the same access as nested dictionaries used previously:
+
+  dependencies[package_name][package_tuple] -> set of dependency tuples
+  dependents[package_name][dependency_tuple] -> set of (package_tuple, os_name, os_version, python_version)
+"""
+
+import abc
+from array import array
+from typing import Any
+from typing import Dict
+from typing import FrozenSet
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+import attr
+
+# Dependents are stored as a single integer packing dependent id and environment id.
+_ENVIRONMENT_BITS = 20
+_ENVIRONMENT_MASK = (1 << _ENVIRONMENT_BITS) - 1
+
+# Arrays of records up to this size are checked for duplicates on each insert, larger arrays are deduplicated once
+# they double in size since the last deduplication - amortized O(1) inserts keeping at most twice as many records.
+_LINEAR_SCAN_SIZE = 32
+
+_EnvironmentType = Tuple[Optional[str], Optional[str], Optional[str]]
+_DependentType = Tuple[Tuple[str, str, str], Optional[str], Optional[str], Optional[str]]
+
+
+@attr.s(slots=True)
+class DependencyGraph:
+    """Compact adjacency storage for dependencies and dependents of package tuples."""
+
+    _tuple_ids = attr.ib(type=Dict[Tuple[str, str, str], int], factory=dict, init=False)
+    _tuples = attr.ib(type=List[Tuple[str, str, str]], factory=list, init=False)
+    _environment_ids = attr.ib(type=Dict[_EnvironmentType, int], factory=dict, init=False)
+    _environments = attr.ib(type=List[_EnvironmentType], factory=list, init=False)
+    # Package tuple id -> array of dependency tuple ids.
+    _dependencies = attr.ib(type=Dict[int, "array[int]"], factory=dict, init=False)
+    # Package tuple id -> array of packed dependent tuple ids and environment ids.
+    _dependents = attr.ib(type=Dict[int, "array[int]"], factory=dict, init=False)
+    # Package name -> array of package tuple ids present in the mappings above.
+    _dependencies_names = attr.ib(type=Dict[str, "array[int]"], factory=dict, init=False)
+    _dependents_names = attr.ib(type=Dict[str, "array[int]"], factory=dict, init=False)
+    # Package tuple id -> number of records in its array after the last deduplication, see _append().
+    _dependencies_deduplicated = attr.ib(type=Dict[int, int], factory=dict, init=False)
+    _dependents_deduplicated = attr.ib(type=Dict[int, int], factory=dict, init=False)
+
+    @staticmethod
+    def _append(records: "array[int]", record: int, deduplicated: Dict[int, int], tuple_id: int) -> None:
+        """Append the given record to records of the given package tuple id, avoid keeping duplicate records."""
+        size = len(records)
+        if size < _LINEAR_SCAN_SIZE:
+            if record not in records:
+                records.append(record)
+            return
+
+        records.append(record)
+        if size + 1 >= 2 * deduplicated.get(tuple_id, _LINEAR_SCAN_SIZE):
+            records[:] = array(records.typecode, dict.fromkeys(records))
+            deduplicated[tuple_id] = len(records)
+
+    def _intern_tuple(self, package_tuple: Tuple[str, str, str]) -> int:
+        """Get id of the given package tuple, assign a new one if not seen yet."""
+        tuple_id = self._tuple_ids.get(package_tuple)
+        if tuple_id is None:
+            tuple_id = len(self._tuples)
+            self._tuple_ids[package_tuple] = tuple_id
+            self._tuples.append(package_tuple)
+
+        return tuple_id
+
+    def _intern_environment(self, environment: _EnvironmentType) -> int:
+        """Get id of the given environment, assign a new one if not seen yet."""
+        environment_id = self._environment_ids.get(environment)
+        if environment_id is None:
+            environment_id = len(self._environments)
+            if environment_id > _ENVIRONMENT_MASK:
+                raise ValueError(f"Too many environments interned: {environment_id}")
+
+            self._environment_ids[environment] = environment_id
+            self._environments.append(environment)
+
+        return environment_id
+
+    def add(
+        self,
+        package_tuple: Optional[Tuple[str, str, str]],
+        dependency_tuple: Tuple[str, str, str],
+        os_name: Optional[str] = None,
+        os_version: Optional[str] = None,
+        python_version: Optional[str] = None,
+    ) -> None:
+        """Note down a dependency, package tuple set to None states a direct dependency."""
+        dependency_id = self._intern_tuple(dependency_tuple)
+
+        dependents = self._dependents.get(dependency_id)
+        if dependents is None:
+            dependents = array("q")
+            self._dependents[dependency_id] = dependents
+            self._dependents_names.setdefault(dependency_tuple[0], array("l")).append(dependency_id)
+
+        if package_tuple is None:
+            # Direct dependency, no need to keep track of environments.
+            return
+
+        package_id = self._intern_tuple(package_tuple)
+        dependencies = self._dependencies.get(package_id)
+        if dependencies is None:
+            dependencies = array("l")
+            self._dependencies[package_id] = dependencies
+            self._dependencies_names.setdefault(package_tuple[0], array("l")).append(package_id)
+
+        self._append(dependencies, dependency_id, self._dependencies_deduplicated, package_id)
+        packed = (package_id << _ENVIRONMENT_BITS) | self._intern_environment((os_name, os_version, python_version))
+        self._append(dependents, packed, self._dependents_deduplicated, dependency_id)
+
+    def get_dependencies(self, package_tuple: Tuple[str, str, str]) -> FrozenSet[Tuple[str, str, str]]:
+        """Get dependencies of the given package tuple."""
+        tuple_id = self._tuple_ids.get(package_tuple)
+        dependencies = self._dependencies.get(tuple_id) if tuple_id is not None else None
+        if dependencies is None:
+            raise KeyError(package_tuple)
+
+        return frozenset(self._tuples[i] for i in dependencies)
+
+    def get_dependents(self, dependency_tuple: Tuple[str, str, str]) -> FrozenSet[_DependentType]:
+        """Get dependents of the given dependency tuple together with environments in which they were noted."""
+        tuple_id = self._tuple_ids.get(dependency_tuple)
+        dependents = self._dependents.get(tuple_id) if tuple_id is not None else None
+        if dependents is None:
+            raise KeyError(dependency_tuple)
+
+        return frozenset(
+            (self._tuples[i >> _ENVIRONMENT_BITS],) + self._environments[i & _ENVIRONMENT_MASK] for i in dependents
+        )
+
+    def set_dependents(self, dependency_tuple: Tuple[str, str, str], dependents: Iterable[_DependentType]) -> None:
+        """Set dependents of the given dependency tuple, any dependents noted previously are discarded."""
+        dependency_id = self._intern_tuple(dependency_tuple)
+        if dependency_id in self._dependents:
+            self._dependents[dependency_id] = array("q")
+            self._dependents_deduplicated.pop(dependency_id, None)
+        else:
+            self.add(None, dependency_tuple)
+
+        for dependent in dependents:
+            self.add(dependent[0], dependency_tuple, *dependent[1:])
+
+    def set_dependencies(
+        self, package_tuple: Tuple[str, str, str], dependencies: Iterable[Tuple[str, str, str]]
+    ) -> None:
+        """Set dependencies of the given package tuple, any dependencies noted previously are discarded."""
+        package_id = self._intern_tuple(package_tuple)
+        if package_id not in self._dependencies:
+            self._dependencies_names.setdefault(package_tuple[0], array("l")).append(package_id)
+
+        self._dependencies[package_id] = array("l", dict.fromkeys(self._intern_tuple(d) for d in dependencies))
+        self._dependencies_deduplicated.pop(package_id, None)
+
+    def iter_dependencies_tuples(self, package_name: str) -> Iterator[Tuple[str, str, str]]:
+        """Iterate over package tuples of the given name that have dependencies noted."""
+        return (self._tuples[i] for i in self._dependencies_names.get(package_name, ()))
+
+    def iter_dependents_tuples(self, package_name: str) -> Iterator[Tuple[str, str, str]]:
+        """Iterate over dependency tuples of the given name that have dependents noted."""
+        return (self._tuples[i] for i in self._dependents_names.get(package_name, ()))
+
+    def has_dependencies(self, package_tuple: Tuple[str, str, str]) -> bool:
+        """Check if the given package tuple has dependencies noted."""
+        tuple_id = self._tuple_ids.get(package_tuple)
+        return tuple_id is not None and tuple_id in self._dependencies
+
+    def has_dependents(self, dependency_tuple: Tuple[str, str, str]) -> bool:
+        """Check if the given dependency tuple was noted (it can have no dependents if it is a direct dependency)."""
+        tuple_id = self._tuple_ids.get(dependency_tuple)
+        return tuple_id is not None and tuple_id in self._dependents
+
+    @property
+    def dependencies(self) -> "Dependencies":
+        """Get a mapping view for dependencies: package name -> package tuple -> dependency tuples."""
+        return Dependencies(self)
+
+    @property
+    def dependents(self) -> "Dependents":
+        """Get a mapping view for dependents: package name -> dependency tuple -> dependents with environments."""
+        return Dependents(self)
+
+
+@attr.s(slots=True)
+class _PackageView:
+    """A view on package tuples of the same package name, behaves like a read-only dictionary."""
+
+    _graph = attr.ib(type=DependencyGraph)
+    _package_name = attr.ib(type=str)
+    _dependents = attr.ib(type=bool)
+
+    def __getitem__(self, package_tuple: Tuple[str, str, str]) -> FrozenSet[Any]:
+        """Get dependencies or dependents of the given package tuple."""
+        if package_tuple[0] != self._package_name:
+            raise KeyError(package_tuple)
+
+        if self._dependents:
+            return self._graph.get_dependents(package_tuple)
+
+        return self._graph.get_dependencies(package_tuple)
+
+    def __contains__(self, package_tuple: object) -> bool:
+        """Check if the given package tuple has any record in this view."""
+        if not isinstance(package_tuple, tuple) or package_tuple[0] != self._package_name:
+            return False
+
+        if self._dependents:
+            return self._graph.has_dependents(package_tuple)  # type: ignore
+
+        return self._graph.has_dependencies(package_tuple)  # type: ignore
+
+    def __iter__(self) -> Iterator[Tuple[str, str, str]]:
+        """Iterate over package tuples with records in this view."""
+        if self._dependents:
+            return self._graph.iter_dependents_tuples(self._package_name)
+
+        return self._graph.iter_dependencies_tuples(self._package_name)
+
+    def __len__(self) -> int:
+        """Get number of package tuples with records in this view."""
+        return sum(1 for _ in self)
+
+    def get(self, package_tuple: Tuple[str, str, str], default: Any = None) -> Any:
+        """Get dependencies or dependents of the given package tuple, return default if not present."""
+        try:
+            return self[package_tuple]
+        except KeyError:
+            return default
+
+    def keys(self) -> Iterator[Tuple[str, str, str]]:
+        """Iterate over package tuples with records in this view."""
+        return iter(self)
+
+    def items(self) -> Iterator[Tuple[Tuple[str, str, str], FrozenSet[Any]]]:
+        """Iterate over package tuples and their records in this view."""
+        return ((package_tuple, self[package_tuple]) for package_tuple in self)
+
+    def values(self) -> Iterator[FrozenSet[Any]]:
+        """Iterate over records in this view."""
+        return (self[package_tuple] for package_tuple in self)
+
+
+@attr.s(slots=True)
+class _GraphView(metaclass=abc.ABCMeta):
+    """A view on the dependency graph keyed by package names, behaves like a dictionary."""
+
+    _graph = attr.ib(type=DependencyGraph)
+
+    _DEPENDENTS = False
+
+    @abc.abstractmethod
+    def _names(self) -> Dict[str, "array[int]"]:
+        """Get mapping of package names to package tuple ids this view operates on."""
+
+    def __getitem__(self, package_name: str) -> _PackageView:
+        """Get a view on package tuples of the given package name."""
+        if package_name not in self._names():
+            raise KeyError(package_name)
+
+        return _PackageView(self._graph, package_name, self._DEPENDENTS)
+
+    def __contains__(self, package_name: object) -> bool:
+        """Check if there are records for the given package name."""
+        return package_name in self._names()
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over package names with records."""
+        return iter(self._names())
+
+    def __len__(self) -> int:
+        """Get number of package names with records."""
+        return len(self._names())
+
+    def get(self, package_name: str, default: Any = None) -> Any:
+        """Get a view on package tuples of the given package name, return default if not present."""
+        try:
+            return self[package_name]
+        except KeyError:
+            return default
+
+    def keys(self) -> Iterator[str]:
+        """Iterate over package names with records."""
+        return iter(self)
+
+    def items(self) -> Iterator[Tuple[str, _PackageView]]:
+        """Iterate over package names and views on their package tuples."""
+        return ((package_name, self[package_name]) for package_name in self)
+
+    def values(self) -> Iterator[_PackageView]:
+        """Iterate over views on package tuples."""
+        return (self[package_name] for package_name in self)
+
+
+class Dependencies(_GraphView):
+    """Mapping view: package name -> package tuple -> dependency tuples."""
+
+    __slots__: List[str] = []
+
+    def _names(self) -> Dict[str, "array[int]"]:
+        """Get mapping of package names to package tuple ids with dependencies."""
+        return self._graph._dependencies_names
+
+    def __setitem__(self, package_name: str, value: Dict[Tuple[str, str, str], Iterable[Tuple[str, str, str]]]) -> None:
+        """Set dependencies of package tuples of the given package name."""
+        for package_tuple, dependencies in value.items():
+            self._graph.set_dependencies(package_tuple, dependencies)
+
+
+class Dependents(_GraphView):
+    """Mapping view: package name -> dependency tuple -> dependents together with environments."""
+
+    __slots__: List[str] = []
+
+    _DEPENDENTS = True
+
+    def _names(self) -> Dict[str, "array[int]"]:
+        """Get mapping of package names to dependency tuple ids noted."""
+        return self._graph._dependents_names
+
+    def __setitem__(self, package_name: str, value: Dict[Tuple[str, str, str], Iterable[_DependentType]]) -> None:
+        """Set dependents of dependency tuples of the given package name."""
+        for dependency_tuple, dependents in value.items():
+            self._graph.set_dependents(dependency_tuple, dependents)
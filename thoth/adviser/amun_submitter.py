@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# thoth-adviser
+# Copyright(C) 2020 Fridolin Pokorny
+#
+# This program is free software: you can redistribute it and / or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Concurrent submission of software stacks produced by Dependency Monkey to Amun API."""
+
+import logging
+import os
+import threading
+import time
+from queue import Queue
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+
+import attr
+import amun
+from amun.swagger_client import InspectionSpecification
+from amun.swagger_client.exceptions import ApiException
+
+from .dm_report import DependencyMonkeyReport
+from .product import Product
+
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@attr.s(slots=True)
+class AmunSubmitter:
+    """Submit software stacks to Amun API for inspection using a pool of submitter threads.
+
+    Software stacks are passed to submitters using a bounded queue - if submitters cannot keep up, submitting
+    a new software stack blocks so that the resolver does not get ahead of Amun API. Each submitter keeps its
+    own API client so that connections to Amun API are reused. Failed submissions are retried with an
+    exponential backoff unless Amun API rejects the inspection request.
+    """
+
+    amun_api_url = attr.ib(type=str)
+    context = attr.ib(type=Dict[str, Any], factory=dict)
+    report = attr.ib(type=DependencyMonkeyReport, factory=DependencyMonkeyReport, kw_only=True)
+    concurrency = attr.ib(type=int, kw_only=True, default=int(os.getenv("THOTH_DEPENDENCY_MONKEY_AMUN_CONCURRENCY", 4)))
+    queue_size = attr.ib(type=int, kw_only=True, default=int(os.getenv("THOTH_DEPENDENCY_MONKEY_AMUN_QUEUE_SIZE", 16)))
+    retries = attr.ib(type=int, kw_only=True, default=int(os.getenv("THOTH_DEPENDENCY_MONKEY_AMUN_RETRIES", 3)))
+    backoff = attr.ib(type=float, kw_only=True, default=float(os.getenv("THOTH_DEPENDENCY_MONKEY_AMUN_BACKOFF", 0.5)))
+
+    _queue = attr.ib(type="Queue[Any]", factory=Queue, init=False)
+    _threads = attr.ib(type=List[threading.Thread], factory=list, init=False)
+    _lock = attr.ib(type=threading.Lock, factory=threading.Lock, init=False)
+    _error = attr.ib(type=Optional[Exception], default=None, init=False)
+
+    @concurrency.validator
+    @queue_size.validator
+    def _positive_int_validator(self, attribute: attr.Attribute, value: int) -> None:  # type: ignore
+        """Validate the given attribute is a positive integer."""
+        if not isinstance(value, int) or value <= 0:
+            raise ValueError(f"Value for {attribute.name!r} should be a positive integer, got {value!r} instead")
+
+    @retries.validator
+    @backoff.validator
+    def _non_negative_validator(self, attribute: attr.Attribute, value: float) -> None:  # type: ignore
+        """Validate the given attribute is a non-negative number."""
+        if not isinstance(value, (int, float)) or value < 0:
+            raise ValueError(f"Value for {attribute.name!r} should be a non-negative number, got {value!r} instead")
+
+    def __enter__(self) -> "AmunSubmitter":
+        """Start submitters."""
+        self.start()
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        """Wait for all the software stacks to be submitted."""
+        self.close()
+
+    def start(self) -> None:
+        """Start submitter threads."""
+        self._error = None
+        self._queue = Queue(maxsize=self.queue_size)
+        self._threads = [
+            threading.Thread(target=self._submitter, name=f"amun-submitter-{i}", daemon=True)
+            for i in range(self.concurrency)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, count: int, product: Product) -> None:
+        """Submit the given software stack, block if submitters cannot keep up."""
+        if self._error is not None:
+            raise self._error
+
+        self._queue.put((count, product))
+
+    def close(self) -> None:
+        """Wait for software stacks queued to be submitted and stop submitter threads."""
+        for _ in self._threads:
+            self._queue.put(None)
+
+        for thread in self._threads:
+            thread.join()
+
+        self._threads = []
+
+        if self._error is not None:
+            raise self._error
+
+    def _submitter(self) -> None:
+        """Submit software stacks queued until asked to stop."""
+        try:
+            api = amun.instantiate_inspection_api(self.amun_api_url)
+        except Exception as exc:
+            _LOGGER.exception("Failed to instantiate Amun API client for %r: %s", self.amun_api_url, str(exc))
+            with self._lock:
+                if self._error is None:
+                    self._error = exc
+
+            # Unblock producers waiting on a full queue, software stacks queued are not submitted.
+            while self._queue.get() is not None:
+                with self._lock:
+                    self.report.skipped += 1
+            return
+
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+
+            count, product = item
+            try:
+                inspection_id = self._submit(api, count, product)
+            except Exception as exc:
+                _LOGGER.exception("Failed to submit stack %d to Amun: %s", count, str(exc))
+                with self._lock:
+                    self.report.skipped += 1
+                continue
+
+            _LOGGER.info("Submitted Amun inspection #%d: %r", count, inspection_id)
+            with self._lock:
+                self.report.add_response(inspection_id, product)
+
+    @staticmethod
+    def _should_retry(exc: Exception) -> bool:
+        """Check if the submission should be retried - requests rejected by Amun API are not retried."""
+        if isinstance(exc, ApiException) and exc.status is not None:
+            return not (400 <= exc.status < 500) or exc.status == 429
+
+        return True
+
+    def _submit(self, api: Any, count: int, product: Product) -> str:
+        """Submit the given software stack, retry with backoff on failures."""
+        context = dict(self.context)
+        context["python"] = product.project.to_dict()
+        # No need to supply runtime environment information.
+        context["python"].pop("runtime_environment", None)
+        specification = InspectionSpecification(**context)
+
+        attempt = 0
+        while True:
+            try:
+                response = api.post_inspection(specification).to_dict()
+                break
+            except Exception as exc:
+                if attempt >= self.retries or not self._should_retry(exc):
+                    raise
+
+                delay = self.backoff * 2 ** attempt
+                attempt += 1
+                _LOGGER.warning(
+                    "Failed to submit stack %d to Amun (attempt %d out of %d), retrying in %g seconds: %s",
+                    count,
+                    attempt,
+                    self.retries + 1,
+                    delay,
+                    str(exc),
+                )
+                time.sleep(delay)
+
+        _LOGGER.debug("Full Amun response: %s", response)
+        inspection_id: str = response["inspection_id"]
+        return inspection_id
@@ -17,28 +17,43 @@
 
 """Implementation of Beam for beam searching part of adviser."""
 
+import heapq
+import os
 import random
+from contextlib import contextmanager
 from typing import Any
 from typing import List
 from typing import Tuple
 from typing import Generator
 from typing import Optional
+from typing import TYPE_CHECKING
 import logging
 
-from fext import ExtHeapQueue
-import matplotlib
-import matplotlib.pyplot as plt
-from matplotlib.font_manager import FontProperties
-
 import attr
 
+from .beam_backends import BEAM_BACKENDS
+from .beam_backends import score_weight
 from .exceptions import NoHistoryKept
 from .state import State
 from .utils import should_keep_history
 
+if TYPE_CHECKING:
+    import matplotlib.figure
+
 _LOGGER = logging.getLogger(__name__)
 
 
+def _beam_backend(value: Optional[str]) -> str:
+    """Set and validate beam storage backend, if not set explicitly check environment variable."""
+    if value is None:
+        value = os.getenv("THOTH_ADVISER_BEAM_BACKEND", "fext")
+
+    if value not in BEAM_BACKENDS:
+        raise ValueError(f"Unknown beam backend {value!r}, available backends: {', '.join(BEAM_BACKENDS)}")
+
+    return value
+
+
 @attr.s(slots=True)
 class Beam:
     """Beam implementation.
@@ -60,14 +75,17 @@ class Beam:
     addition to the beam with beam_width checks in O(log(N)) and removals of the states in
     O(log(N)). To satisfy removals in O(log(N)), the beam maintains a dictionary mapping a state
     to its index in the beam.
+
+    The storage used is pluggable, see the beam_backends module for available backends.
     """
 
     width = attr.ib(default=None, type=Optional[int])
     keep_history = attr.ib(type=bool, kw_only=True, default=None, converter=should_keep_history)
+    backend = attr.ib(type=str, kw_only=True, default=None, converter=_beam_backend)
 
     _beam_history = attr.ib(type=List[Tuple[int, Optional[float]]], default=attr.Factory(list), kw_only=True)
 
-    _heap = attr.ib(type=ExtHeapQueue, init=False)
+    _heap = attr.ib(type=Any, init=False)
     _WIDTH_VALIDATOR_ERR_MSG = "Beam width has to be None or positive integer, got {!r}"
 
     @width.validator
@@ -87,12 +105,32 @@ class Beam:
         raise ValueError(self._WIDTH_VALIDATOR_ERR_MSG.format(value))
 
     @_heap.default
-    def _heap_default(self) -> ExtHeapQueue:
-        """Initialize the extended heap queue."""
-        if self.width is not None:
-            return ExtHeapQueue(size=self.width)
+    def _heap_default(self) -> Any:
+        """Initialize the storage backend."""
+        return BEAM_BACKENDS[self.backend](self.width)
+
+    def shrink(self, size: int) -> None:
+        """Shrink beam to the given size, the lowest rated states are removed from beam, width configured stays.
+
+        Backends providing shrinking discard states in place, including states not kept in memory. The storage
+        of other backends is rebuilt, the last state added is kept as such if it stays in beam.
+        """
+        self._validate_width(attr.fields(Beam).width, size)
+
+        shrink = getattr(self._heap, "shrink", None)
+        if shrink is not None:
+            shrink(size)
+            return
 
-        return ExtHeapQueue()
+        last = self._heap.get_last()
+        states = heapq.nlargest(size, self._heap.items())
+        self._heap = self._heap_default()
+        for state in states:
+            if state is not last:
+                self._heap.push(state.score, state)
+
+        if any(state is last for state in states):
+            self._heap.push(last.score, last)
 
     def new_iteration(self) -> None:  # noqa: D401
         """Called once a new iteration is done in resolver.
@@ -112,8 +150,11 @@ class Beam:
         for sp in ax.spines.values():
             sp.set_visible(False)
 
-    def plot(self) -> matplotlib.figure.Figure:
+    def plot(self) -> "matplotlib.figure.Figure":
         """Plot temperature history of adaptive simulated annealing."""
+        import matplotlib.pyplot as plt
+        from matplotlib.font_manager import FontProperties
+
         if not self._beam_history:
             raise NoHistoryKept("No history datapoints kept for beam")
 
@@ -181,6 +222,14 @@ class Beam:
         """Iterate over sorted states."""
         return (item for item in sorted(self._heap.items(), reverse=reverse))
 
+    def iter_top(self, k: int) -> Generator[State, None, None]:
+        """Iterate over k highest rated states, sorted by their score.
+
+        States are selected lazily on the first iteration in O(N log(k)), the order of states with
+        the same score matches the one of iter_states_sorted.
+        """
+        yield from heapq.nlargest(k, self._heap.items())
+
     def max(self) -> State:
         """Return the highest rated state as kept in the beam."""
         to_return = self._heap.get_max()  # type: State
@@ -211,8 +260,48 @@ class Beam:
         idx = random.randint(0, self.size - 1) if self.size > 1 else 0
         return self.get(idx)
 
+    def get_random_weighted(self) -> State:
+        """Get a random state from beam, the probability of picking a state grows exponentially with its score.
+
+        Backends providing weighted sampling pick the state in O(log(N)), others in O(N).
+        """
+        get_random_weighted = getattr(self._heap, "get_random_weighted", None)
+        if get_random_weighted is not None:
+            return get_random_weighted()  # type: ignore
+
+        states = self._heap.items()
+        if not states:
+            raise IndexError("Cannot choose from an empty beam")
+
+        reference = max(state.score for state in states)
+        weights = [score_weight(state.score, reference) for state in states]
+        to_return = random.choices(states, weights=weights)[0]  # type: State
+        return to_return
+
+    def contains(self, state: State) -> bool:
+        """Check if the given state is kept in beam.
+
+        Backends tracking items stored check the state in O(1), others in O(N).
+        """
+        contains = getattr(self._heap, "contains", None)
+        if contains is not None:
+            return contains(state)  # type: ignore
+
+        return any(item is state for item in self._heap.items())
+
     def remove(self, state: State) -> None:
-        """Remove the given state from beam."""
+        """Remove the given state from beam.
+
+        Predictors can keep states that were already discarded from beam based on its width, removing a state
+        that is not present in beam is a noop. Backends tracking items stored check the state in O(1).
+        """
+        contains = getattr(self._heap, "contains", None)
+        if contains is not None:
+            if contains(state):
+                self._heap.remove(state)
+
+            return
+
         try:
             self._heap.remove(state)
         except ValueError:  # TODO: fix
@@ -220,6 +309,20 @@ class Beam:
                 "Encountered exception reported in https://github.com/thoth-station/adviser/issues/1541, ignoring..."
             )
 
+    @contextmanager
+    def expanding(self, state: State) -> Generator[None, None, None]:
+        """Note the given state is being expanded, backends capable of pinning keep it at hand meanwhile."""
+        pin = getattr(self._heap, "pin", None)
+        if pin is None:
+            yield
+            return
+
+        pin(state)
+        try:
+            yield
+        finally:
+            pin(None)
+
     def pop(self, idx: Optional[int] = None) -> State:
         """Pop i-th element from the beam and remove it from the beam (this is actually toppop).
 
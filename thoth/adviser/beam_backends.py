@@ -0,0 +1,761 @@
+#!/usr/bin/env python3
+# thoth-adviser
+# Copyright(C) 2020 Fridolin Pokorny
+#
+# This program is free software: you can redistribute it and / or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Storage backends used by beam to keep states.
+
+All the backends provide the same interface as `fext.ExtHeapQueue` which is the default one:
+
+  * indexed_heap - a pure-Python indexed min-max heap, removals in O(log(N)), membership checks in O(1)
+  * array - states with scores kept in a contiguous buffer, supports score-weighted sampling in O(log(N))
+  * spill - top rated states kept in memory, lower rated states spilled to a local on-disk store
+"""
+
+import abc
+import heapq
+import logging
+import math
+import os
+import pickle
+import random
+import shutil
+import sqlite3
+import tempfile
+import weakref
+import zlib
+from array import array
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+import attr
+from fext import ExtHeapQueue
+
+from .state import State
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def score_weight(score: float, reference: float) -> float:
+    """Compute weight of a state with the given score for score-weighted sampling.
+
+    Weights are computed as exp(score - reference) so that any score (including negative ones) maps to a
+    positive weight, higher score states are preferred exponentially.
+    """
+    return math.exp(max(min(score - reference, 700.0), -700.0))
+
+
+# Weights are re-based once scores get this far from the reference score, sums of weights stay far from overflow.
+_REBASE_DISTANCE = 64.0
+
+
+class BeamBackend(metaclass=abc.ABCMeta):
+    """A base class for beam storage backends, the interface matches `fext.ExtHeapQueue'."""
+
+    __slots__: List[str] = []
+
+    @abc.abstractmethod
+    def __len__(self) -> int:
+        """Get number of items stored."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def push(self, score: float, item: Any) -> None:
+        """Push the given item, respect size configured - the lowest scored item is discarded if full."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def remove(self, item: Any) -> None:
+        """Remove the given item, raise ValueError if not present."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get(self, idx: int) -> Any:
+        """Get item based on the index to the internal storage."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get_last(self) -> Optional[Any]:
+        """Get the last item added, if the item is still present."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get_max(self) -> Any:
+        """Get item with the highest score."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get_top(self) -> Any:
+        """Get item with the lowest score."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def items(self) -> List[Any]:
+        """Get a list of all the items stored."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def clear(self) -> None:
+        """Remove all the items stored."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def contains(self, item: Any) -> bool:
+        """Check if the given item is stored."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def shrink(self, size: int) -> None:
+        """Discard the lowest scored items in place so that at most the given number is kept, size configured stays."""
+        raise NotImplementedError
+
+
+# Indexes to heap entries of the indexed heap, entries are lists to allow in-place updates.
+_MIN_KEY = 0
+_MAX_KEY = 1
+_ITEM = 2
+_MIN_POS = 3
+_MAX_POS = 4
+
+
+def _sift_up(heap: List[List[Any]], pos: int, key: int, pos_idx: int) -> None:
+    """Move entry at the given position towards the root while it is smaller than its parent."""
+    entry = heap[pos]
+    while pos > 0:
+        parent_pos = (pos - 1) >> 1
+        parent = heap[parent_pos]
+        if entry[key] < parent[key]:
+            heap[pos] = parent
+            parent[pos_idx] = pos
+            pos = parent_pos
+            continue
+        break
+
+    heap[pos] = entry
+    entry[pos_idx] = pos
+
+
+def _sift_down(heap: List[List[Any]], pos: int, key: int, pos_idx: int) -> None:
+    """Move entry at the given position towards leaves while it is larger than any of its children."""
+    end_pos = len(heap)
+    entry = heap[pos]
+    child_pos = 2 * pos + 1
+    while child_pos < end_pos:
+        right_pos = child_pos + 1
+        if right_pos < end_pos and heap[right_pos][key] < heap[child_pos][key]:
+            child_pos = right_pos
+
+        child = heap[child_pos]
+        if not child[key] < entry[key]:
+            break
+
+        heap[pos] = child
+        child[pos_idx] = pos
+        pos = child_pos
+        child_pos = 2 * pos + 1
+
+    heap[pos] = entry
+    entry[pos_idx] = pos
+
+
+def _heap_remove(heap: List[List[Any]], pos: int, key: int, pos_idx: int) -> None:
+    """Remove entry at the given position from the heap."""
+    last = heap.pop()
+    if pos == len(heap):
+        return
+
+    heap[pos] = last
+    last[pos_idx] = pos
+    _sift_down(heap, pos, key, pos_idx)
+    _sift_up(heap, last[pos_idx], key, pos_idx)
+
+
+@attr.s(slots=True)
+class IndexedHeapBackend(BeamBackend):
+    """A pure-Python indexed min-max heap.
+
+    Entries are kept in two binary heaps - a min-heap used to respect the size configured and a max-heap
+    used to retrieve the highest rated item. Each entry tracks its position in both heaps so that
+    removal is done in O(log(N)), membership is checked in O(1) using a dictionary keyed by item identity.
+    If scores are the same, the older item is treated as the higher rated one.
+    """
+
+    size = attr.ib(type=Optional[int], default=None)
+
+    _min_heap = attr.ib(type=List[List[Any]], factory=list, init=False)
+    _max_heap = attr.ib(type=List[List[Any]], factory=list, init=False)
+    _entries = attr.ib(type=Dict[int, List[Any]], factory=dict, init=False)
+    _counter = attr.ib(type=int, default=0, init=False)
+    _last = attr.ib(type=Optional[List[Any]], default=None, init=False)
+
+    def __len__(self) -> int:
+        """Get number of items stored."""
+        return len(self._min_heap)
+
+    def push(self, score: float, item: Any) -> None:
+        """Push the given item, respect size configured - the lowest scored item is discarded if full."""
+        self._counter += 1
+        min_key = (score, -self._counter)
+        if self.size is not None and len(self._min_heap) >= self.size:
+            if not self._min_heap or not self._min_heap[0][_MIN_KEY] < min_key:
+                # The item pushed is the lowest rated one, discard it.
+                self._last = None
+                return
+
+            self._remove_entry(self._min_heap[0])
+
+        entry = [min_key, (-score, self._counter), item, len(self._min_heap), len(self._max_heap)]
+        self._entries[id(item)] = entry
+        self._min_heap.append(entry)
+        _sift_up(self._min_heap, entry[_MIN_POS], _MIN_KEY, _MIN_POS)
+        self._max_heap.append(entry)
+        _sift_up(self._max_heap, entry[_MAX_POS], _MAX_KEY, _MAX_POS)
+        self._last = entry
+
+    def _remove_entry(self, entry: List[Any]) -> None:
+        """Remove the given entry from both heaps."""
+        del self._entries[id(entry[_ITEM])]
+        _heap_remove(self._min_heap, entry[_MIN_POS], _MIN_KEY, _MIN_POS)
+        _heap_remove(self._max_heap, entry[_MAX_POS], _MAX_KEY, _MAX_POS)
+        if entry is self._last:
+            self._last = None
+
+    def remove(self, item: Any) -> None:
+        """Remove the given item, raise ValueError if not present."""
+        entry = self._entries.get(id(item))
+        if entry is None:
+            raise ValueError("The given item is not present in the heap")
+
+        self._remove_entry(entry)
+
+    def get(self, idx: int) -> Any:
+        """Get item based on the index to the internal min-heap."""
+        return self._min_heap[idx][_ITEM]
+
+    def get_last(self) -> Optional[Any]:
+        """Get the last item added, if the item is still present."""
+        return self._last[_ITEM] if self._last is not None else None
+
+    def get_max(self) -> Any:
+        """Get item with the highest score, in O(1)."""
+        if not self._max_heap:
+            raise ValueError("The heap is empty")
+
+        return self._max_heap[0][_ITEM]
+
+    def get_top(self) -> Any:
+        """Get item with the lowest score, in O(1)."""
+        if not self._min_heap:
+            raise ValueError("The heap is empty")
+
+        return self._min_heap[0][_ITEM]
+
+    def items(self) -> List[Any]:
+        """Get a list of all the items stored, in order of the internal min-heap."""
+        return [entry[_ITEM] for entry in self._min_heap]
+
+    def clear(self) -> None:
+        """Remove all the items stored."""
+        self._min_heap.clear()
+        self._max_heap.clear()
+        self._entries.clear()
+        self._last = None
+
+    def contains(self, item: Any) -> bool:
+        """Check if the given item is stored, in O(1)."""
+        return id(item) in self._entries
+
+    def shrink(self, size: int) -> None:
+        """Discard the lowest scored items so that at most the given number is kept, in O(K log(N))."""
+        while len(self._min_heap) > size:
+            self._remove_entry(self._min_heap[0])
+
+
+@attr.s(slots=True)
+class ArrayBackend(BeamBackend):
+    """Items with scores kept in contiguous buffers.
+
+    Items are stored densely - a removed item is replaced with the last one. Scores are kept in a contiguous
+    buffer of doubles so that min/max lookups run at C speed over the buffer. Weights for score-weighted
+    sampling are kept in a Fenwick tree, sampling and updates are done in O(log(N)).
+
+    Respecting size and retrieving the highest rated item requires a scan of the score buffer, the backend
+    suits best beams without width set or predictors sampling states rather than picking the highest rated one.
+    """
+
+    size = attr.ib(type=Optional[int], default=None)
+
+    _items = attr.ib(type=List[Any], factory=list, init=False)
+    _scores = attr.ib(type="array[float]", factory=lambda: array("d"), init=False)
+    _index = attr.ib(type=Dict[int, int], factory=dict, init=False)
+    _tree = attr.ib(type="array[float]", factory=lambda: array("d", [0.0]), init=False)
+    _weights = attr.ib(type="array[float]", factory=lambda: array("d"), init=False)
+    _reference = attr.ib(type=Optional[float], default=None, init=False)
+    _last = attr.ib(type=Any, default=None, init=False)
+
+    def __len__(self) -> int:
+        """Get number of items stored."""
+        return len(self._items)
+
+    def _tree_add(self, idx: int, delta: float) -> None:
+        """Add the given delta to weight at the given index."""
+        tree = self._tree
+        idx += 1
+        while idx < len(tree):
+            tree[idx] += delta
+            idx += idx & -idx
+
+    def _tree_grow(self) -> None:
+        """Double capacity of the Fenwick tree, rebuild it in O(N)."""
+        self._tree_build(2 * (len(self._tree) - 1) or 16)
+
+    def _tree_build(self, capacity: int) -> None:
+        """Build the Fenwick tree of the given capacity out of weights stored, in O(N)."""
+        tree = array("d", bytes(8 * (capacity + 1)))
+        tree[1 : len(self._weights) + 1] = self._weights
+        for i in range(1, capacity + 1):
+            parent = i + (i & -i)
+            if parent <= capacity:
+                tree[parent] += tree[i]
+
+        self._tree = tree
+
+    def _set_weight(self, idx: int, weight: float) -> None:
+        """Set weight of the item at the given index."""
+        self._tree_add(idx, weight - self._weights[idx])
+        self._weights[idx] = weight
+
+    def _rebase(self, reference: float) -> None:
+        """Recompute weights relative to the given reference score, in O(N)."""
+        self._reference = reference
+        self._weights = array("d", (score_weight(score, reference) for score in self._scores))
+        self._tree_build(len(self._tree) - 1)
+
+    def _append(self, score: float, item: Any) -> None:
+        """Append the given item at the end of buffers."""
+        if self._reference is None:
+            self._reference = score
+        elif score - self._reference > _REBASE_DISTANCE:
+            # The highest score moved up, keep weights bounded.
+            self._rebase(score)
+
+        idx = len(self._items)
+        self._items.append(item)
+        self._scores.append(score)
+        self._weights.append(0.0)
+        self._index[id(item)] = idx
+        if idx + 1 >= len(self._tree):
+            self._tree_grow()
+
+        self._set_weight(idx, score_weight(score, self._reference))
+
+    def _remove_idx(self, idx: int) -> None:
+        """Remove item at the given index, move the last item to its place."""
+        item = self._items[idx]
+        del self._index[id(item)]
+        if item is self._last:
+            self._last = None
+
+        last_idx = len(self._items) - 1
+        if idx != last_idx:
+            last_item = self._items[last_idx]
+            self._items[idx] = last_item
+            self._scores[idx] = self._scores[last_idx]
+            self._index[id(last_item)] = idx
+            self._set_weight(idx, self._weights[last_idx])
+
+        self._set_weight(last_idx, 0.0)
+        self._items.pop()
+        self._scores.pop()
+        self._weights.pop()
+
+    def push(self, score: float, item: Any) -> None:
+        """Push the given item, respect size configured - the lowest scored item is discarded if full."""
+        if self.size is not None and len(self._items) >= self.size:
+            min_score = min(self._scores, default=None)
+            if min_score is None or score <= min_score:
+                self._last = None
+                return
+
+            self._remove_idx(self._scores.index(min_score))
+
+        self._append(score, item)
+        self._last = item
+
+    def remove(self, item: Any) -> None:
+        """Remove the given item, raise ValueError if not present."""
+        idx = self._index.get(id(item))
+        if idx is None:
+            raise ValueError("The given item is not present in the array")
+
+        self._remove_idx(idx)
+
+    def get(self, idx: int) -> Any:
+        """Get item based on the index to the internal buffer."""
+        return self._items[idx]
+
+    def get_last(self) -> Optional[Any]:
+        """Get the last item added, if the item is still present."""
+        return self._last
+
+    def get_max(self) -> Any:
+        """Get item with the highest score, if there are more the one stored on the lowest index is returned."""
+        if not self._items:
+            raise ValueError("The array is empty")
+
+        return self._items[self._scores.index(max(self._scores))]
+
+    def get_top(self) -> Any:
+        """Get item with the lowest score."""
+        if not self._items:
+            raise ValueError("The array is empty")
+
+        return self._items[self._scores.index(min(self._scores))]
+
+    def items(self) -> List[Any]:
+        """Get a list of all the items stored."""
+        return list(self._items)
+
+    def clear(self) -> None:
+        """Remove all the items stored."""
+        self._items.clear()
+        self._scores = array("d")
+        self._weights = array("d")
+        self._tree = array("d", [0.0])
+        self._index.clear()
+        self._reference = None
+        self._last = None
+
+    def contains(self, item: Any) -> bool:
+        """Check if the given item is stored, in O(1)."""
+        return id(item) in self._index
+
+    def shrink(self, size: int) -> None:
+        """Discard the lowest scored items so that at most the given number is kept, in O(N log(K))."""
+        to_remove = heapq.nsmallest(
+            max(len(self._items) - size, 0), range(len(self._items)), key=self._scores.__getitem__
+        )
+        # Removal moves the last item in place of the removed one, remove from the end to keep indexes valid.
+        for idx in sorted(to_remove, reverse=True):
+            self._remove_idx(idx)
+
+    def get_random_weighted(self, rand: Callable[[], float] = random.random) -> Any:
+        """Get a random item, probability of picking an item is proportional to its weight - see score_weight."""
+        if not self._items:
+            raise IndexError("Cannot choose from an empty array")
+
+        total_weight = self._total_weight()
+        if total_weight < math.exp(-_REBASE_DISTANCE):
+            # The highest rated items were removed, keep weights of the ones stored representable.
+            self._rebase(max(self._scores))
+            total_weight = self._total_weight()
+
+        tree = self._tree
+        target = rand() * total_weight
+        idx = 0
+        step = 1 << (len(tree) - 1).bit_length()
+        while step:
+            next_idx = idx + step
+            if next_idx < len(tree) and tree[next_idx] <= target:
+                idx = next_idx
+                target -= tree[next_idx]
+            step >>= 1
+
+        # Guard against floating point errors accumulated in the tree.
+        return self._items[min(idx, len(self._items) - 1)]
+
+    def _total_weight(self) -> float:
+        """Get sum of all the weights stored."""
+        idx = len(self._items)
+        total = 0.0
+        tree = self._tree
+        while idx > 0:
+            total += tree[idx]
+            idx -= idx & -idx
+
+        return total
+
+
+def _spill_memory_size() -> int:
+    """Get number of states kept in memory by the spill backend."""
+    return int(os.getenv("THOTH_ADVISER_BEAM_SPILL_MEMORY_SIZE", 25000))
+
+
+def _remove_spill_directory(path: str) -> None:
+    """Remove directory used to spill states."""
+    shutil.rmtree(path, ignore_errors=True)
+
+
+@attr.s(slots=True)
+class SpillBackend(BeamBackend):
+    """Keep top rated states in memory, spill lower rated states to a local on-disk store.
+
+    The in-memory part is an indexed heap of at most `memory_size' states. Once full, the lowest rated
+    states are serialized (see State.to_dict) and stored in an SQLite database created in a temporary
+    directory (THOTH_ADVISER_BEAM_SPILL_DIR if set). The last state added and the state being expanded (see
+    pin) are never spilled and are kept in memory on top of `memory_size' states. Spilled states are brought
+    back in batches once the in-memory part runs dry or a spilled state is rated higher than any state kept
+    in memory.
+
+    Spilled states are tracked by their identity - they can be checked and removed as states kept in memory.
+    If a spilled state is still referenced once brought back, the very same object is kept in memory again,
+    otherwise it is loaded as a new object with its parent not kept. Indexing (get) and listing (items)
+    operate solely on states kept in memory.
+    """
+
+    size = attr.ib(type=Optional[int], default=None)
+    memory_size = attr.ib(type=int, kw_only=True, factory=_spill_memory_size)
+
+    _memory = attr.ib(type=IndexedHeapBackend, factory=IndexedHeapBackend, init=False)
+    _connection = attr.ib(type=Optional[sqlite3.Connection], default=None, init=False)
+    _finalizer = attr.ib(type=Optional[weakref.finalize], default=None, init=False)
+    # Spilled states by their id - sequence number of the row stored and a weak reference to the state.
+    _spilled = attr.ib(type=Dict[int, Tuple[int, "weakref.ReferenceType[Any]"]], factory=dict, init=False)
+    _disk_size = attr.ib(type=int, default=0, init=False)
+    _disk_max = attr.ib(type=Optional[float], default=None, init=False)
+    _counter = attr.ib(type=int, default=0, init=False)
+    _last = attr.ib(type=Any, default=None, init=False)
+    _pinned = attr.ib(type=Any, default=None, init=False)
+    spilled_count = attr.ib(type=int, default=0, init=False)
+    loaded_count = attr.ib(type=int, default=0, init=False)
+
+    @memory_size.validator
+    def _memory_size_validator(self, _: Any, value: int) -> None:
+        """Validate number of states kept in memory."""
+        if not isinstance(value, int) or value <= 0:
+            raise ValueError(f"Number of states kept in memory has to be a positive integer, got {value!r}")
+
+    def _get_connection(self) -> sqlite3.Connection:
+        """Get connection to the on-disk store, create it if not created yet."""
+        if self._connection is None:
+            directory = tempfile.mkdtemp(prefix="thoth-adviser-beam-", dir=os.getenv("THOTH_ADVISER_BEAM_SPILL_DIR"))
+            _LOGGER.info("Spilling beam states to %r", directory)
+            self._connection = sqlite3.connect(os.path.join(directory, "beam.sqlite3"), isolation_level=None)
+            self._connection.execute("PRAGMA journal_mode = OFF")
+            self._connection.execute("PRAGMA synchronous = OFF")
+            self._connection.execute(
+                "CREATE TABLE states "
+                "(seq INTEGER PRIMARY KEY, score REAL NOT NULL, item_id INTEGER NOT NULL, data BLOB NOT NULL)"
+            )
+            self._connection.execute("CREATE INDEX states_score ON states (score, seq)")
+            self._finalizer = weakref.finalize(self, _remove_spill_directory, directory)
+
+        return self._connection
+
+    def _spill(self, score: float, item: State) -> None:
+        """Store the given state on disk."""
+        self._counter += 1
+        seq = self._counter
+        data = zlib.compress(pickle.dumps(item.to_dict(), protocol=pickle.HIGHEST_PROTOCOL), 1)
+        self._get_connection().execute("INSERT INTO states VALUES (?, ?, ?, ?)", (seq, score, id(item), data))
+
+        spilled = self._spilled
+        item_id = id(item)
+
+        def _forget(_: "weakref.ReferenceType[Any]") -> None:
+            # The state is not referenced anymore, its id can be reused by another object.
+            entry = spilled.get(item_id)
+            if entry is not None and entry[0] == seq:
+                del spilled[item_id]
+
+        spilled[item_id] = (seq, weakref.ref(item, _forget))
+        self._disk_size += 1
+        self.spilled_count += 1
+        if self._disk_max is None or score > self._disk_max:
+            self._disk_max = score
+
+    def _spill_excess(self) -> None:
+        """Spill the lowest rated states kept in memory over the memory size, the last and pinned state stay."""
+        kept = []
+        while len(self._memory) > self.memory_size:
+            lowest = self._memory.get_top()
+            self._memory.remove(lowest)
+            if lowest is self._last or lowest is self._pinned:
+                # Not accounted to the memory size so that the highest rated state is always kept in memory.
+                kept.append(lowest)
+            else:
+                self._spill(lowest.score, lowest)
+
+        for item in kept:
+            self._memory.push(item.score, item)
+
+    def _delete_row(self, seq: int, item_id: int) -> None:
+        """Delete the given row from the on-disk store."""
+        connection = self._get_connection()
+        connection.execute("DELETE FROM states WHERE seq = ?", (seq,))
+        entry = self._spilled.get(item_id)
+        if entry is not None and entry[0] == seq:
+            del self._spilled[item_id]
+
+        self._disk_size -= 1
+        if self._disk_size == 0:
+            self._disk_max = None
+        else:
+            self._disk_max = connection.execute("SELECT MAX(score) FROM states").fetchone()[0]
+
+    def _load(self) -> None:
+        """Bring the highest rated spilled states back to memory."""
+        connection = self._get_connection()
+        batch_size = max(self.memory_size // 2, 1)
+        rows = connection.execute(
+            "SELECT seq, score, item_id, data FROM states ORDER BY score DESC, seq ASC LIMIT ?", (batch_size,)
+        ).fetchall()
+        connection.executemany("DELETE FROM states WHERE seq = ?", ((row[0],) for row in rows))
+
+        for seq, score, item_id, data in rows:
+            state = None
+            entry = self._spilled.get(item_id)
+            if entry is not None and entry[0] == seq:
+                del self._spilled[item_id]
+                state = entry[1]()
+
+            if state is None:
+                state = State.from_dict(pickle.loads(zlib.decompress(data)))
+
+            self._memory.push(score, state)
+
+        self._disk_size -= len(rows)
+        self.loaded_count += len(rows)
+        self._disk_max = connection.execute("SELECT MAX(score) FROM states").fetchone()[0] if self._disk_size else None
+        self._spill_excess()
+
+    def _ensure_loaded(self) -> None:
+        """Load spilled states if the in-memory part ran dry or the highest rated state is on disk."""
+        if self._disk_size > 0 and (len(self._memory) == 0 or self._disk_max > self._memory.get_max().score):
+            self._load()
+
+    def _is_spilled(self, item: Any) -> bool:
+        """Check if the given item is spilled to disk."""
+        entry = self._spilled.get(id(item))
+        return entry is not None and entry[1]() is item
+
+    def __len__(self) -> int:
+        """Get number of items stored, in memory and on disk."""
+        return len(self._memory) + self._disk_size
+
+    def _discard_lowest(self) -> None:
+        """Discard the lowest rated item stored, in memory or on disk."""
+        memory_lowest = self._memory.get_top() if len(self._memory) > 0 else None
+        disk_lowest = None
+        if self._disk_size > 0:
+            disk_lowest = (
+                self._get_connection()
+                .execute("SELECT seq, score, item_id FROM states ORDER BY score ASC, seq DESC LIMIT 1")
+                .fetchone()
+            )
+
+        if disk_lowest is not None and (memory_lowest is None or disk_lowest[1] <= memory_lowest.score):
+            self._delete_row(disk_lowest[0], disk_lowest[2])
+            return
+
+        self._memory.remove(memory_lowest)
+        if memory_lowest is self._last:
+            self._last = None
+
+    def _lowest_score(self) -> float:
+        """Get the lowest score of items stored, in memory or on disk."""
+        lowest = self._memory.get_top().score if len(self._memory) > 0 else math.inf
+        if self._disk_size > 0:
+            lowest = min(lowest, self._get_connection().execute("SELECT MIN(score) FROM states").fetchone()[0])
+
+        return lowest  # type: ignore
+
+    def push(self, score: float, item: Any) -> None:
+        """Push the given item, respect size configured - the lowest scored item is discarded if full."""
+        if self.size is not None and len(self) >= self.size:
+            if score <= self._lowest_score():
+                self._last = None
+                return
+
+            self._discard_lowest()
+
+        self._memory.push(score, item)
+        self._last = item
+        self._spill_excess()
+
+    def pin(self, item: Optional[Any]) -> None:
+        """Keep the given item in memory until another one is pinned, used for the state being expanded."""
+        self._pinned = item
+
+    def remove(self, item: Any) -> None:
+        """Remove the given item, kept in memory or spilled, raise ValueError if not present."""
+        if self._memory.contains(item):
+            self._memory.remove(item)
+        elif self._is_spilled(item):
+            self._delete_row(self._spilled[id(item)][0], id(item))
+        else:
+            raise ValueError("The given item is not present in the spill backend")
+
+        if item is self._last:
+            self._last = None
+
+        self._ensure_loaded()
+
+    def get(self, idx: int) -> Any:
+        """Get item based on the index to the in-memory part, indexes beyond the in-memory part wrap around."""
+        self._ensure_loaded()
+        return self._memory.get(idx % len(self._memory) if self._memory else idx)
+
+    def get_last(self) -> Optional[Any]:
+        """Get the last item added, if the item is still present."""
+        return self._last
+
+    def get_max(self) -> Any:
+        """Get item with the highest score."""
+        self._ensure_loaded()
+        return self._memory.get_max()
+
+    def get_top(self) -> Any:
+        """Get item with the lowest score kept in memory."""
+        self._ensure_loaded()
+        return self._memory.get_top()
+
+    def items(self) -> List[Any]:
+        """Get a list of items kept in memory."""
+        self._ensure_loaded()
+        return self._memory.items()
+
+    def clear(self) -> None:
+        """Remove all the items stored."""
+        self._memory.clear()
+        if self._connection is not None:
+            self._connection.execute("DELETE FROM states")
+
+        self._spilled.clear()
+        self._disk_size = 0
+        self._disk_max = None
+        self._last = None
+        self._pinned = None
+
+    def contains(self, item: Any) -> bool:
+        """Check if the given item is stored, in memory or on disk."""
+        return self._memory.contains(item) or self._is_spilled(item)
+
+    def shrink(self, size: int) -> None:
+        """Discard the lowest scored items so that at most the given number is kept, in memory or on disk."""
+        while len(self) > size:
+            self._discard_lowest()
+
+
+BEAM_BACKENDS: Dict[str, Callable[[Optional[int]], Any]] = {
+    "fext": lambda size: ExtHeapQueue(size=size) if size is not None else ExtHeapQueue(),
+    "indexed_heap": IndexedHeapBackend,
+    "array": ArrayBackend,
+    "spill": SpillBackend,
+}
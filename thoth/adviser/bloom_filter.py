@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# thoth-adviser
+# Copyright(C) 2020 Fridolin Pokorny
+#
+# This program is free software: you can redistribute it and / or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Bloom filters for approximate membership queries on integer fingerprints."""
+
+import math
+from typing import List
+from typing import Tuple
+
+import attr
+
+
+_MASK64 = (1 << 64) - 1
+# Odd constant used to derive the second hash out of the fingerprint (golden ratio in 64 bits).
+_GOLDEN64 = 0x9E3779B97F4A7C15
+
+
+@attr.s(slots=True)
+class BloomFilter:
+    """A Bloom filter sized for the given capacity and false positive rate.
+
+    Items are integer fingerprints (e.g. digests converted to int), indexes are computed using double hashing.
+    """
+
+    capacity = attr.ib(type=int)
+    false_positive_rate = attr.ib(type=float)
+
+    size = attr.ib(type=int, default=0, init=False)
+    _bit_count = attr.ib(type=int, default=0, init=False)
+    _hash_count = attr.ib(type=int, default=0, init=False)
+    _bits = attr.ib(type=bytearray, factory=bytearray, init=False)
+
+    @capacity.validator
+    def _capacity_validator(self, _: str, value: int) -> None:
+        """Validate capacity is a positive integer."""
+        if not isinstance(value, int) or value <= 0:
+            raise ValueError(f"Capacity of a Bloom filter has to be a positive integer, got {value!r}")
+
+    @false_positive_rate.validator
+    def _false_positive_rate_validator(self, _: str, value: float) -> None:
+        """Validate false positive rate is a probability excluding its bounds."""
+        if not isinstance(value, float) or not 0.0 < value < 1.0:
+            raise ValueError(f"False positive rate has to be a float in range (0, 1), got {value!r}")
+
+    def __attrs_post_init__(self) -> None:
+        """Allocate bits based on capacity and false positive rate requested."""
+        self._bit_count = max(8, math.ceil(-self.capacity * math.log(self.false_positive_rate) / math.log(2) ** 2))
+        self._hash_count = max(1, math.ceil(-math.log2(self.false_positive_rate)))
+        self._bits = bytearray((self._bit_count + 7) // 8)
+
+    @property
+    def memory(self) -> int:
+        """Get number of bytes allocated for bits."""
+        return len(self._bits)
+
+    @property
+    def estimated_false_positive_rate(self) -> float:
+        """Estimate false positive rate based on the number of items added."""
+        return float((1.0 - math.exp(-self._hash_count * self.size / self._bit_count)) ** self._hash_count)
+
+    def _get_hashes(self, item: int) -> Tuple[int, int]:
+        """Get the first bit index and a step used to compute the remaining ones using double hashing."""
+        first = item & _MASK64
+        second = ((item >> 64) ^ (first * _GOLDEN64)) & _MASK64
+        return first % self._bit_count, second % (self._bit_count - 1) + 1
+
+    def __contains__(self, item: int) -> bool:
+        """Check if the given item was (probably) added to the filter."""
+        bits, bit_count = self._bits, self._bit_count
+        index, step = self._get_hashes(item)
+        for _ in range(self._hash_count):
+            if not bits[index >> 3] & (1 << (index & 7)):
+                return False
+
+            index += step
+            if index >= bit_count:
+                index -= bit_count
+
+        return True
+
+    def add(self, item: int) -> bool:
+        """Add the given item to the filter, return True if the item was (probably) present already."""
+        bits, bit_count = self._bits, self._bit_count
+        index, step = self._get_hashes(item)
+        present = True
+        for _ in range(self._hash_count):
+            mask = 1 << (index & 7)
+            if not bits[index >> 3] & mask:
+                present = False
+                bits[index >> 3] |= mask
+
+            index += step
+            if index >= bit_count:
+                index -= bit_count
+
+        if not present:
+            self.size += 1
+
+        return present
+
+
+@attr.s(slots=True)
+class ScalableBloomFilter:
+    """A scalable Bloom filter - a series of Bloom filters growing as items are added.
+
+    Once a filter reaches its capacity, a new one is created with capacity multiplied by `growth_factor' and its
+    false positive rate multiplied by `tightening_ratio'. The false positive rate of the first filter is chosen so
+    that the compound false positive rate stays bounded by the one requested.
+    """
+
+    initial_capacity = attr.ib(type=int)
+    false_positive_rate = attr.ib(type=float)
+    growth_factor = attr.ib(type=int, default=2, kw_only=True)
+    tightening_ratio = attr.ib(type=float, default=0.5, kw_only=True)
+
+    _filters = attr.ib(type=List[BloomFilter], factory=list, init=False)
+
+    def __attrs_post_init__(self) -> None:
+        """Create the first Bloom filter."""
+        self.clear()
+
+    @property
+    def size(self) -> int:
+        """Get number of items added."""
+        return sum(bloom_filter.size for bloom_filter in self._filters)
+
+    @property
+    def memory(self) -> int:
+        """Get number of bytes allocated for bits across all the filters."""
+        return sum(bloom_filter.memory for bloom_filter in self._filters)
+
+    @property
+    def filter_count(self) -> int:
+        """Get number of Bloom filters allocated."""
+        return len(self._filters)
+
+    @property
+    def estimated_false_positive_rate(self) -> float:
+        """Estimate compound false positive rate based on the number of items added."""
+        probability = 1.0
+        for bloom_filter in self._filters:
+            probability *= 1.0 - bloom_filter.estimated_false_positive_rate
+
+        return 1.0 - probability
+
+    def clear(self) -> None:
+        """Remove all the items added."""
+        self._filters = [
+            BloomFilter(self.initial_capacity, self.false_positive_rate * (1.0 - self.tightening_ratio)),
+        ]
+
+    def __contains__(self, item: int) -> bool:
+        """Check if the given item was (probably) added to the filter."""
+        return any(item in bloom_filter for bloom_filter in self._filters)
+
+    def add(self, item: int) -> bool:
+        """Add the given item to the filter, return True if the item was (probably) present already."""
+        filters = self._filters
+        for bloom_filter in filters[:-1]:
+            if item in bloom_filter:
+                return True
+
+        bloom_filter = filters[-1]
+        if bloom_filter.size < bloom_filter.capacity:
+            return bloom_filter.add(item)
+
+        if item in bloom_filter:
+            return True
+
+        bloom_filter = BloomFilter(
+            bloom_filter.capacity * self.growth_factor,
+            bloom_filter.false_positive_rate * self.tightening_ratio,
+        )
+        filters.append(bloom_filter)
+        return bloom_filter.add(item)
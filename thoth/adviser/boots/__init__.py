@@ -17,13 +17,7 @@
 
 """Boot units implemented in adviser."""
 
-from .fully_specified_environment import FullySpecifiedEnvironment
-from .platform import PlatformBoot
-from .pipfile_hash import PipfileHashBoot
-from .python_version import PythonVersionBoot
-from .rhel_version import RHELVersionBoot
-from .solved_software_environment import SolvedSoftwareEnvironmentBoot
-from .ubi import UbiBoot
+from ..unit_registry import lazy_unit_getattr
 
 # from ._debug import MemTraceBoot
 
@@ -42,3 +36,5 @@ __all__ = [
     "FullySpecifiedEnvironment",
     "SolvedSoftwareEnvironmentBoot",
 ]
+
+__getattr__ = lazy_unit_getattr(__name__, __all__)
@@ -17,9 +17,10 @@
 
 """Boot units implemented in adviser for debugging the pipeline run."""
 
-from .memtrace import MemTraceBoot
-
+from ...unit_registry import lazy_unit_getattr
 
 __all__ = [
     "MemTraceBoot",
 ]
+
+__getattr__ = lazy_unit_getattr(__name__, __all__)
@@ -119,7 +119,7 @@ def _get_adviser_predictor(predictor: str, recommendation_type: RecommendationTy
         return getattr(predictors, predictor), {}
 
     if recommendation_type == RecommendationType.LATEST:
-        return predictors.ApproximatingLatest, {}
+        return predictors.DepthFirst, {}
     elif (
         recommendation_type == RecommendationType.STABLE
         or recommendation_type == RecommendationType.TESTING
@@ -148,7 +148,7 @@ def _get_dependency_monkey_predictor(predictor: str, decision_type: DecisionType
     if decision_type == DecisionType.RANDOM:
         return predictors.RandomWalk
     elif decision_type == DecisionType.ALL:
-        return predictors.ApproximatingLatest
+        return predictors.DepthFirst
 
     raise ValueError(f"Unknown decision type: {decision_type!r}")
 
@@ -555,7 +555,7 @@ def advise(
     metavar="OUTPUT",
     required=True,
     help="Output directory or remote API to print results to, in case of URL a POST request "
-    "is issued to the Amun REST API.",
+    "is issued to the Amun REST API, in case of a path ending with .jsonl stacks are appended to an indexed archive.",
 )
 @click.option(
     "--library-usage",
@@ -573,6 +573,15 @@ def advise(
     default="-",
     help="Output directory or remote API where reports of dependency monkey run should be posted..",
 )
+@click.option(
+    "--responses-output",
+    type=str,
+    envvar="THOTH_DEPENDENCY_MONKEY_RESPONSES_OUTPUT",
+    metavar="RESPONSES_OUTPUT",
+    default=None,
+    help="A JSON lines file to which responses are streamed as stacks are generated; the report then keeps "
+    "only summary statistics and references this file.",
+)
 @click.option(
     "--seed",
     envvar="THOTH_DEPENDENCY_MONKEY_SEED",
@@ -586,6 +595,24 @@ def advise(
     default=Resolver.DEFAULT_COUNT,
     help="Number of software stacks that should be computed.",
 )
+@click.option(
+    "--offset",
+    type=int,
+    envvar="THOTH_DEPENDENCY_MONKEY_OFFSET",
+    default=0,
+    show_default=True,
+    help="Number of software stacks resolved first that should be skipped, used to resume a previous run "
+    "when all the software stacks are generated.",
+)
+@click.option(
+    "--workers",
+    type=int,
+    envvar="THOTH_DEPENDENCY_MONKEY_WORKERS",
+    default=1,
+    show_default=True,
+    help="Number of worker processes, each generating software stacks from a disjoint part of the state space; "
+    "stacks are written into a separate output directory per worker; cannot be combined with --offset.",
+)
 @click.option(
     "--decision-type",
     required=False,
@@ -673,11 +700,14 @@ def dependency_monkey(
     beam_width: int,
     count: int,
     decision_type: str,
+    offset: int,
+    workers: int,
     predictor: str,
     report_output: str,
     requirements: str,
     requirements_format: str,
     stack_output: str,
+    responses_output: Optional[str] = None,
     predictor_config: Optional[str] = None,
     context: Optional[str] = None,
     dry_run: bool = False,
@@ -754,6 +784,9 @@ def dependency_monkey(
         context=context_content,
         dry_run=dry_run,
         decision_type=decision_type,
+        offset=offset,
+        workers=workers,
+        responses_output=responses_output,
     )
 
     print_func = _PrintFunc(
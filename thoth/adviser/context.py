@@ -23,17 +23,18 @@ from typing import List
 from typing import Optional
 from typing import Generator
 from typing import Tuple
-from typing import Set
 import operator
 import heapq
 
 import attr
-
 from thoth.python import PackageVersion
 from thoth.python import Source
 from thoth.python import Project
 from thoth.storages import GraphDatabase
 
+from .adjacency import Dependencies
+from .adjacency import DependencyGraph
+from .adjacency import Dependents
 from .beam import Beam
 from .exceptions import NotFound
 from .enums import RecommendationType
@@ -62,28 +63,19 @@ class Context:
         kw_only=True,
         default=attr.Factory(dict),
     )
+    _dependency_graph = attr.ib(type=DependencyGraph, init=False, factory=DependencyGraph)
+    # Views on the dependency graph above, they behave like nested dictionaries:
+    #   dependencies[package_name][package_tuple] -> dependency tuples
+    #   dependents[package_name][dependency_tuple] -> (package_tuple, os_name, os_version, python_version)
     dependencies = attr.ib(
-        type=Dict[str, Dict[Tuple[str, str, str], Set[Tuple[str, str, str]]]],
+        type=Dependencies,
         kw_only=True,
-        default=attr.Factory(dict),
+        default=attr.Factory(lambda self: self._dependency_graph.dependencies, takes_self=True),
     )
     dependents = attr.ib(
-        type=Dict[
-            str,
-            Dict[
-                Tuple[str, str, str],
-                Set[
-                    Tuple[
-                        Tuple[str, str, str],
-                        Optional[str],
-                        Optional[str],
-                        Optional[str],
-                    ]
-                ],
-            ],
-        ],
+        type=Dependents,
         kw_only=True,
-        default=attr.Factory(dict),
+        default=attr.Factory(lambda self: self._dependency_graph.dependents, takes_self=True),
     )
     sources = attr.ib(type=Dict[str, Source], kw_only=True, default=attr.Factory(dict))
     iteration = attr.ib(type=int, default=0, kw_only=True)
@@ -98,6 +90,27 @@ class Context:
         default=attr.Factory(list),
     )
     _accepted_states_counter = attr.ib(type=int, kw_only=True, default=0)
+    # The best item out of accepted states, maintained incrementally to avoid scanning the heap above.
+    _accepted_states_top = attr.ib(
+        type=Optional[Tuple[Tuple[float, int], State]],
+        kw_only=True,
+        default=None,
+    )
+    # Package tuples registered, but without PackageVersion instantiated yet: package tuple -> (develop, extras).
+    _package_tuples_lazy = attr.ib(
+        type=Dict[Tuple[str, str, str], Tuple[bool, Optional[List[str]]]],
+        kw_only=True,
+        default=attr.Factory(dict),
+    )
+    # Package name -> version string -> rank; ranks are computed based on semantic versions, newer is higher.
+    # Ranks of a package are computed on the first query and discarded once a new version is registered.
+    _version_ranks = attr.ib(type=Dict[str, Dict[str, int]], kw_only=True, default=attr.Factory(dict))
+    # Package name -> version string -> semantic version seen, parsed once ranks are computed if not known.
+    _versions_seen = attr.ib(
+        type=Dict[str, Dict[str, Any]],
+        kw_only=True,
+        default=attr.Factory(dict),
+    )
 
     def __attrs_post_init__(self) -> None:
         """Verify we have only adviser or dependency monkey specific context."""
@@ -115,16 +128,108 @@ class Context:
         """Get accepted final states by resolution pipeline sorted by score and their precedence."""
         return (item[1] for item in sorted(self._accepted_states, key=operator.itemgetter(0), reverse=reverse))
 
+    def iter_top_accepted_final_states(self, k: int) -> Generator[State, None, None]:
+        """Get k best accepted final states sorted by score and their precedence, selected lazily in O(N log(k))."""
+        yield from (item[1] for item in heapq.nlargest(k, self._accepted_states, key=operator.itemgetter(0)))
+
     def get_package_version(
         self, package_tuple: Tuple[str, str, str], *, graceful: bool = False
     ) -> Optional[PackageVersion]:
-        """Get the given package version registered to the context."""
+        """Get the given package version registered to the context.
+
+        Package versions of package tuples registered using `register_package_tuple' are instantiated
+        lazily on the first access.
+        """
         package_version = self.package_versions.get(package_tuple)
-        if package_version is None and not graceful:
-            raise NotFound(f"Package {package_tuple!r} not found in the pipeline context")
+        if package_version is None:
+            lazy_entry = self._package_tuples_lazy.pop(package_tuple, None)
+            if lazy_entry is not None:
+                package_version = self._instantiate_package_version(package_tuple, *lazy_entry)
+            elif not graceful:
+                raise NotFound(f"Package {package_tuple!r} not found in the pipeline context")
 
         return package_version
 
+    def _instantiate_package_version(
+        self, package_tuple: Tuple[str, str, str], develop: bool, extras: Optional[List[str]]
+    ) -> PackageVersion:
+        """Instantiate a package version representative of the given package tuple and keep it in the context."""
+        source = self.sources.get(package_tuple[2])
+        if not source:
+            source = Source(package_tuple[2])
+            self.sources[package_tuple[2]] = source
+
+        package_version = PackageVersion(
+            name=package_tuple[0],
+            version="==" + package_tuple[1],
+            index=source,
+            extras=extras,
+            develop=develop,
+        )
+        self.package_versions[package_tuple] = package_version
+        return package_version
+
+    @property
+    def package_tuples_count(self) -> int:
+        """Get number of package tuples registered to the context, regardless of their package versions instantiated."""
+        return len(self.package_versions) + len(self._package_tuples_lazy)
+
+    def is_package_tuple_registered(self, package_tuple: Tuple[str, str, str]) -> bool:
+        """Check if the given package tuple is registered to the context, do not instantiate its package version."""
+        return package_tuple in self.package_versions or package_tuple in self._package_tuples_lazy
+
+    def get_package_version_rank(self, package_tuple: Tuple[str, str, str]) -> int:
+        """Get rank of the given package version within versions of the same package registered to the context.
+
+        Ranks are integers respecting semantic version ordering - a newer version has a higher rank, equal
+        versions share the same rank. Ranks are comparable only across package tuples of the same package
+        and are valid until a new version of the same package is registered. Ranks of a package are computed
+        on the first query after registering its new versions.
+        """
+        ranks = self._version_ranks.get(package_tuple[0])
+        if ranks is None:
+            versions = self._versions_seen.get(package_tuple[0])
+            if versions is None:
+                raise NotFound(f"Package {package_tuple!r} not found in the pipeline context")
+
+            ranks = self._compute_version_ranks(versions)
+            self._version_ranks[package_tuple[0]] = ranks
+
+        rank = ranks.get(package_tuple[1])
+        if rank is None:
+            raise NotFound(f"Package {package_tuple!r} not found in the pipeline context")
+
+        return rank
+
+    @staticmethod
+    def _compute_version_ranks(versions: Dict[str, Any]) -> Dict[str, int]:
+        """Compute ranks of the given versions, semantic versions not known yet are parsed and kept."""
+        for version, semantic_version in versions.items():
+            if semantic_version is None:
+                versions[version] = PackageVersion.parse_semantic_version(version)
+
+        ranks = {}
+        rank = -1
+        previous = None
+        for version, semantic_version in sorted(versions.items(), key=operator.itemgetter(1)):
+            if rank < 0 or semantic_version != previous:
+                # Different version strings can state the same version (e.g. 1.0 and 1.0.0).
+                rank += 1
+                previous = semantic_version
+
+            ranks[version] = rank
+
+        return ranks
+
+    def _note_version(self, package_tuple: Tuple[str, str, str], semantic_version: Any = None) -> None:
+        """Note the given package version, ranks of the package are recomputed on the next query if new."""
+        versions = self._versions_seen.setdefault(package_tuple[0], {})
+        if package_tuple[1] not in versions:
+            versions[package_tuple[1]] = semantic_version
+            self._version_ranks.pop(package_tuple[0], None)
+        elif versions[package_tuple[1]] is None:
+            versions[package_tuple[1]] = semantic_version
+
     def register_package_version(self, package_version: PackageVersion) -> bool:
         """Register the given package version to the context."""
         package_tuple = package_version.to_tuple()
@@ -134,8 +239,16 @@ class Context:
             registered.develop = registered.develop or package_version.develop
             return True
 
+        lazy_entry = self._package_tuples_lazy.pop(package_tuple, None)
+        if lazy_entry is not None:
+            # Already registered as a package tuple, use the package version supplied as its representative.
+            package_version.develop = package_version.develop or lazy_entry[0]
+            self.package_versions[package_tuple] = package_version
+            return True
+
         # Direct dependency, no dependency introduced this one.
         self._note_dependencies(package_tuple=None, dependency_tuple=package_tuple)
+        self._note_version(package_tuple, package_version.semantic_version)
         self.package_versions[package_tuple] = package_version
         return False
 
@@ -146,21 +259,24 @@ class Context:
         self._accepted_states_counter -= 1
 
         if self.count is not None and len(self._accepted_states) >= self.count:
+            if not self._accepted_states:
+                # Nothing is kept if count is set to zero.
+                return
+
             heapq.heappushpop(self._accepted_states, item)
         else:
             heapq.heappush(self._accepted_states, item)
 
+        # The top item can never be removed from the heap, it is enough to compare with the newly accepted one.
+        if self._accepted_states_top is None or self._accepted_states_top[0] < item[0]:
+            self._accepted_states_top = item
+
     def get_top_accepted_final_state(self) -> Optional[State]:
         """Get the best accepted final state so far computed by the resolution pipeline."""
-        if not self._accepted_states:
+        if self._accepted_states_top is None:
             return None
 
-        result = self._accepted_states[len(self._accepted_states) // 2]
-        for item in self._accepted_states[1 + len(self._accepted_states) // 2 :]:
-            if result[0] < item[0]:
-                result = item
-
-        return result[1]
+        return self._accepted_states_top[1]
 
     def register_package_tuple(
         self,
@@ -172,38 +288,30 @@ class Context:
         os_name: Optional[str],
         os_version: Optional[str],
         python_version: Optional[str],
-    ) -> PackageVersion:
-        """Register the given package tuple to pipeline context and return its package version representative."""
+    ) -> None:
+        """Register the given package tuple to pipeline context.
+
+        The package version representative is not instantiated at this point - most of the package tuples
+        registered are never picked by the resolver. The package version is instantiated on the first
+        `get_package_version' call instead.
+        """
         registered = self.package_versions.get(package_tuple)
 
         if registered:
             # If the given package is shared in develop and in the main part, make it main stack part.
             registered.develop = registered.develop or develop
-            self._note_dependencies(
-                dependent_tuple,
-                package_tuple,
-                os_name=os_name,
-                os_version=os_version,
-                python_version=python_version,
-            )
-            # This method is called solely on transitive dependencies - for those we do not track
-            # extras as extras are already resolved by solver runs (pre-computed). Keep extras untouched
-            # in this function call.
-            return registered
-
-        source = self.sources.get(package_tuple[2])
-        if not source:
-            source = Source(package_tuple[2])
-            self.sources[package_tuple[2]] = source
+        else:
+            lazy_entry = self._package_tuples_lazy.get(package_tuple)
+            if lazy_entry is not None:
+                # This method is called solely on transitive dependencies - for those we do not track
+                # extras as extras are already resolved by solver runs (pre-computed). Keep extras untouched
+                # in this function call.
+                if develop and not lazy_entry[0]:
+                    self._package_tuples_lazy[package_tuple] = (True, lazy_entry[1])
+            else:
+                self._package_tuples_lazy[package_tuple] = (develop, extras)
+                self._note_version(package_tuple)
 
-        package_version = PackageVersion(
-            name=package_tuple[0],
-            version="==" + package_tuple[1],
-            index=source,
-            extras=extras,
-            develop=develop,
-        )
-        self.package_versions[package_tuple] = package_version
         self._note_dependencies(
             dependent_tuple,
             package_tuple,
@@ -211,7 +319,6 @@ class Context:
             os_version=os_version,
             python_version=python_version,
         )
-        return package_version
 
     def _note_dependencies(
         self,
@@ -222,30 +329,13 @@ class Context:
         python_version: Optional[str] = None,
     ) -> None:
         """Note down dependencies that were introduced."""
-        # Mapping: package tuple -> dependency tuple
-        if package_tuple is not None:
-            if package_tuple[0] not in self.dependencies:
-                self.dependencies[package_tuple[0]] = {}
-
-            if package_tuple not in self.dependencies[package_tuple[0]]:
-                self.dependencies[package_tuple[0]][package_tuple] = set()
-
-            self.dependencies[package_tuple[0]][package_tuple].add(dependency_tuple)
-
-        # Reverse mapping: dependency tuple -> package tuple
-        if dependency_tuple[0] not in self.dependents:
-            self.dependents[dependency_tuple[0]] = {}
-
-        if dependency_tuple not in self.dependents[dependency_tuple[0]]:
-            self.dependents[dependency_tuple[0]][dependency_tuple] = set()
-
-        if package_tuple is not None:
-            # Note down only if we have some dependency - otherwise dependency
-            # tuple is a direct dependency. In that case we don't need to keep
-            # track of environments for which the version was resolved.
-            self.dependents[dependency_tuple[0]][dependency_tuple].add(
-                (package_tuple, os_name, os_version, python_version)
-            )
+        self._dependency_graph.add(
+            package_tuple,
+            dependency_tuple,
+            os_name=os_name,
+            os_version=os_version,
+            python_version=python_version,
+        )
 
     def is_dependency_monkey(self) -> bool:
         """Check if the current context refers to a dependency monkey run."""
@@ -21,21 +21,36 @@ import os
 import sys
 import json
 import logging
+import multiprocessing
+import random
+import tempfile
 from typing import Any
+from typing import Callable
 from typing import Dict
+from typing import Generator
+from typing import List
 from typing import Optional
+from typing import Tuple
+from typing import TYPE_CHECKING
 from functools import partial
 
 import attr
-import amun
-import matplotlib
+import termial_random
 from thoth.python import Project
 
+from .amun_submitter import AmunSubmitter
 from .beam import Beam
 from .dm_report import DependencyMonkeyReport
 from .predictor import Predictor
+from .product import Product
 from .resolver import Resolver
+from .stack_archive import StackArchiveWriter
 from .enums import DecisionType
+from .exceptions import AdviserException
+from .exceptions import CannotProduceStack
+
+if TYPE_CHECKING:
+    import matplotlib.figure
 
 
 _LOGGER = logging.getLogger(__name__)
@@ -50,6 +65,34 @@ class DependencyMonkey:
     context = attr.ib(type=Optional[Dict[Any, Any]], default=attr.Factory(dict), kw_only=True)
     dry_run = attr.ib(type=bool, default=False, kw_only=True)
     decision_type = attr.ib(type=DecisionType, default=DecisionType.ALL, kw_only=True)
+    # Number of stacks resolved first that are not submitted, used to resume a previous run.
+    offset = attr.ib(type=int, default=0, kw_only=True)
+    # Number of worker processes, each resolves a disjoint part of the stack space.
+    workers = attr.ib(type=int, default=1, kw_only=True)
+    # A JSON lines file to which responses are streamed instead of keeping them in the report.
+    responses_output = attr.ib(type=Optional[str], default=None, kw_only=True)
+
+    # Number of stacks resolved (excluding stacks skipped based on offset).
+    _stack_count = attr.ib(type=int, default=0, init=False)
+
+    @offset.validator
+    def _offset_validator(self, _: str, value: int) -> None:
+        """Validate offset is a non-negative integer."""
+        if not isinstance(value, int) or value < 0:
+            raise ValueError(f"Offset has to be a non-negative integer, got {value!r}")
+
+    @workers.validator
+    def _workers_validator(self, _: str, value: int) -> None:
+        """Validate number of workers is a positive integer and workers have outputs on their own."""
+        if not isinstance(value, int) or value <= 0:
+            raise ValueError(f"Number of workers has to be a positive integer, got {value!r}")
+
+        if value > 1 and self.stack_output == "-" and not self.dry_run:
+            raise ValueError("Stacks cannot be printed to standard output if multiple workers are used")
+
+        if value > 1 and self.offset:
+            # Shards are resolved independently, a previous run cannot be resumed consistently.
+            raise ValueError("Resuming a previous run using offset is not supported if multiple workers are used")
 
     @property
     def predictor(self) -> Predictor:
@@ -61,7 +104,7 @@ class DependencyMonkey:
         """Get beam instance used in the resolver."""
         return self.resolver.beam
 
-    def plot(self) -> matplotlib.figure.Figure:
+    def plot(self) -> "matplotlib.figure.Figure":
         """Plot info from Dependency Monkey run."""
         return self.resolver.plot()
 
@@ -69,35 +112,92 @@ class DependencyMonkey:
         """Perform simulated annealing and run dependency monkey on products."""
         if user_stack_scoring:
             _LOGGER.warning("Ignoring user_stack_scoring flag in dependency monkey runs")
+
+        if self.workers > 1:
+            report = self._resolve_sharded(with_devel=with_devel)
+        else:
+            report = self._resolve_products(self.stack_output, with_devel=with_devel)
+
+        # Call post-run report function with the report once all is done as we used lower
+        # level resolver method `resolve_products' and this object maintains report.
+        self.resolver.pipeline.call_post_run_report(report)
+        report.close()
+        return report
+
+    def _get_report(self) -> DependencyMonkeyReport:
+        """Get a new report, responses are streamed to a file if configured so.
+
+        Responses of a run resumed using an offset are kept in the responses output, new responses are appended.
+        """
+        return DependencyMonkeyReport(responses_output=self.responses_output, append=self.offset > 0)
+
+    def _get_output_func(self, stack_output: str) -> Callable[[int, Project], Optional[str]]:
+        """Get function used to output stacks computed based on the configuration."""
         if self.dry_run:
             _LOGGER.warning("Dry run of Dependency Monkey is set, stacks will be just computed")
-            output_func = partial(self._dm_dry_run, self.stack_output)
-        elif self.stack_output == "-":
+            return partial(self._dm_dry_run, stack_output)
+        elif stack_output == "-":
             _LOGGER.debug("Results of Dependency Monkey run will be printed to standard output")
-            output_func = self._dm_stdout_output  # type: ignore
-        elif self.stack_output.startswith(("https://", "http://")):
-            _LOGGER.info(
-                "Results of Dependency Monkey run will be submitted to API endpoint %r",
-                self.stack_output,
-            )
-            output_func = partial(self._dm_amun_output, self.stack_output, self.context or {})  # type: ignore
-        else:
-            _LOGGER.info(
-                "Results of Dependency Monkey run will be stored in directory %r",
-                self.stack_output,
-            )
-            output_func = partial(self._dm_dir_output, self.stack_output)  # type: ignore
+            return self._dm_stdout_output
+
+        _LOGGER.info(
+            "Results of Dependency Monkey run will be stored in directory %r",
+            stack_output,
+        )
+        return partial(self._dm_dir_output, stack_output)
 
-        report = DependencyMonkeyReport()
-        for count, product in enumerate(self.resolver.resolve_products(with_devel=with_devel)):
-            count += 1
+    def _iter_products(self, *, with_devel: bool) -> Generator[Tuple[int, Product], None, None]:
+        """Resolve products, numbered based on the order in which they were resolved."""
+        if self.offset:
+            _LOGGER.info("Skipping first %d stacks resolved", self.offset)
+            # Stacks skipped count into the resolver limit.
+            self.resolver.limit = self.resolver.count + self.offset
+
+        for count, product in enumerate(
+            self.resolver.resolve_products(with_devel=with_devel, offset=self.offset), start=self.offset + 1
+        ):
             _LOGGER.info(
                 "Submitting stack %d with score %g and justification:\n%s",
                 count,
                 product.score,
                 json.dumps(product.justification),
             )
+            self._stack_count += 1
+            yield count, product
+
+    def _resolve_products(self, stack_output: str, *, with_devel: bool) -> DependencyMonkeyReport:
+        """Resolve products and pass them to the given output."""
+        report = self._get_report()
+        if not self.dry_run and stack_output.startswith(("https://", "http://")):
+            _LOGGER.info(
+                "Results of Dependency Monkey run will be submitted to API endpoint %r",
+                stack_output,
+            )
+            # Submissions are done concurrently, the resolver is blocked only if submitters cannot keep up.
+            with AmunSubmitter(stack_output, self.context or {}, report=report) as submitter:
+                for count, product in self._iter_products(with_devel=with_devel):
+                    submitter.submit(count, product)
 
+            return report
+
+        if not self.dry_run and stack_output.endswith(".jsonl"):
+            _LOGGER.info("Results of Dependency Monkey run will be appended to archive %r", stack_output)
+            # Stacks are written from a background thread, the resolver is blocked only if the writer cannot keep up.
+            with StackArchiveWriter(stack_output) as writer:
+                for count, product in self._iter_products(with_devel=with_devel):
+                    try:
+                        archive_response = writer.write(count, product.project.to_dict())
+                    except Exception as exc:
+                        _LOGGER.exception("Failed to write produced project: %s", str(exc))
+                        report.skipped += 1
+                        continue
+
+                    report.add_response(archive_response, product)
+
+            return report
+
+        output_func = self._get_output_func(stack_output)
+        for count, product in self._iter_products(with_devel=with_devel):
             try:
                 response: Optional[str] = output_func(count, product.project)
             except Exception as exc:
@@ -109,32 +209,117 @@ class DependencyMonkey:
                 _LOGGER.debug("Submitted results to %r", response)
                 report.add_response(response, product)
 
-        # Call post-run report function with the report once all is done as we used lower
-        # level resolver method `resolve_products' and this object maintains report.
-        self.resolver.pipeline.call_post_run_report(report)
         return report
 
+    def _get_shard_output(self, shard_index: int) -> str:
+        """Get output for stacks computed by the given shard."""
+        if self.stack_output.startswith(("https://", "http://")):
+            return self.stack_output
+
+        if self.stack_output.endswith(".jsonl"):
+            return f"{self.stack_output[: -len('.jsonl')]}-shard-{shard_index}.jsonl"
+
+        return os.path.join(self.stack_output, f"shard-{shard_index}")
+
+    def _resolve_sharded(self, *, with_devel: bool) -> DependencyMonkeyReport:
+        """Partition the stack space into shards, resolve each shard in a worker process and merge reports."""
+        count = self.resolver.count
+        # Seed workers to keep runs reproducible, each worker resolves a different part of the stack space.
+        shards: List[Tuple[int, int, int]] = [
+            (shard_index, count // self.workers + int(shard_index < count % self.workers), random.getrandbits(31))
+            for shard_index in range(self.workers)
+        ]
+
+        # Database connections cannot be shared across processes, each worker connects on its own.
+        graph = self.resolver.graph
+        if graph is not None and graph.is_connected():
+            graph.disconnect()
+
+        mp_context = multiprocessing.get_context("fork")
+        report = self._get_report()
+        with tempfile.TemporaryDirectory() as report_dir:
+            processes = []
+            for shard_index, stack_count, seed in shards:
+                if stack_count == 0:
+                    continue
+
+                report_path = os.path.join(report_dir, f"shard-{shard_index}.json")
+                process = mp_context.Process(
+                    target=self._resolve_shard,
+                    args=(shard_index, stack_count, seed, report_path),
+                    kwargs={"with_devel": with_devel},
+                    name=f"dependency-monkey-shard-{shard_index}",
+                )
+                process.start()
+                _LOGGER.info("Started worker %d (pid %r) resolving %d stacks", shard_index, process.pid, stack_count)
+                processes.append((shard_index, process, report_path))
+
+            failed = 0
+            stack_count = 0
+            for shard_index, process, report_path in processes:
+                process.join()
+                try:
+                    with open(report_path) as report_file:
+                        shard_result = json.load(report_file)
+                except FileNotFoundError:
+                    _LOGGER.error(
+                        "Worker %d failed with exit code %r, its stacks are not reported", shard_index, process.exitcode
+                    )
+                    failed += 1
+                    continue
+
+                report.merge(DependencyMonkeyReport.from_dict(shard_result["report"]))
+                stack_count += shard_result["stack_count"]
+                if shard_result["stack_count"] < shards[shard_index][1]:
+                    _LOGGER.warning(
+                        "Worker %d resolved %d stacks out of %d requested, its part of the stack space was exhausted",
+                        shard_index,
+                        shard_result["stack_count"],
+                        shards[shard_index][1],
+                    )
+
+        if failed == len(processes):
+            raise AdviserException("All Dependency Monkey workers failed, see logs for more info")
+
+        if stack_count < count:
+            _LOGGER.warning("Resolved %d stacks out of %d requested", stack_count, count)
+
+        return report
+
+    def _resolve_shard(self, shard_index: int, count: int, seed: int, report_path: str, *, with_devel: bool) -> None:
+        """Resolve the given shard, run in a worker process."""
+        random.seed(seed)
+        termial_random.seed(seed)
+
+        self.resolver.shard_count = self.workers
+        self.resolver.shard_index = shard_index
+        self.resolver.count = count
+        self.resolver.limit = count
+        graph = self.resolver.graph
+        if graph is not None and not graph.is_connected():
+            graph.connect()
+
+        if self.responses_output is not None:
+            # Responses are streamed next to the report of the worker and merged by the parent process.
+            self.responses_output = os.path.join(os.path.dirname(report_path), f"shard-{shard_index}-responses.jsonl")
+
+        try:
+            report = self._resolve_products(self._get_shard_output(shard_index), with_devel=with_devel)
+        except CannotProduceStack as exc:
+            _LOGGER.warning("No stacks resolved in shard %d: %s", shard_index, str(exc))
+            report = self._get_report()
+
+        with open(report_path, "w") as report_file:
+            json.dump({"stack_count": self._stack_count, "report": report.to_dict()}, report_file)
+
+        report.close()
+
     @staticmethod
     def _dm_dry_run(output: str, count: int, _: Project) -> None:  # noqa: D401
         """A wrapper around dry-run flag."""
         _LOGGER.info("Stack %d would be outputted to %r, but dry run flag was set, skipping...", count, output)
         return None
 
-    @staticmethod
-    def _dm_amun_output(
-        output: str, context: Dict[Any, Any], count: int, generated_project: Project
-    ) -> str:  # noqa: D401
-        """A wrapper around Amun inspection call."""
-        context = dict(context)
-        context["python"] = generated_project.to_dict()
-        # No need to supply runtime environment information.
-        context["python"].pop("runtime_environment", None)
-        response = amun.inspect(output, **context)
-        _LOGGER.info("Submitted Amun inspection #%d: %r", count, response["inspection_id"])
-        _LOGGER.debug("Full Amun response: %s", response)
-        inspection_id: str = response["inspection_id"]
-        return inspection_id
-
     @staticmethod
     def _dm_dir_output(output: str, count: int, generated_project: Project) -> str:  # noqa: D401
         """A wrapper for placing generated software stacks onto filesystem."""
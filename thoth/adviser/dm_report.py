@@ -17,10 +17,16 @@
 
 """Routines for dependency monkey and its output handling."""
 
+import json
 import logging
+import math
+import os
 from typing import Any
 from typing import Dict
+from typing import Generator
 from typing import List
+from typing import Optional
+from typing import TextIO
 from typing import Union
 
 import attr
@@ -33,15 +39,143 @@ _LOGGER = logging.getLogger(__name__)
 
 @attr.s(slots=True)
 class DependencyMonkeyReport:
-    """Report produced by a Dependency Monkey run."""
+    """Report produced by a Dependency Monkey run.
+
+    If `responses_output' is set, responses are streamed to the given JSON lines file as they are added, one
+    response per line, and only counters and summary statistics are kept in memory. The report then references
+    the streamed file instead of listing responses. If `append' is set, responses already present in the responses
+    output (e.g. of a run resumed using an offset) are kept and accounted in the report.
+    """
 
     skipped = attr.ib(type=int, default=0)
     _responses = attr.ib(type=List[Dict[str, Union[Dict[str, Any], str]]], default=attr.Factory(list))
+    responses_output = attr.ib(type=Optional[str], default=None, kw_only=True)
+    append = attr.ib(type=bool, default=False, kw_only=True)
+
+    _responses_file = attr.ib(type=Optional[TextIO], default=None, init=False)
+    _responses_count = attr.ib(type=int, default=0, init=False)
+    _score_count = attr.ib(type=int, default=0, init=False)
+    _score_sum = attr.ib(type=float, default=0.0, init=False)
+    _score_min = attr.ib(type=float, default=math.inf, init=False)
+    _score_max = attr.ib(type=float, default=-math.inf, init=False)
 
     def add_response(self, response: str, product: Product) -> None:
         """Add a new response to response listing."""
-        self._responses.append({"response": response, "product": product.to_dict()})
+        self._add_record({"response": response, "product": product.to_dict()})
+
+    def _add_record(self, record: Dict[str, Any]) -> None:
+        """Add a response record, stream it to the responses output if configured."""
+        if self.responses_output is None:
+            self._responses.append(record)
+            return
+
+        if self._responses_file is None:
+            self._responses_file = self._open_responses_file(self.responses_output)
+
+        self._responses_file.write(json.dumps(record) + "\n")
+        self._account_record(record)
+
+    def _open_responses_file(self, responses_output: str) -> TextIO:
+        """Open the responses output for writing responses."""
+        if self._responses_count:
+            # Responses of a report restored from its dict are already accounted, new ones are appended.
+            return open(responses_output, "a")
+
+        if not self.append:
+            # A new report starts a new file.
+            return open(responses_output, "w")
+
+        if os.path.isfile(responses_output):
+            with open(responses_output) as responses_file:
+                for line in responses_file:
+                    self._account_record(json.loads(line))
+
+            _LOGGER.info(
+                "Appending responses to %r which already lists %d responses", responses_output, self._responses_count
+            )
+
+        return open(responses_output, "a")
+
+    def _account_record(self, record: Dict[str, Any]) -> None:
+        """Account a response record streamed to the responses output in counters and score statistics."""
+        self._responses_count += 1
+
+        score = record["product"].get("score")
+        if isinstance(score, (int, float)):
+            self._score_count += 1
+            self._score_sum += score
+            self._score_min = min(self._score_min, score)
+            self._score_max = max(self._score_max, score)
+
+    def iter_responses(self) -> Generator[Dict[str, Any], None, None]:
+        """Iterate over responses added, responses streamed are read back from the responses output."""
+        if self.responses_output is None:
+            yield from self._responses
+            return
+
+        if self._responses_file is None and not self._responses_count:
+            if not self.append:
+                return
+
+            self._responses_file = self._open_responses_file(self.responses_output)
+
+        if self._responses_file is not None:
+            self._responses_file.flush()
+
+        with open(self.responses_output) as responses_file:
+            for line in responses_file:
+                yield json.loads(line)
+
+    def close(self) -> None:
+        """Close the responses output, if any."""
+        if self._responses_file is not None:
+            self._responses_file.close()
+            self._responses_file = None
+
+    def merge(self, other: "DependencyMonkeyReport") -> None:
+        """Merge the other report into this one, used to merge reports of Dependency Monkey workers."""
+        self.skipped += other.skipped
+        for record in other.iter_responses():
+            self._add_record(record)
+
+    @classmethod
+    def from_dict(cls, report: Dict[str, Any]) -> "DependencyMonkeyReport":
+        """Instantiate report from its dict representation."""
+        if "responses_output" not in report:
+            return cls(skipped=report["skipped"], responses=report["responses"])
+
+        instance = cls(skipped=report["skipped"], responses_output=report["responses_output"])
+        instance._responses_count = report["responses_count"]
+        score = report["score"]
+        if score["count"]:
+            instance._score_count = score["count"]
+            instance._score_sum = score["mean"] * score["count"]
+            instance._score_min = score["min"]
+            instance._score_max = score["max"]
+
+        return instance
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert report to a dict representation suitable for serialization."""
-        return {"skipped": self.skipped, "responses": self._responses}
+        if self.responses_output is None:
+            return {"skipped": self.skipped, "responses": self._responses}
+
+        if self._responses_file is None and not self._responses_count:
+            # Make sure the report references an existing file even if there were no responses.
+            self._responses_file = self._open_responses_file(self.responses_output)
+
+        if self._responses_file is not None:
+            self._responses_file.flush()
+
+        score_count = self._score_count
+        return {
+            "skipped": self.skipped,
+            "responses_output": self.responses_output,
+            "responses_count": self._responses_count,
+            "score": {
+                "count": score_count,
+                "min": self._score_min if score_count else None,
+                "max": self._score_max if score_count else None,
+                "mean": self._score_sum / score_count if score_count else None,
+            },
+        }
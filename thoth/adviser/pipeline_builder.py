@@ -19,12 +19,17 @@
 
 import os
 import logging
+import hashlib
 import json
+import tempfile
+import time
 from typing import Any
 from typing import Dict
 from typing import Generator
 from typing import List
 from typing import Optional
+from typing import Set
+from collections import deque
 from itertools import chain
 
 import attr
@@ -45,6 +50,7 @@ from .step import Step
 from .stride import Stride
 from .wrap import Wrap
 from .unit import Unit
+from .unit_registry import get_unit_registry_entry
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -242,8 +248,27 @@ class PipelineBuilder:
         raise NotImplementedError("Cannot instantiate pipeline builder")
 
     @staticmethod
-    def _iter_units() -> Generator[type, None, None]:
-        """Iterate over pipeline units available in this implementation."""
+    def _may_include(unit_name: str, ctx: PipelineBuilderContext) -> bool:
+        """Check cheaply, without importing the pipeline unit, if the pipeline unit can be included in the pipeline."""
+        entry = get_unit_registry_entry(unit_name)
+        if entry is None:
+            return True
+
+        if ctx.is_adviser_pipeline():
+            return entry.adviser
+
+        if ctx.is_dependency_monkey_pipeline():
+            return entry.dependency_monkey
+
+        return True
+
+    @classmethod
+    def _iter_units(cls, ctx: Optional[PipelineBuilderContext] = None) -> Generator[type, None, None]:
+        """Iterate over pipeline units available in this implementation.
+
+        If pipeline builder context is given, pipeline units that cannot be included in the pipeline built are
+        skipped without importing modules implementing them.
+        """
         # Imports placed here to simplify tests.
         import thoth.adviser.boots
         import thoth.adviser.pseudonyms
@@ -252,75 +277,185 @@ class PipelineBuilder:
         import thoth.adviser.strides
         import thoth.adviser.wraps
 
-        for boot_name in thoth.adviser.boots.__all__:
-            yield getattr(thoth.adviser.boots, boot_name)
+        for package in (
+            thoth.adviser.boots,
+            thoth.adviser.pseudonyms,
+            thoth.adviser.sieves,
+            thoth.adviser.steps,
+            thoth.adviser.strides,
+            thoth.adviser.wraps,
+        ):
+            for unit_name in package.__all__:
+                if ctx is not None and not cls._may_include(unit_name, ctx):
+                    _LOGGER.debug("Pipeline unit %r cannot be included in the pipeline built", unit_name)
+                    continue
 
-        for pseudonym_name in thoth.adviser.pseudonyms.__all__:
-            yield getattr(thoth.adviser.pseudonyms, pseudonym_name)
+                yield getattr(package, unit_name)
 
-        for sieve_name in thoth.adviser.sieves.__all__:
-            yield getattr(thoth.adviser.sieves, sieve_name)
+    @staticmethod
+    def _get_cache_key(ctx: PipelineBuilderContext, blocked_units: Set[str]) -> str:
+        """Get a key identifying pipeline configuration built for the given context in the pipeline cache."""
+        from . import __version__
+
+        project = ctx.project
+        library_usage_digest = None
+        if ctx.library_usage is not None:
+            library_usage_digest = hashlib.sha256(json.dumps(ctx.library_usage, sort_keys=True).encode()).hexdigest()
+
+        key: Dict[str, Any] = {
+            "version": __version__,
+            "recommendation_type": ctx.recommendation_type.name if ctx.recommendation_type else None,
+            "decision_type": ctx.decision_type.name if ctx.decision_type else None,
+            "library_usage": library_usage_digest,
+            "blocked_units": sorted(blocked_units),
+            "runtime_environment": None,
+            "packages": None,
+            "dev_packages": None,
+            "prereleases_allowed": None,
+            "pipfile_lock_hash": None,
+        }
+        if project is not None:
+            # Units check also presence of the lock file hash and pre-releases configuration in the project.
+            key["runtime_environment"] = project.runtime_environment.to_dict()
+            # Units can check default and development packages separately.
+            key["packages"] = sorted(project.pipfile.packages.packages)
+            key["dev_packages"] = sorted(project.pipfile.dev_packages.packages)
+            key["prereleases_allowed"] = project.prereleases_allowed
+            key["pipfile_lock_hash"] = project.pipfile_lock is not None and project.pipfile_lock.meta.hash is not None
+
+        return hashlib.sha256(json.dumps(key, sort_keys=True).encode()).hexdigest()
 
-        for step_name in thoth.adviser.steps.__all__:
-            yield getattr(thoth.adviser.steps, step_name)
+    @classmethod
+    def _load_cached_configuration(cls, cache_path: str) -> Optional[PipelineConfig]:
+        """Load pipeline configuration from the pipeline cache, if present."""
+        start_time = time.monotonic()
+        try:
+            with open(cache_path, "r") as cache_file:
+                cache_entry = json.load(cache_file)
+        except FileNotFoundError:
+            return None
+        except Exception as exc:
+            _LOGGER.warning("Failed to load pipeline configuration from cache %r: %s", cache_path, str(exc))
+            return None
 
-        for stride_name in thoth.adviser.strides.__all__:
-            yield getattr(thoth.adviser.strides, stride_name)
+        try:
+            # Unit configuration was validated when the pipeline configuration was built.
+            pipeline = cls.from_dict(cache_entry["pipeline"], validate_configuration=False)
+        except Exception as exc:
+            _LOGGER.warning("Failed to instantiate pipeline configuration from cache %r: %s", cache_path, str(exc))
+            return None
+
+        load_time = time.monotonic() - start_time
+        _LOGGER.info(
+            "Pipeline configuration loaded from cache in %.3f seconds, saved %.3f seconds of building it",
+            load_time,
+            cache_entry["build_time"] - load_time,
+        )
+        return pipeline
 
-        for wrap_name in thoth.adviser.wraps.__all__:
-            yield getattr(thoth.adviser.wraps, wrap_name)
+    @staticmethod
+    def _store_cached_configuration(cache_path: str, pipeline: PipelineConfig, build_time: float) -> None:
+        """Store pipeline configuration in the pipeline cache."""
+        try:
+            content = json.dumps({"pipeline": pipeline.to_dict(), "build_time": build_time})
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            # Write to a temporary file first so that concurrent runs never see a partially written entry.
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(cache_path), suffix=".tmp")
+            with os.fdopen(fd, "w") as cache_file:
+                cache_file.write(content)
+            os.replace(tmp_path, cache_path)
+        except Exception as exc:
+            _LOGGER.warning("Failed to store pipeline configuration in cache %r: %s", cache_path, str(exc))
 
     @classmethod
     def _build_configuration(cls, ctx: PipelineBuilderContext) -> PipelineConfig:
         """Instantiate units and return the actual pipeline configuration."""
-        # As pipeline steps can have dependencies on each other, iterate over them until we have any change done
-        # to the pipeline configuration.
-        _LOGGER.info("Creating pipeline configuration")
-
         blocked_units = (
             set(os.environ["THOTH_ADVISER_BLOCKED_UNITS"].split(","))
             if "THOTH_ADVISER_BLOCKED_UNITS" in os.environ
             else set()
         )
 
-        change = True
-        while change:
-            change = False
-            for unit_class in cls._iter_units():
-                if unit_class.__name__ in blocked_units:
-                    _LOGGER.debug(
-                        "Avoiding adding pipeline unit %r based on blocked units configuration",
-                        unit_class.__name__,
-                    )
-                    continue
+        cache_dir = os.getenv("THOTH_ADVISER_PIPELINE_CACHE_DIR")
+        if not cache_dir:
+            return cls._do_build_configuration(ctx, blocked_units)
 
-                unit_configuration = unit_class.should_include(ctx)  # type: ignore
-                if unit_configuration is None:
-                    _LOGGER.debug(
-                        "Pipeline unit %r will not be included in the pipeline configuration in this round",
-                        unit_class.__name__,
-                    )
-                    continue
+        cache_path = os.path.join(cache_dir, f"{cls._get_cache_key(ctx, blocked_units)}.json")
+        pipeline = cls._load_cached_configuration(cache_path)
+        if pipeline is not None:
+            return pipeline
+
+        start_time = time.monotonic()
+        pipeline = cls._do_build_configuration(ctx, blocked_units)
+        build_time = time.monotonic() - start_time
+        _LOGGER.info("Pipeline configuration built in %.3f seconds, storing it in cache %r", build_time, cache_path)
+        cls._store_cached_configuration(cache_path, pipeline, build_time)
+        return pipeline
 
-                change = True
+    @classmethod
+    def _do_build_configuration(cls, ctx: PipelineBuilderContext, blocked_units: Set[str]) -> PipelineConfig:
+        """Instantiate units based on their inclusion logic.
+
+        Units are re-evaluated only if a unit their inclusion depends on was included (see
+        `Unit.SHOULD_INCLUDE_TRIGGERS'), as the builder context does not change otherwise.
+        """
+        _LOGGER.info("Creating pipeline configuration")
 
+        unit_classes = []
+        for unit_class in cls._iter_units(ctx):
+            if unit_class.__name__ in blocked_units:
                 _LOGGER.debug(
-                    "Including pipeline unit %r in pipeline configuration with unit configuration %r",
+                    "Avoiding adding pipeline unit %r based on blocked units configuration",
                     unit_class.__name__,
-                    unit_configuration,
                 )
-                unit_instance = unit_class()
+                continue
+
+            unit_classes.append(unit_class)
 
-                # Always perform update, even with an empty dict. Update triggers a schema check.
-                try:
-                    unit_instance.update_configuration(unit_configuration)
-                except Exception as exc:
-                    raise PipelineConfigurationError(
-                        f"Filed to initialize pipeline unit configuration for {unit_class.__name__!r} "
-                        f"with configuration {unit_configuration!r}: {str(exc)}"
-                    ) from exc
+        # Units to be re-evaluated once a unit with the given name is included, None for any unit included.
+        triggered: Dict[Optional[str], List[type]] = {}
+        for unit_class in unit_classes:
+            triggers = unit_class.SHOULD_INCLUDE_TRIGGERS  # type: ignore
+            for unit_name in (None,) if triggers is None else triggers:
+                triggered.setdefault(unit_name, []).append(unit_class)
 
-                ctx.add_unit(unit_instance)
+        pending = deque(unit_classes)
+        queued = set(unit_classes)
+        while pending:
+            unit_class = pending.popleft()
+            queued.discard(unit_class)
+
+            unit_configuration = unit_class.should_include(ctx)  # type: ignore
+            if unit_configuration is None:
+                _LOGGER.debug(
+                    "Pipeline unit %r will not be included in the pipeline configuration in this round",
+                    unit_class.__name__,
+                )
+                continue
+
+            _LOGGER.debug(
+                "Including pipeline unit %r in pipeline configuration with unit configuration %r",
+                unit_class.__name__,
+                unit_configuration,
+            )
+            unit_instance = unit_class()
+
+            # Always perform update, even with an empty dict. Update triggers a schema check.
+            try:
+                unit_instance.update_configuration(unit_configuration)
+            except Exception as exc:
+                raise PipelineConfigurationError(
+                    f"Filed to initialize pipeline unit configuration for {unit_class.__name__!r} "
+                    f"with configuration {unit_configuration!r}: {str(exc)}"
+                ) from exc
+
+            ctx.add_unit(unit_instance)
+
+            # A unit can be included multiple times (e.g. with a different configuration), re-evaluate it as well.
+            for affected_class in chain((unit_class,), triggered.get(unit_class.__name__, ()), triggered.get(None, ())):
+                if affected_class not in queued:
+                    queued.add(affected_class)
+                    pending.append(affected_class)
 
         pipeline = PipelineConfig(
             boots=ctx.boots_dict,
@@ -340,7 +475,9 @@ class PipelineBuilder:
         return pipeline
 
     @staticmethod
-    def _do_instantiate_from_dict(module: object, configuration_entry: Dict[str, Any]) -> Unit:
+    def _do_instantiate_from_dict(
+        module: object, configuration_entry: Dict[str, Any], *, validate_configuration: bool = True
+    ) -> Unit:
         """Instantiate a pipeline unit from a dict representation."""
         if "name" not in configuration_entry:
             raise ValueError(f"No pipeline unit name provided in the configuration entry: {configuration_entry!r}")
@@ -353,6 +490,10 @@ class PipelineBuilder:
         unit: Unit = unit_class()
 
         if configuration_entry.get("configuration"):
+            if not validate_configuration:
+                unit.configuration.update(configuration_entry["configuration"])
+                return unit
+
             try:
                 unit.update_configuration(configuration_entry["configuration"])
             except Exception as exc:
@@ -364,8 +505,11 @@ class PipelineBuilder:
         return unit
 
     @classmethod
-    def from_dict(cls, dict_: Dict[str, Any]) -> "PipelineConfig":
-        """Instantiate pipeline configuration based on dictionary supplied."""
+    def from_dict(cls, dict_: Dict[str, Any], *, validate_configuration: bool = True) -> "PipelineConfig":
+        """Instantiate pipeline configuration based on dictionary supplied.
+
+        Schema checks of unit configuration can be turned off for configurations known to be valid.
+        """
         # Imports placed here to simplify tests.
         import thoth.adviser.boots
         import thoth.adviser.pseudonyms
@@ -376,13 +520,17 @@ class PipelineBuilder:
 
         boots: Dict[Optional[str], List[Boot]] = {}
         for boot_entry in dict_.pop("boots", []) or []:
-            boot_unit: Boot = cls._do_instantiate_from_dict(thoth.adviser.boots, boot_entry)  # type: ignore
+            boot_unit: Boot = cls._do_instantiate_from_dict(  # type: ignore
+                thoth.adviser.boots, boot_entry, validate_configuration=validate_configuration
+            )
             package_name = boot_unit.configuration.get("package_name")
             boots.setdefault(package_name, []).append(boot_unit)
 
         pseudonyms: Dict[str, List[Pseudonym]] = {}
         for pseudonym_entry in dict_.pop("pseudonyms", []) or []:
-            unit: Pseudonym = cls._do_instantiate_from_dict(thoth.adviser.pseudonyms, pseudonym_entry)  # type: ignore
+            unit: Pseudonym = cls._do_instantiate_from_dict(  # type: ignore
+                thoth.adviser.pseudonyms, pseudonym_entry, validate_configuration=validate_configuration
+            )
 
             package_name = unit.configuration.get("package_name")
             if not package_name:
@@ -395,25 +543,33 @@ class PipelineBuilder:
 
         sieves: Dict[Optional[str], List[Sieve]] = {}
         for sieve_entry in dict_.pop("sieves", []) or []:
-            sieve_unit: Sieve = cls._do_instantiate_from_dict(thoth.adviser.sieves, sieve_entry)  # type: ignore
+            sieve_unit: Sieve = cls._do_instantiate_from_dict(  # type: ignore
+                thoth.adviser.sieves, sieve_entry, validate_configuration=validate_configuration
+            )
             package_name = sieve_unit.configuration.get("package_name")
             sieves.setdefault(package_name, []).append(sieve_unit)
 
         steps: Dict[Optional[str], List[Step]] = {}
         for step_entry in dict_.pop("steps", []) or []:
-            step_unit: Step = cls._do_instantiate_from_dict(thoth.adviser.steps, step_entry)  # type: ignore
+            step_unit: Step = cls._do_instantiate_from_dict(  # type: ignore
+                thoth.adviser.steps, step_entry, validate_configuration=validate_configuration
+            )
             package_name = step_unit.configuration.get("package_name")
             steps.setdefault(package_name, []).append(step_unit)
 
         strides: Dict[Optional[str], List[Stride]] = {}
         for stride_entry in dict_.pop("strides", []) or []:
-            stride_unit: Stride = cls._do_instantiate_from_dict(thoth.adviser.strides, stride_entry)  # type: ignore
+            stride_unit: Stride = cls._do_instantiate_from_dict(  # type: ignore
+                thoth.adviser.strides, stride_entry, validate_configuration=validate_configuration
+            )
             package_name = stride_unit.configuration.get("package_name")
             strides.setdefault(package_name, []).append(stride_unit)
 
         wraps: Dict[Optional[str], List[Wrap]] = {}
         for wrap_entry in dict_.pop("wraps", []) or []:
-            wrap_unit: Wrap = cls._do_instantiate_from_dict(thoth.adviser.wraps, wrap_entry)  # type: ignore
+            wrap_unit: Wrap = cls._do_instantiate_from_dict(  # type: ignore
+                thoth.adviser.wraps, wrap_entry, validate_configuration=validate_configuration
+            )
             package_name = wrap_unit.configuration.get("package_name")
             wraps.setdefault(package_name, []).append(wrap_unit)
 
@@ -428,10 +584,12 @@ class PipelineBuilder:
             strides=strides,
             wraps=wraps,
         )
-        _LOGGER.debug(
-            "Pipeline configuration creation ended, configuration:\n%s",
-            json.dumps(pipeline.to_dict(), indent=2),
-        )
+        if _LOGGER.getEffectiveLevel() <= logging.DEBUG:
+            _LOGGER.debug(
+                "Pipeline configuration creation ended, configuration:\n%s",
+                json.dumps(pipeline.to_dict(), indent=2),
+            )
+
         return pipeline
 
     @classmethod
@@ -21,8 +21,10 @@ from itertools import chain
 from typing import Any
 from typing import Dict
 from typing import Generator
+from typing import Iterable
 from typing import List
 from typing import Optional
+from typing import Tuple
 from typing import Union
 
 import attr
@@ -55,6 +57,17 @@ class PipelineConfig:
     _strides = attr.ib(type=Dict[Optional[str], List[Stride]], factory=dict)
     _wraps = attr.ib(type=Dict[Optional[str], List[Wrap]], factory=dict)
 
+    # Dispatch tables used by resolver, see compile().
+    _compiled = attr.ib(type=bool, default=False, init=False)
+    _sieves_table = attr.ib(type=Dict[str, Tuple[Sieve, ...]], factory=dict, init=False)
+    _sieves_any = attr.ib(type=Tuple[Sieve, ...], default=(), init=False)
+    _steps_table = attr.ib(type=Dict[str, Tuple[Step, ...]], factory=dict, init=False)
+    _steps_any = attr.ib(type=Tuple[Step, ...], default=(), init=False)
+    _strides_table = attr.ib(type=Dict[str, Tuple[Stride, ...]], factory=dict, init=False)
+    _strides_any = attr.ib(type=Tuple[Stride, ...], default=(), init=False)
+    _wraps_table = attr.ib(type=Dict[str, Tuple[Wrap, ...]], factory=dict, init=False)
+    _wraps_any = attr.ib(type=Tuple[Wrap, ...], default=(), init=False)
+
     @property
     def boots(self) -> List[Boot]:
         """Get all boots."""
@@ -115,6 +128,94 @@ class PipelineConfig:
         """Get wraps as a dictionary mapping."""
         return self._wraps
 
+    def compile(self) -> None:
+        """Compile dispatch tables used by resolver to look up pipeline units run for a package.
+
+        Sieves and steps are precompiled per package name into a single tuple with package specific units first,
+        followed by units run for any package. Strides and wraps keep only package names with package specific units
+        so that resolver can skip packages without them. Dispatch tables are compiled on first use and on each
+        pre-run; compile them explicitly if the configuration changes in between.
+        """
+        self._sieves_any = tuple(self._sieves.get(None, ()))
+        self._sieves_table = {
+            package_name: (*sieves, *self._sieves_any)
+            for package_name, sieves in self._sieves.items()
+            if package_name is not None and sieves
+        }
+        self._steps_any = tuple(self._steps.get(None, ()))
+        self._steps_table = {
+            package_name: (*steps, *self._steps_any)
+            for package_name, steps in self._steps.items()
+            if package_name is not None and steps
+        }
+        self._strides_any = tuple(self._strides.get(None, ()))
+        self._strides_table = {
+            package_name: tuple(strides)
+            for package_name, strides in self._strides.items()
+            if package_name is not None and strides
+        }
+        self._wraps_any = tuple(self._wraps.get(None, ()))
+        self._wraps_table = {
+            package_name: tuple(wraps)
+            for package_name, wraps in self._wraps.items()
+            if package_name is not None and wraps
+        }
+        self._compiled = True
+
+    def get_sieves(self, package_name: str) -> Tuple[Sieve, ...]:
+        """Get sieves to be run on versions of the given package."""
+        if not self._compiled:
+            self.compile()
+
+        return self._sieves_table.get(package_name, self._sieves_any)
+
+    def get_steps(self, package_name: str) -> Tuple[Step, ...]:
+        """Get steps to be run on a version of the given package."""
+        if not self._compiled:
+            self.compile()
+
+        return self._steps_table.get(package_name, self._steps_any)
+
+    def get_strides(self, package_names: Iterable[str]) -> Tuple[Stride, ...]:
+        """Get strides to be run on a final state with the given packages resolved."""
+        if not self._compiled:
+            self.compile()
+
+        if not self._strides_table:
+            return self._strides_any
+
+        strides_table = self._strides_table
+        result: List[Stride] = []
+        for package_name in package_names:
+            if package_name in strides_table:
+                result.extend(strides_table[package_name])
+
+        if not result:
+            return self._strides_any
+
+        result.extend(self._strides_any)
+        return tuple(result)
+
+    def get_wraps(self, package_names: Iterable[str]) -> Tuple[Wrap, ...]:
+        """Get wraps to be run on a final state with the given packages resolved."""
+        if not self._compiled:
+            self.compile()
+
+        if not self._wraps_table:
+            return self._wraps_any
+
+        wraps_table = self._wraps_table
+        result: List[Wrap] = []
+        for package_name in package_names:
+            if package_name in wraps_table:
+                result.extend(wraps_table[package_name])
+
+        if not result:
+            return self._wraps_any
+
+        result.extend(self._wraps_any)
+        return tuple(result)
+
     def to_dict(self) -> Dict[str, List[Dict[str, Any]]]:
         """Return this pipeline configuration in a dict representation."""
         return {
@@ -143,6 +244,7 @@ class PipelineConfig:
 
     def call_pre_run(self) -> None:
         """Call pre-run method on all units registered in this configuration."""
+        self.compile()
         for unit in self.iter_units():
             try:
                 unit.pre_run()
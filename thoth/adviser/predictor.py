@@ -23,17 +23,20 @@ from contextlib import contextmanager
 
 import attr
 from typing import Any
+from typing import List
 from typing import Tuple
 from typing import Optional
 from typing import Generator
-
-import matplotlib.figure
+from typing import TYPE_CHECKING
 
 from .context import Context
 from .report import Report
 from .state import State
 from .utils import should_keep_history
 
+if TYPE_CHECKING:
+    import matplotlib.figure
+
 _LOGGER = logging.getLogger(__name__)
 
 
@@ -44,6 +47,9 @@ class Predictor:
     keep_history = attr.ib(type=bool, kw_only=True, default=None, converter=should_keep_history)
 
     _CONTEXT: Optional[Context] = None
+    # Register dependencies skipped by resolver as a different version is already resolved in the state,
+    # so that the dependency graph in context captures conflicts.
+    REGISTER_SKIPPED_DEPENDENCIES = False
 
     @classmethod
     def obtain_default_configuration(cls, config_option_name: str) -> Any:
@@ -81,6 +87,16 @@ class Predictor:
         """Run the main method used to run the predictor."""
         raise NotImplementedError
 
+    def run_batch(self, size: int) -> List[Tuple[State, Tuple[str, str, str]]]:
+        """Get up to the given number of states and their unresolved dependencies to be expanded.
+
+        Used by resolver if batched expansions are configured. Predictors that need a reward signal of the
+        previous expansion to pick the next one (the default) return a single expansion, predictors picking
+        states independently can return more of them. Resolver skips expansions that are no longer valid once
+        the preceding ones in the batch were performed.
+        """
+        return [self.run()]
+
     def post_run(self) -> None:
         """Post-run method run after the resolving has been done."""
         # noop
@@ -103,17 +119,26 @@ class Predictor:
         """
         # noop
 
+    def exploit(self) -> None:  # noqa: D401
+        """Called when resolver asks predictor to switch to exploitation, for example on memory pressure.
+
+        The default operation is a noop, predictors balancing exploration and exploitation should prefer
+        exploitation of the highest rated states afterwards.
+        """
+        # noop
+
     def finalize_state(self, state_id: int) -> None:  # noqa: D401
         """Finalizer called when the given state is about to be destructed by garbage collector.
 
-        Method suitable if predictor keeps internal state for states. Note that this method is not
-        called for remaining states if the resolver terminates.
+        Method suitable if predictor keeps internal state for states. Resolver notifies the predictor only
+        if this method is overridden. Note that this method is not called for remaining states if the
+        resolver terminates.
 
         @param state_id: id of state that is about to be finalized
         """
         # noop
 
-    def plot(self) -> matplotlib.figure.Figure:
+    def plot(self) -> "matplotlib.figure.Figure":
         """Plot information about predictor."""
         _LOGGER.error(
             "Cannot plot predictor history as plotting is not implemented for predictor %r, error is not fatal",
@@ -18,6 +18,7 @@
 """Implementation of predictors used with resolver.."""
 
 from .annealing import AdaptiveSimulatedAnnealing
+from .depth_first import DepthFirst
 from .hill_climbing import HillClimbing
 from .latest import ApproximatingLatest
 from .mcts import MCTS
@@ -25,15 +26,18 @@ from .package_combinations import PackageCombinations
 from .random_walk import RandomWalk
 from .sampling import Sampling
 from .td import TemporalDifference
+from .uct import UCT
 
 
 __all__ = [
     "AdaptiveSimulatedAnnealing",
     "ApproximatingLatest",
+    "DepthFirst",
     "HillClimbing",
     "MCTS",
     "PackageCombinations",
     "RandomWalk",
     "Sampling",
     "TemporalDifference",
+    "UCT",
 ]
@@ -21,29 +21,34 @@ from typing import Any
 from typing import List
 from typing import Optional
 from typing import Tuple
+from typing import TYPE_CHECKING
 import logging
 import random
 import math
 
 import attr
-import matplotlib
-import matplotlib.pyplot as plt
-from matplotlib.font_manager import FontProperties
 
 from ..context import Context
 from ..exceptions import NoHistoryKept
 from ..predictor import Predictor
 from ..state import State
 
+if TYPE_CHECKING:
+    import matplotlib.figure
+
 
 _LOGGER = logging.getLogger(__name__)
 
 
 @attr.s(slots=True)
 class AdaptiveSimulatedAnnealing(Predictor):
-    """Implementation of adaptive simulated annealing looking for stacks based on the scoring function."""
+    """Implementation of adaptive simulated annealing looking for stacks based on the scoring function.
+
+    If score weighted, neighbour states with a higher score are picked more likely (see Beam.get_random_weighted).
+    """
 
     temperature_coefficient = attr.ib(type=float, default=0.999, kw_only=True)
+    score_weighted = attr.ib(type=bool, kw_only=True, default=False)
 
     _temperature_history = attr.ib(
         type=List[Tuple[Optional[float], Optional[bool], Optional[float], int]],
@@ -97,13 +102,19 @@ class AdaptiveSimulatedAnnealing(Predictor):
         state = self.context.beam.max()
 
         # Pick a random state to be expanded if accepted.
-        probable_state_idx = random.randrange(1, self.context.beam.size) if self.context.beam.size > 1 else 0
-        probable_state = self.context.beam.get(probable_state_idx)
+        if self.score_weighted:
+            probable_state = self.context.beam.get_random_weighted()
+            is_neighbour = probable_state is not state
+        else:
+            probable_state_idx = random.randrange(1, self.context.beam.size) if self.context.beam.size > 1 else 0
+            probable_state = self.context.beam.get(probable_state_idx)
+            is_neighbour = probable_state_idx != 0
+
         acceptance_probability = self._compute_acceptance_probability(
             state.score, probable_state.score, self._temperature
         )
 
-        if probable_state_idx != 0 and acceptance_probability >= random.random():
+        if is_neighbour and acceptance_probability >= random.random():
             # Skip to probable state, do not use the top rated state.
             _LOGGER.debug(
                 "Performing transition to a neighbour state with score %g",
@@ -128,6 +139,28 @@ class AdaptiveSimulatedAnnealing(Predictor):
 
         return state, unresolved_dependency_tuple
 
+    def run_batch(self, size: int) -> List[Tuple[State, Tuple[str, str, str]]]:
+        """Perform the given number of transitions, each state is expanded at most once in a batch.
+
+        Transitions to a state already present in the batch (most likely the top rated one) are dropped.
+        """
+        result = []
+        seen = set()
+        for _ in range(min(size, self.context.beam.size)):
+            state, unresolved_dependency_tuple = self.run()
+            if id(state) in seen:
+                continue
+
+            seen.add(id(state))
+            result.append((state, unresolved_dependency_tuple))
+
+        return result
+
+    def exploit(self) -> None:
+        """Switch to exploitation, the temperature drops to zero and stays there."""
+        _LOGGER.debug("Switching to exploitation phase")
+        self._temperature = 0.0
+
     def pre_run(self) -> None:
         """Initialize before the actual annealing run."""
         self._temperature_history.clear()
@@ -141,8 +174,11 @@ class AdaptiveSimulatedAnnealing(Predictor):
         for sp in ax.spines.values():
             sp.set_visible(False)
 
-    def plot(self) -> matplotlib.figure.Figure:
+    def plot(self) -> "matplotlib.figure.Figure":
         """Plot temperature history of adaptive simulated annealing."""
+        import matplotlib.pyplot as plt
+        from matplotlib.font_manager import FontProperties
+
         # Code adjusted based on:
         #    https://matplotlib.org/3.1.1/gallery/ticks_and_spines/multiple_yaxis_with_spines.html
 
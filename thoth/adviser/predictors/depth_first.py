@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# thoth-adviser
+# Copyright(C) 2020 Fridolin Pokorny
+#
+# This program is free software: you can redistribute it and / or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Implementation of a depth-first backtracking search resolving the latest stacks."""
+
+import logging
+import math
+from typing import List
+from typing import Optional
+from typing import Set
+from typing import Tuple
+
+import attr
+
+from ..predictor import Predictor
+from ..state import State
+
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@attr.s(slots=True)
+class DepthFirst(Predictor):
+    """Implementation of a depth-first backtracking search resolving the latest stacks.
+
+    Packages are resolved in the order they were introduced to the state, each trying the latest version
+    first. If a version cannot be resolved (for example, it conflicts with dependencies already resolved or it
+    is discarded by pipeline steps), the next version is tried; once all the versions were tried, the search
+    backtracks. Beam keeps only states on the current search path.
+
+    Conflicts are memoized - if resolving a package version failed, the failure is noted together with the
+    candidates for its dependencies in the state. The same package version is then not tried again in any
+    state offering the same candidates for its dependencies. This assumes pipeline steps do not discard a
+    package based on packages other than its dependencies.
+    """
+
+    memoize = attr.ib(type=bool, default=True, kw_only=True)
+
+    # Conflict keys consider all the dependencies of a package, including the conflicting ones.
+    REGISTER_SKIPPED_DEPENDENCIES = True
+
+    _stack = attr.ib(type=List[State], factory=list, init=False)
+    _conflicts = attr.ib(type=Set[int], factory=set, init=False)
+    _expanded_state = attr.ib(type=Optional[State], default=None, init=False)
+
+    def _compute_conflict_key(self, state: State, package_tuple: Tuple[str, str, str]) -> int:
+        """Compute key of the given package resolved in the given state, considering only its dependencies."""
+        dependency_names = {
+            dependency_tuple[0]
+            for dependency_tuple in self.context.dependencies.get(package_tuple[0], {}).get(package_tuple, ())
+        }
+        return hash(
+            (
+                package_tuple,
+                frozenset(
+                    (
+                        dependency_name,
+                        state.resolved_dependencies.get(dependency_name),
+                        frozenset(state.unresolved_dependencies.get(dependency_name, {}).values()),
+                    )
+                    for dependency_name in dependency_names
+                ),
+            )
+        )
+
+    def pre_run(self) -> None:
+        """Initialize before the actual depth-first search."""
+        super().pre_run()
+        self._stack.clear()
+        self._conflicts.clear()
+        self._expanded_state = None
+
+    def post_run(self) -> None:
+        """Release states kept on the search stack."""
+        _LOGGER.debug("Depth-first search memoized %d conflicts", len(self._conflicts))
+        self._stack.clear()
+        self._expanded_state = None
+
+    def set_reward_signal(self, state: State, package_tuple: Tuple[str, str, str], reward: float) -> None:
+        """Descend to the newly created state, note down conflicts."""
+        if math.isnan(reward):
+            if self.memoize and state is self._expanded_state:
+                self._conflicts.add(self._compute_conflict_key(state, package_tuple))
+            return
+
+        if math.isinf(reward) or (self._stack and self._stack[-1] is state):
+            # A final state or the last candidate resolved and state reused by resolver, keep the current frame.
+            return
+
+        self._stack.append(state)
+
+    def _get_candidate(self, state: State) -> Tuple[str, str, str]:
+        """Get the latest version of the first unresolved package, skip versions known to conflict."""
+        package_name = next(iter(state.unresolved_dependencies))
+        if self.memoize:
+            candidates = list(state.unresolved_dependencies[package_name].values())
+            for package_tuple in candidates[:-1]:
+                if self._compute_conflict_key(state, package_tuple) not in self._conflicts:
+                    return package_tuple
+
+                state.remove_unresolved_dependency(package_tuple)
+
+            return candidates[-1]
+
+        return state.get_first_unresolved_dependency(package_name)
+
+    def run(self) -> Tuple[State, Tuple[str, str, str]]:
+        """Expand the latest version of the first unresolved package in the state on top of the search stack."""
+        beam = self.context.beam
+        while self._stack and not beam.contains(self._stack[-1]):
+            # All the candidates were tried or the state was removed based on beam width, backtrack.
+            self._stack.pop()
+
+        if not self._stack:
+            # Backtracked to the root, continue with any other state kept in beam (e.g. created by pseudonyms).
+            self._stack.append(beam.max())
+
+        state = self._stack[-1]
+        self._expanded_state = state
+        return state, self._get_candidate(state)
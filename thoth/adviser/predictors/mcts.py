@@ -77,10 +77,7 @@ class MCTS(TemporalDifference):
 
         # We have reached a final/terminal state - mark down policy we used and accumulated reward.
         total_reward = state.score
-        for package_tuple in state.iter_resolved_dependencies():
-            record = self._policy.setdefault(package_tuple, [0.0, 0])
-            record[0] += total_reward
-            record[1] += 1
+        self._policy.add_rewards(state.iter_resolved_dependencies(), total_reward)
 
         # We have reached a new final - get another next time.
         self._next_state = None
@@ -88,8 +85,8 @@ class MCTS(TemporalDifference):
     def run(self) -> Tuple[State, Tuple[str, str, str]]:
         """Run MCTS with adaptive simulated annealing schedule."""
         # In a heat up part, we run TD-like learning on the first candidates, not to get stuck in one state
-        # that generates its children.
-        if self.context.iteration < self.context.limit // _MCTS_HEAT_UP:
+        # that generates its children. The heat up part is skipped if the policy was learnt in previous runs.
+        if not self._policy_loaded and self.context.iteration < self.context.limit // _MCTS_HEAT_UP:
             return super().run()
 
         # As beam can be limited to width, it can happen that the last stack is pushed away (based on the score)
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# thoth-adviser
+# Copyright(C) 2020 Fridolin Pokorny
+#
+# This program is free software: you can redistribute it and / or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""A policy learnt by reinforcement learning based predictors, backed by contiguous numeric arrays."""
+
+from array import array
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from typing import Any
+from typing import Dict
+from typing import Generator
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Tuple
+from typing import Union
+
+import attr
+
+from ..context import Context
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@attr.s(slots=True, eq=False)
+class Policy:
+    """A policy mapping package tuples to accumulated rewards and number of rewards accumulated.
+
+    Package tuples are interned to integer ids which index contiguous arrays of reward sums, counts and
+    averages. Averages are maintained on each update so that picking the best action out of a set of
+    package tuples is a lookup followed by an argmax computed by the interpreter in C.
+    """
+
+    _ids = attr.ib(type=Dict[Tuple[str, str, str], int], factory=dict, init=False)
+    _package_tuples = attr.ib(type=List[Tuple[str, str, str]], factory=list, init=False)
+    _rewards = attr.ib(type="array[float]", factory=lambda: array("d"), init=False)
+    _counts = attr.ib(type="array[int]", factory=lambda: array("q"), init=False)
+    _averages = attr.ib(type="array[float]", factory=lambda: array("d"), init=False)
+
+    @classmethod
+    def from_dict(cls, dict_: Dict[Tuple[str, str, str], List[Union[float, int]]]) -> "Policy":
+        """Create a policy out of a dictionary mapping package tuples to reward sums and counts."""
+        policy = cls()
+        for package_tuple, (reward, count) in dict_.items():
+            package_tuple_id = policy._intern(package_tuple)
+            policy._rewards[package_tuple_id] = reward
+            policy._counts[package_tuple_id] = int(count)
+            policy._averages[package_tuple_id] = reward / count if count else 0.0
+
+        return policy
+
+    def to_dict(self) -> Dict[Tuple[str, str, str], List[Union[float, int]]]:
+        """Convert the policy to a dictionary mapping package tuples to reward sums and counts."""
+        return dict(self.items())
+
+    def _intern(self, package_tuple: Tuple[str, str, str]) -> int:
+        """Get id of the given package tuple, allocate a new one if not seen yet."""
+        package_tuple_id = self._ids.get(package_tuple)
+        if package_tuple_id is None:
+            package_tuple_id = len(self._package_tuples)
+            self._ids[package_tuple] = package_tuple_id
+            self._package_tuples.append(package_tuple)
+            self._rewards.append(0.0)
+            self._counts.append(0)
+            self._averages.append(0.0)
+
+        return package_tuple_id
+
+    def add_reward(self, package_tuple: Tuple[str, str, str], reward: float) -> None:
+        """Accumulate the given reward for the given package tuple."""
+        self.add_rewards((package_tuple,), reward)
+
+    def add_rewards(self, package_tuples: Iterable[Tuple[str, str, str]], reward: float) -> None:
+        """Accumulate the given reward for each of the given package tuples."""
+        ids, rewards, counts, averages = self._ids, self._rewards, self._counts, self._averages
+        for package_tuple in package_tuples:
+            package_tuple_id = ids.get(package_tuple)
+            if package_tuple_id is None:
+                package_tuple_id = self._intern(package_tuple)
+
+            rewards[package_tuple_id] += reward
+            counts[package_tuple_id] += 1
+            averages[package_tuple_id] = rewards[package_tuple_id] / counts[package_tuple_id]
+
+    def get(self, package_tuple: Tuple[str, str, str]) -> Optional[List[Union[float, int]]]:
+        """Get reward sum and count for the given package tuple, None if no reward was accumulated."""
+        package_tuple_id = self._ids.get(package_tuple)
+        if package_tuple_id is None:
+            return None
+
+        return [self._rewards[package_tuple_id], self._counts[package_tuple_id]]
+
+    def get_best(self, package_tuples: Iterable[Tuple[str, str, str]]) -> Optional[Tuple[str, str, str]]:
+        """Get package tuple with the highest average reward, None if no reward was accumulated for any of them.
+
+        If more package tuples have the same average reward, the first one is returned.
+        """
+        known_ids = [
+            package_tuple_id for package_tuple_id in map(self._ids.get, package_tuples) if package_tuple_id is not None
+        ]
+        if not known_ids:
+            return None
+
+        return self._package_tuples[max(known_ids, key=self._averages.__getitem__)]
+
+    def decay(self, factor: float) -> None:
+        """Decay counts of rewards accumulated, averages are kept - new rewards have a higher impact afterwards."""
+        for package_tuple_id in range(len(self._package_tuples)):
+            count = max(int(self._counts[package_tuple_id] * factor), 1)
+            self._counts[package_tuple_id] = count
+            self._rewards[package_tuple_id] = self._averages[package_tuple_id] * count
+
+    def clear(self) -> None:
+        """Remove all the records kept."""
+        self._ids.clear()
+        self._package_tuples.clear()
+        self._rewards = array("d")
+        self._counts = array("q")
+        self._averages = array("d")
+
+    def items(self) -> Generator[Tuple[Tuple[str, str, str], List[Union[float, int]]], None, None]:
+        """Iterate over package tuples with their reward sums and counts."""
+        for package_tuple_id, package_tuple in enumerate(self._package_tuples):
+            yield package_tuple, [self._rewards[package_tuple_id], self._counts[package_tuple_id]]
+
+    def __len__(self) -> int:
+        """Get number of package tuples with rewards accumulated."""
+        return len(self._package_tuples)
+
+    def __contains__(self, package_tuple: Any) -> bool:
+        """Check if any reward was accumulated for the given package tuple."""
+        return package_tuple in self._ids
+
+    def __eq__(self, other: Any) -> bool:
+        """Compare policies, a policy is equal to a dictionary with the same records."""
+        if isinstance(other, Policy):
+            other = other.to_dict()
+
+        if isinstance(other, dict):
+            return self.to_dict() == other
+
+        return NotImplemented
+
+
+@attr.s(slots=True)
+class PolicyStore:
+    """A local store of learnt policies, policies are keyed by runtime environment and direct dependencies."""
+
+    path = attr.ib(type=str)
+
+    @staticmethod
+    def get_key(context: Context) -> str:
+        """Compute key for a policy learnt in the given context."""
+        pipfile = context.project.pipfile
+        key = {
+            "runtime_environment": context.project.runtime_environment.to_dict(),
+            "direct_dependencies": sorted(pipfile.packages.packages),
+            "direct_dev_dependencies": sorted(pipfile.dev_packages.packages),
+        }
+        return hashlib.sha256(json.dumps(key, sort_keys=True).encode()).hexdigest()
+
+    def _get_policy_path(self, key: str) -> str:
+        """Get path to a file storing policy with the given key."""
+        return os.path.join(self.path, f"{key}.json")
+
+    def load(self, key: str) -> Optional[Policy]:
+        """Load policy stored under the given key, return None if no policy was stored or it cannot be loaded."""
+        try:
+            with open(self._get_policy_path(key)) as policy_file:
+                records = json.load(policy_file)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            _LOGGER.exception("Failed to load policy %r from %r, starting with an empty policy", key, self.path)
+            return None
+
+        return Policy.from_dict(
+            {(name, version, index): [reward, count] for name, version, index, reward, count in records}
+        )
+
+    def save(self, key: str, policy: Policy) -> None:
+        """Store the given policy under the given key, the policy is written atomically."""
+        os.makedirs(self.path, exist_ok=True)
+        records = [[*package_tuple, reward, count] for package_tuple, (reward, count) in policy.items()]
+        fd, tmp_path = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as policy_file:
+                json.dump(records, policy_file)
+
+            os.replace(tmp_path, self._get_policy_path(key))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
@@ -18,44 +18,86 @@
 """Implementation of a random sampling of the state space."""
 
 import logging
+import random
 
 import attr
 from typing import List
 from typing import Tuple
-
-import matplotlib
-import matplotlib.pyplot as plt
-from matplotlib.font_manager import FontProperties
+from typing import TYPE_CHECKING
 
 from ..predictor import Predictor
 from ..state import State
 from ..exceptions import NoHistoryKept
 
+if TYPE_CHECKING:
+    import matplotlib.figure
+
 
 _LOGGER = logging.getLogger(__name__)
 
 
 @attr.s(slots=True)
 class Sampling(Predictor):
-    """Implementation of a random sampling of the state space."""
+    """Implementation of a random sampling of the state space.
 
-    _history = attr.ib(type=List[Tuple[float, int]], default=attr.Factory(list), init=False)
+    If score weighted, states with a higher score are picked more likely (see Beam.get_random_weighted).
+    """
 
-    def run(self) -> Tuple[State, Tuple[str, str, str]]:
-        """Get random state and random unresolved dependency from the beam for the next resolution round."""
-        state = self.context.beam.get_random()
+    score_weighted = attr.ib(type=bool, kw_only=True, default=False)
 
+    _history = attr.ib(type=List[Tuple[float, int]], default=attr.Factory(list), init=False)
+
+    def _get_expansion(self, state: State) -> Tuple[State, Tuple[str, str, str]]:
+        """Pick a random unresolved dependency of the given sampled state."""
         if self.keep_history:
             self._history.append((state.score, self.context.accepted_final_states_count))
 
         return state, state.get_random_unresolved_dependency(prefer_recent=False)
 
+    def run(self) -> Tuple[State, Tuple[str, str, str]]:
+        """Get random state and random unresolved dependency from the beam for the next resolution round."""
+        if self.score_weighted:
+            state = self.context.beam.get_random_weighted()
+        else:
+            state = self.context.beam.get_random()
+
+        return self._get_expansion(state)
+
+    def run_batch(self, size: int) -> List[Tuple[State, Tuple[str, str, str]]]:
+        """Sample states without replacement, at most one expansion per state kept in the beam is returned.
+
+        Score weighted sampling draws states repeatedly and skips states already drawn, the batch returned can be
+        smaller if the highest rated states are drawn most of the time.
+        """
+        beam = self.context.beam
+        size = min(size, beam.size)
+        if self.score_weighted:
+            states = (beam.get_random_weighted() for _ in range(2 * size))
+        else:
+            states = (beam.get(idx) for idx in random.sample(range(beam.size), size))
+
+        result = []
+        seen = set()
+        for state in states:
+            if id(state) in seen:
+                continue
+
+            seen.add(id(state))
+            result.append(self._get_expansion(state))
+            if len(result) == size:
+                break
+
+        return result
+
     def pre_run(self) -> None:
         """Initialize before the sampling run."""
         self._history = []
 
-    def plot(self) -> matplotlib.figure.Figure:
+    def plot(self) -> "matplotlib.figure.Figure":
         """Plot score of the highest rated stack during sampling."""
+        import matplotlib.pyplot as plt
+        from matplotlib.font_manager import FontProperties
+
         if not self._history:
             raise NoHistoryKept("No history datapoints kept")
 
@@ -18,19 +18,20 @@
 """Implementation of Temporal Difference (TD) based predictor with adaptive simulated annealing schedule."""
 
 from typing import Any
-from typing import Dict
 from typing import List
 from typing import Tuple
-from typing import Union
 from typing import Optional
 import logging
 import math
+import os
 import random
 import signal
 
 import attr
 
 from .annealing import AdaptiveSimulatedAnnealing
+from .policy import Policy
+from .policy import PolicyStore
 from ..state import State
 
 
@@ -43,7 +44,7 @@ def _sigusr1_handler(sig_num: int, _: Any) -> None:
     global _INSTANCE
 
     _LOGGER.debug("Switching to exploitation phase based on a signal")
-    _INSTANCE._temperature = 0.0  # type: ignore
+    _INSTANCE.exploit()  # type: ignore
 
 
 @attr.s(slots=True)
@@ -52,7 +53,13 @@ class TemporalDifference(AdaptiveSimulatedAnnealing):
 
     step = attr.ib(type=int, default=1, kw_only=True)
     trace = attr.ib(type=bool, default=True, kw_only=True)
-    _policy = attr.ib(type=Dict[Tuple[str, str, str], List[Union[float, int]]], factory=dict, init=False)
+    # A directory where learnt policies are persisted, policies are not persisted if not set.
+    policy_store = attr.ib(type=Optional[str], default=os.getenv("THOTH_ADVISER_POLICY_STORE") or None, kw_only=True)
+    # Decay applied on counts of a persisted policy when loaded.
+    policy_decay = attr.ib(type=float, default=0.5, kw_only=True)
+    _policy = attr.ib(type=Policy, factory=Policy, init=False)
+    _policy_key = attr.ib(type=Optional[str], default=None, init=False)
+    _policy_loaded = attr.ib(type=bool, default=False, init=False)
     _steps_reward = attr.ib(type=float, default=0.0, init=False)
     _steps_taken = attr.ib(type=int, default=0, init=False)
     _next_state = attr.ib(type=Optional[State], default=None, init=False)
@@ -67,12 +74,36 @@ class TemporalDifference(AdaptiveSimulatedAnnealing):
         if value < 1:
             raise ValueError(f"Step set to {value} is not valid for n-step TD-learning")
 
+    @policy_decay.validator
+    def _policy_decay_validator(self, _: str, value: float) -> None:
+        """Validate decay applied on a persisted policy."""
+        if not isinstance(value, (int, float)) or not 0.0 < value <= 1.0:
+            raise ValueError(f"Policy decay has to be a number in range (0, 1], got {value!r}")
+
+    def _load_policy(self) -> None:
+        """Load a policy persisted in a previous run with the same runtime environment and direct dependencies."""
+        self._policy_key = PolicyStore.get_key(self.context)
+        policy = PolicyStore(self.policy_store).load(self._policy_key)  # type: ignore
+        if policy is None:
+            _LOGGER.debug("No policy persisted for %r", self._policy_key)
+            return
+
+        _LOGGER.info("Using policy persisted for %r with %d records", self._policy_key, len(policy))
+        policy.decay(self.policy_decay)
+        self._policy = policy
+        self._policy_loaded = True
+
     def pre_run(self) -> None:
         """Initialize pre-running of this predictor."""
         global _INSTANCE
 
         super().pre_run()
         self._policy.clear()
+        self._policy_key = None
+        self._policy_loaded = False
+        if self.policy_store:
+            self._load_policy()
+
         self._temperature = float(self.context.limit)
         self._steps_taken = 0
         self._steps_reward = 0.0
@@ -91,6 +122,12 @@ class TemporalDifference(AdaptiveSimulatedAnnealing):
         self._old_handler = None
         _INSTANCE = None
 
+        if self.policy_store and self._policy_key:
+            try:
+                PolicyStore(self.policy_store).save(self._policy_key, self._policy)
+            except OSError:
+                _LOGGER.exception("Failed to persist policy %r to %r", self._policy_key, self.policy_store)
+
     def set_reward_signal(self, state: State, package_tuple: Tuple[str, str, str], reward: float) -> None:
         """Note down reward signal of the last action performed."""
         trajectory_end = math.isnan(reward) or math.isinf(reward)
@@ -103,18 +140,17 @@ class TemporalDifference(AdaptiveSimulatedAnnealing):
             return
 
         if self.trace:
-            for package_tuple in state.iter_resolved_dependencies():
-                record = self._policy.setdefault(package_tuple, [0.0, 0])
-                record[0] += self._steps_reward
-                record[1] += 1
+            self._policy.add_rewards(state.iter_resolved_dependencies(), self._steps_reward)
         else:
-            record = self._policy.setdefault(package_tuple, [0.0, 0])
-            record[0] += self._steps_reward
-            record[1] += 1
+            self._policy.add_reward(package_tuple, self._steps_reward)
 
         self._steps_taken = 0  # Set back to zero as we update policy.
         self._steps_reward = 0.0
 
+    def run_batch(self, size: int) -> List[Tuple[State, Tuple[str, str, str]]]:
+        """Get a single expansion, the next state in a trajectory depends on the reward signal of the previous one."""
+        return [self.run()]
+
     def run(self) -> Tuple[State, Tuple[str, str, str]]:
         """Run Temporal Difference (TD) with adaptive simulated annealing schedule."""
         if self._next_state is not None:
@@ -170,19 +206,9 @@ class TemporalDifference(AdaptiveSimulatedAnnealing):
 
     def _do_exploitation(self, state: State) -> Tuple[str, str, str]:
         """Perform expansion of a highest rated stack with action that should yield highest reward."""
-        to_resolve_average = None
-        to_resolve_package_tuple = None
-        for package_tuple in state.iter_unresolved_dependencies():
-            reward_records = self._policy.get(package_tuple)
-            if reward_records is None:
-                continue
-
-            # Compute average - we want to be skewed based on the reward signal
-            # we aggregate (so for example median of medians is not that suitable).
-            average = reward_records[0] / reward_records[1]
-            if to_resolve_average is None or to_resolve_average < average:
-                to_resolve_average = average
-                to_resolve_package_tuple = package_tuple
+        # Use average - we want to be skewed based on the reward signal
+        # we aggregate (so for example median of medians is not that suitable).
+        to_resolve_package_tuple = self._policy.get_best(state.iter_unresolved_dependencies())
 
         # Make sure we found a candidate based on rewards marked. If not, pick a random one.
         return to_resolve_package_tuple or state.get_random_unresolved_dependency(prefer_recent=True)
@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+# thoth-adviser
+# Copyright(C) 2020 Fridolin Pokorny
+#
+# This program is free software: you can redistribute it and / or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Implementation of Upper Confidence bounds applied to Trees (UCT) based predictor."""
+
+from array import array
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Set
+from typing import Tuple
+import logging
+import math
+import weakref
+
+import attr
+
+from ..predictor import Predictor
+from ..state import State
+
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@attr.s(slots=True)
+class UCT(Predictor):
+    """Implementation of Upper Confidence bounds applied to Trees (UCT) based predictor.
+
+    The predictor maintains a search tree with nodes keyed by fingerprints of states - a fingerprint is an order
+    independent hash of resolved dependencies. Nodes keep number of visits and sum of rewards obtained in
+    contiguous arrays. Each round, the tree is descended from its root picking children with the highest UCB1 value
+    until a node is reached which can be expanded, respecting progressive widening as the branching factor is
+    usually large. The state of the node is then expanded and the resolution continues with the newly created
+    state (a rollout) until a final state or a dead end is reached - the reward obtained is then propagated back
+    to the root. Nodes are pruned once their states are garbage collected (see `finalize_state') and they have no
+    children.
+    """
+
+    # Exploration constant used in UCB1.
+    exploration = attr.ib(type=float, default=math.sqrt(2), kw_only=True)
+    # Progressive widening - a node can have at most ceil(coefficient * visits ** exponent) children.
+    widening_coefficient = attr.ib(type=float, default=1.0, kw_only=True)
+    widening_exponent = attr.ib(type=float, default=0.5, kw_only=True)
+
+    _fingerprints = attr.ib(type=Dict[int, int], factory=dict, init=False)
+    _state_nodes = attr.ib(type=Dict[int, int], factory=dict, init=False)
+    _node_fingerprints = attr.ib(type="array[int]", factory=lambda: array("q"), init=False)
+    _parents = attr.ib(type="array[int]", factory=lambda: array("q"), init=False)
+    _refs = attr.ib(type="array[int]", factory=lambda: array("q"), init=False)
+    _visits = attr.ib(type="array[int]", factory=lambda: array("q"), init=False)
+    _values = attr.ib(type="array[float]", factory=lambda: array("d"), init=False)
+    _children = attr.ib(type=List[Set[int]], factory=list, init=False)
+    _states = attr.ib(type=List[Optional["weakref.ReferenceType[State]"]], factory=list, init=False)
+    _free = attr.ib(type=List[int], factory=list, init=False)
+    _value_min = attr.ib(type=float, default=0.0, init=False)
+    _value_max = attr.ib(type=float, default=0.0, init=False)
+    _exploitation = attr.ib(type=bool, default=False, init=False)
+    _next_state = attr.ib(type=Optional[State], default=None, init=False)
+    _expanded_node = attr.ib(type=int, default=0, init=False)
+    _expanded_state_id = attr.ib(type=int, default=0, init=False)
+    _expanded_adds = attr.ib(type=bool, default=False, init=False)
+
+    @exploration.validator
+    @widening_coefficient.validator
+    @widening_exponent.validator
+    def _non_negative_validator(self, attribute: attr.Attribute, value: float) -> None:  # type: ignore
+        """Validate the given configuration option is a non-negative number."""
+        if not isinstance(value, (int, float)) or value < 0:
+            raise ValueError(f"Option {attribute.name!r} has to be a non-negative number, got {value!r}")
+
+    @property
+    def size(self) -> int:
+        """Get number of nodes kept in the tree, excluding the root."""
+        return len(self._node_fingerprints) - len(self._free) - 1
+
+    def pre_run(self) -> None:
+        """Initialize pre-running of this predictor."""
+        super().pre_run()
+        self._fingerprints.clear()
+        self._state_nodes.clear()
+        self._node_fingerprints = array("q", [0])
+        self._parents = array("q", [-1])
+        self._refs = array("q", [0])
+        self._visits = array("q", [0])
+        self._values = array("d", [0.0])
+        self._children = [set()]
+        self._states = [None]
+        self._free.clear()
+        self._value_min = 0.0
+        self._value_max = 0.0
+        self._exploitation = False
+        self._next_state = None
+        self._expanded_node = 0
+        self._expanded_state_id = 0
+        self._expanded_adds = False
+
+    def post_run(self) -> None:
+        """De-initialize resources used by this predictor."""
+        _LOGGER.debug("Search tree kept %d nodes when the resolution finished", self.size)
+        self._next_state = None
+
+    def exploit(self) -> None:
+        """Switch to exploitation, only the best rated children are descended and no new children are expanded."""
+        self._exploitation = True
+
+    def finalize_state(self, state_id: int) -> None:
+        """Prune nodes that are no longer needed as states were garbage collected."""
+        self._unbind_state(state_id)
+
+    @staticmethod
+    def _compute_fingerprint(state: State) -> int:
+        """Compute fingerprint of the given state, it does not depend on order in which dependencies were resolved."""
+        fingerprint = 0
+        for package_tuple in state.resolved_dependencies.values():
+            fingerprint ^= hash(package_tuple)
+
+        return fingerprint
+
+    def _allocate_node(self, fingerprint: int, parent: int) -> int:
+        """Allocate a new node in the tree with the given fingerprint."""
+        if self._free:
+            node = self._free.pop()
+            self._node_fingerprints[node] = fingerprint
+            self._parents[node] = parent
+            self._refs[node] = 0
+            self._visits[node] = 0
+            self._values[node] = 0.0
+        else:
+            node = len(self._node_fingerprints)
+            self._node_fingerprints.append(fingerprint)
+            self._parents.append(parent)
+            self._refs.append(0)
+            self._visits.append(0)
+            self._values.append(0.0)
+            self._children.append(set())
+            self._states.append(None)
+
+        self._fingerprints[fingerprint] = node
+        self._children[parent].add(node)
+        self._refs[parent] += 1
+        return node
+
+    def _release_node(self, node: int) -> None:
+        """Release the given node and its ancestors if they are no longer referenced."""
+        while node > 0 and self._refs[node] == 0:
+            fingerprint = self._node_fingerprints[node]
+            if self._fingerprints.get(fingerprint) == node:
+                del self._fingerprints[fingerprint]
+
+            self._states[node] = None
+            self._free.append(node)
+
+            parent = self._parents[node]
+            if parent < 0:
+                break
+
+            self._children[parent].discard(node)
+            self._refs[parent] -= 1
+            node = parent
+
+    def _detach_node(self, node: int) -> None:
+        """Detach the given node from the tree so that it is not descended, it is released once unreferenced."""
+        fingerprint = self._node_fingerprints[node]
+        if self._fingerprints.get(fingerprint) == node:
+            del self._fingerprints[fingerprint]
+
+        self._states[node] = None
+        parent = self._parents[node]
+        self._parents[node] = -1
+        self._children[parent].discard(node)
+        self._refs[parent] -= 1
+        self._release_node(parent)
+
+    def _bind_state(self, state: State, node: int) -> None:
+        """Bind the given state to the given node."""
+        state_id = id(state)
+        previous_node = self._state_nodes.get(state_id)
+        self._states[node] = weakref.ref(state)
+        if previous_node == node:
+            return
+
+        self._state_nodes[state_id] = node
+        self._refs[node] += 1
+        if previous_node is not None:
+            self._refs[previous_node] -= 1
+            self._release_node(previous_node)
+
+    def _unbind_state(self, state_id: int) -> None:
+        """Unbind state with the given id from its node."""
+        node = self._state_nodes.pop(state_id, None)
+        if node is None:
+            return
+
+        self._refs[node] -= 1
+        self._release_node(node)
+
+    def _get_node(self, state: State) -> int:
+        """Get node for the given state, create one under the root if the state was not seen yet."""
+        node = self._state_nodes.get(id(state))
+        if node is not None:
+            return node
+
+        fingerprint = self._compute_fingerprint(state)
+        node = self._fingerprints.get(fingerprint)
+        if node is None:
+            node = self._allocate_node(fingerprint, 0)
+
+        self._bind_state(state, node)
+        return node
+
+    def _backpropagate(self, node: int, reward: float) -> None:
+        """Propagate the reward obtained from the given node up to the root."""
+        self._value_min = min(self._value_min, reward)
+        self._value_max = max(self._value_max, reward)
+        while node >= 0:
+            self._visits[node] += 1
+            self._values[node] += reward
+            node = self._parents[node]
+
+    def _get_expandable_state(self, node: int) -> Optional[State]:
+        """Get state bound to the given node if it can be expanded."""
+        state_ref = self._states[node]
+        state = state_ref() if state_ref is not None else None
+        if state is None or not state.unresolved_dependencies:
+            return None
+
+        return state
+
+    def _select(self) -> Optional[State]:
+        """Descend the tree from its root and select a state to be expanded."""
+        visits, values = self._visits, self._values
+        value_range = self._value_max - self._value_min
+        exploration = 0.0 if self._exploitation else self.exploration
+
+        node = 0
+        while True:
+            state = self._get_expandable_state(node) if node else None
+            children = self._children[node]
+            if state is not None:
+                if not children:
+                    return state
+
+                widening = math.ceil(self.widening_coefficient * max(visits[node], 1) ** self.widening_exponent)
+                if not self._exploitation and len(children) < widening:
+                    return state
+            elif not children:
+                if not node:
+                    return None
+
+                # A dead end - the state was discarded or is final, do not descend here and start over.
+                self._detach_node(node)
+                node = 0
+                continue
+
+            log_visits = math.log(max(visits[node], 1))
+
+            def ucb1(child: int) -> float:
+                child_visits = visits[child]
+                if child_visits == 0:
+                    return math.inf
+
+                mean = values[child] / child_visits
+                normalized = (mean - self._value_min) / value_range if value_range > 0.0 else 0.0
+                return normalized + exploration * math.sqrt(log_visits / child_visits)
+
+            node = max(children, key=ucb1)
+
+    def run(self) -> Tuple[State, Tuple[str, str, str]]:
+        """Run UCT, continue with the current rollout or select a state to be expanded based on UCB1."""
+        state = self._next_state
+        self._next_state = None
+        if state is None or (state is not self.context.beam.get_last() and id(state) != self._expanded_state_id):
+            state = self._select() or self.context.beam.max()
+
+        package_tuple = state.get_random_unresolved_dependency(prefer_recent=True)
+
+        self._expanded_node = self._get_node(state)
+        self._expanded_state_id = id(state)
+        self._expanded_adds = package_tuple[0] not in state.resolved_dependencies
+        return state, package_tuple
+
+    def set_reward_signal(self, state: State, package_tuple: Tuple[str, str, str], reward: float) -> None:
+        """Note down reward signal of the last action performed."""
+        if math.isnan(reward):
+            # A dead end reached, treat it as the worst outcome observed so far.
+            self._backpropagate(self._expanded_node, self._value_min)
+            return
+
+        node = self._expanded_node
+        if self._expanded_adds and state.resolved_dependencies.get(package_tuple[0]) == package_tuple:
+            fingerprint = self._node_fingerprints[node] ^ hash(package_tuple)
+            child = self._fingerprints.get(fingerprint)
+            if child is None:
+                child = self._allocate_node(fingerprint, node)
+            node = child
+
+        if math.isinf(reward):
+            # A final state reached, it is not expanded anymore.
+            self._backpropagate(node, state.score)
+            if self._state_nodes.get(id(state)) != node:
+                self._unbind_state(id(state))
+                self._release_node(node)
+            else:
+                self._unbind_state(id(state))
+            return
+
+        self._bind_state(state, node)
+        self._next_state = state
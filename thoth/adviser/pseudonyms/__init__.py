@@ -17,9 +17,7 @@
 
 """Pseudonym units implemented in adviser."""
 
-from ._debug import AliasPseudonym
-from .intel_tensorflow import IntelTensorFlowPseudonym
-from .tensorflow_gpu import TensorFlowGPUPseudonym
+from ..unit_registry import lazy_unit_getattr
 
 # Relative ordering of units is relevant, as the order specifies order
 # in which the asked to be registered - any dependencies between them
@@ -29,3 +27,5 @@ __all__ = [
     "IntelTensorFlowPseudonym",
     "TensorFlowGPUPseudonym",
 ]
+
+__getattr__ = lazy_unit_getattr(__name__, __all__)
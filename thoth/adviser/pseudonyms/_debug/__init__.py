@@ -17,6 +17,8 @@
 
 """Pseudonym units used for debugging or suitable for experiments."""
 
-from .alias import AliasPseudonym
+from ...unit_registry import lazy_unit_getattr
 
 __all__ = ["AliasPseudonym"]
+
+__getattr__ = lazy_unit_getattr(__name__, __all__)
@@ -96,3 +96,7 @@ class Report:
     def iter_products_sorted(self, reverse: bool = True) -> Generator[Product, None, None]:
         """Iterate over products stored in this report, respect their scores."""
         return (item[1] for item in sorted(self._heapq, key=operator.itemgetter(0), reverse=reverse))
+
+    def iter_top_products(self, k: int) -> Generator[Product, None, None]:
+        """Iterate over k best products stored in this report, selected lazily in O(N log(k))."""
+        yield from (item[1] for item in heapq.nlargest(k, self._heapq, key=operator.itemgetter(0)))
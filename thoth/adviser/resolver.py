@@ -29,18 +29,22 @@ from typing import List
 from typing import Union
 from typing import Set
 from typing import Iterator
+from typing import Deque
+from typing import FrozenSet
+from typing import TYPE_CHECKING
 import logging
 from itertools import chain
 import contextlib
 import signal
 import weakref
+from collections import deque
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
 
-import matplotlib
-import matplotlib.pyplot as plt
-from matplotlib.font_manager import FontProperties
 from thoth.common import get_justification_link as jl
 from thoth.python import PackageVersion
 from thoth.python import Project
+from thoth.python import Source
 from thoth.storages import GraphDatabase
 from thoth.storages.exceptions import NotFoundError
 
@@ -69,12 +73,18 @@ from .report import Report
 from .solver import PythonPackageGraphSolver
 from .state import State
 from .unit import Unit
+from .utils import get_memory_usage
 from .utils import log_once
 
 import attr
 
+if TYPE_CHECKING:
+    import matplotlib.figure
+
 _LOGGER = logging.getLogger(__name__)
 _NO_EXTRAS = frozenset([None])
+# Memory usage has to grow by this ratio since beam was shrunk the last time to shrink beam again.
+_MEMORY_SHRINK_GROWTH = 0.1
 
 
 def _beam_width(value: Any) -> Optional[int]:
@@ -117,6 +127,24 @@ def _limit_latest_versions(value: Any) -> Optional[int]:
     return value
 
 
+def _memory_limit(value: Any) -> Optional[int]:
+    """Set and convert memory limit in bytes, environment variables are passed as strings."""
+    if value is None or value == "":
+        return None
+
+    memory_limit = int(value)
+    if memory_limit < 0:
+        if memory_limit == -1:
+            return None
+
+        raise ValueError(
+            f"Cannot set memory limit to a negative value {memory_limit!r}, accepted values are [None, -1] for no "
+            "limit and any positive integer"
+        )
+
+    return memory_limit
+
+
 def _library_usage(value: Any) -> Dict[str, Any]:
     """Set and convert limit latest versions property."""
     if value is None:
@@ -141,6 +169,17 @@ def _sigint_handler(resolver: "Resolver") -> Iterator[None]:
     signal.signal(signal.SIGINT, old_handler)
 
 
+@contextlib.contextmanager
+def _state_finalizer(predictor: Predictor) -> Iterator[None]:
+    """Notify predictor about states being destructed, only if the predictor implements state finalization."""
+    finalize_state = predictor.finalize_state
+    if getattr(finalize_state, "__func__", None) is Predictor.finalize_state:
+        yield
+    else:
+        with State.assigned_finalizer(finalize_state):
+            yield
+
+
 @attr.s(slots=True)
 class Resolver:
     """Resolver for resolving software stacks using pipeline configuration and a predictor."""
@@ -149,6 +188,8 @@ class Resolver:
     DEFAULT_COUNT = 3
     DEFAULT_BEAM_WIDTH = -1
     DEFAULT_LIMIT_LATEST_VERSIONS = -1
+    # Number of top rated states in beam logged on debug.
+    _BEAM_TOP_LOGGED = 5
 
     pipeline = attr.ib(type=PipelineConfig, kw_only=True)
     project = attr.ib(type=Project, kw_only=True)
@@ -175,12 +216,48 @@ class Resolver:
     cli_parameters = attr.ib(type=Dict[str, Any], default=attr.Factory(dict), kw_only=True)
     stop_resolving = attr.ib(type=bool, default=False, kw_only=True)
     log_iteration = attr.ib(type=int, kw_only=True, default=int(os.getenv("THOTH_ADVISER_LOG_ITERATION", 7500)))
+    lock_file_workers = attr.ib(type=int, kw_only=True, default=int(os.getenv("THOTH_ADVISER_LOCK_FILE_WORKERS", 4)))
+    # Number of expansions requested from predictor at once, dependencies of expanded packages are queried
+    # concurrently using `batch_workers' threads.
+    batch_size = attr.ib(type=int, kw_only=True, default=int(os.getenv("THOTH_ADVISER_BATCH_SIZE", 1)))
+    batch_workers = attr.ib(type=int, kw_only=True, default=int(os.getenv("THOTH_ADVISER_BATCH_WORKERS", 4)))
+    # Stack space is partitioned into `shard_count' disjoint shards based on versions of a direct dependency,
+    # only the shard `shard_index' is resolved.
+    shard_count = attr.ib(type=int, kw_only=True, default=1)
+    shard_index = attr.ib(type=int, kw_only=True, default=0)
+    # Memory governor - memory usage is checked each `memory_check_iteration' iterations, if it exceeds the soft
+    # limit, the lowest rated states are removed from beam, if it exceeds the hard limit, predictor is also
+    # asked to exploit. Beam width configured stays untouched.
+    memory_check_iteration = attr.ib(
+        type=int, kw_only=True, default=int(os.getenv("THOTH_ADVISER_MEMORY_CHECK_ITERATION", 1000))
+    )
+    memory_soft_limit = attr.ib(
+        type=Optional[int],
+        kw_only=True,
+        default=os.getenv("THOTH_ADVISER_MEMORY_SOFT_LIMIT"),
+        converter=_memory_limit,
+    )
+    memory_hard_limit = attr.ib(
+        type=Optional[int],
+        kw_only=True,
+        default=os.getenv("THOTH_ADVISER_MEMORY_HARD_LIMIT"),
+        converter=_memory_limit,
+    )
 
     _beam = attr.ib(type=Optional[Beam], kw_only=True, default=None)
     _solver = attr.ib(type=Optional[PythonPackageGraphSolver], kw_only=True, default=None)
     _context = attr.ib(type=Optional[Context], default=None, kw_only=True)
     _history = attr.ib(type=List[Optional[float]], factory=list, init=False)
     _history_max = attr.ib(type=List[Optional[float]], factory=list, init=False)
+    # Memory usage noted when beam was shrunk the last time, beam is shrunk again only if memory usage grows
+    # by _MEMORY_SHRINK_GROWTH since then.
+    _memory_usage_shrunk = attr.ib(type=Optional[int], default=None, init=False)
+    # Expansions obtained from predictor in a batch, states are weakly referenced so that states removed from
+    # beam while expanding the batch are not expanded.
+    _batch = attr.ib(type=Deque[Tuple["weakref.ReferenceType[State]", Tuple[str, str, str]]], factory=deque, init=False)
+    _batch_expanded = attr.ib(type=Set[int], factory=set, init=False)
+    _batch_executor = attr.ib(type=Optional[ThreadPoolExecutor], default=None, init=False)
+    _prefetched = attr.ib(factory=dict, init=False)  # type: Dict[Tuple[str, str, str], Future[Any]]
 
     _log_unresolved = attr.ib(type=Set[Tuple[str, str, str]], default=attr.Factory(set), kw_only=True)
     _log_unsolved = attr.ib(type=Set[str], default=attr.Factory(set), kw_only=True)
@@ -191,6 +268,11 @@ class Resolver:
 
     @limit.validator
     @count.validator
+    @lock_file_workers.validator
+    @memory_check_iteration.validator
+    @batch_size.validator
+    @batch_workers.validator
+    @shard_count.validator
     def _positive_int_validator(self, attribute: str, value: int) -> None:
         """Validate the given attribute - the given attribute should have a value of a positive integer."""
         if not isinstance(value, int):
@@ -199,6 +281,15 @@ class Resolver:
         if value <= 0:
             raise ValueError(f"Value for attribute {attribute!r} should be a positive integer, got {value} instead")
 
+    @shard_index.validator
+    def _shard_index_validator(self, attribute: str, value: int) -> None:
+        """Validate the given shard index is within the number of shards configured."""
+        if not isinstance(value, int) or not 0 <= value < self.shard_count:
+            raise ValueError(
+                f"Value for attribute {attribute!r} should be an integer in range [0, {self.shard_count}), "
+                f"got {value!r} instead"
+            )
+
     @property
     def context(self) -> Context:
         """Retrieve context bound to the current resolver."""
@@ -274,31 +365,36 @@ class Resolver:
         self, package_versions: List[PackageVersion], *, log_level: int = logging.DEBUG
     ) -> Generator[PackageVersion, None, None]:
         """Run sieves on each package tuple."""
+        if not package_versions:
+            return
+
+        sieves = self.pipeline.get_sieves(package_versions[0].name)
+        if not sieves:
+            yield from package_versions
+            return
+
         result = (pv for pv in package_versions)
-        if package_versions:
-            for sieve in chain(
-                self.pipeline.sieves_dict.get(package_versions[0].name, []), self.pipeline.sieves_dict.get(None, [])
-            ):
-                _LOGGER.debug("Running sieve %r", sieve.__class__.__name__)
-                sieve.unit_run = True
-                try:
-                    result = sieve.run(result)
-                except SkipPackage:
-                    raise
-                except NotAcceptable as exc:
-                    _LOGGER.log(
-                        log_level,
-                        "Sieve %r removed packages %r: %s",
-                        sieve.__class__.__name__,
-                        str(exc),
-                    )
-                    result = []  # type: ignore
-                    break
-                except Exception as exc:
-                    raise SieveError(
-                        f"Failed to run sieve {sieve.__class__.__name__!r} for "
-                        f"Python packages {[pv.to_tuple() for pv in package_versions]}: {str(exc)}"
-                    ) from exc
+        for sieve in sieves:
+            _LOGGER.debug("Running sieve %r", sieve.__class__.__name__)
+            sieve.unit_run = True
+            try:
+                result = sieve.run(result)
+            except SkipPackage:
+                raise
+            except NotAcceptable as exc:
+                _LOGGER.log(
+                    log_level,
+                    "Sieve %r removed packages %r: %s",
+                    sieve.__class__.__name__,
+                    str(exc),
+                )
+                result = []  # type: ignore
+                break
+            except Exception as exc:
+                raise SieveError(
+                    f"Failed to run sieve {sieve.__class__.__name__!r} for "
+                    f"Python packages {[pv.to_tuple() for pv in package_versions]}: {str(exc)}"
+                ) from exc
 
         yield from result
 
@@ -335,9 +431,7 @@ class Resolver:
         score_addition = 0.0
         justification_addition = []
         skip_package = False
-        for step in chain(
-            self.pipeline.steps_dict.get(package_version.name, []), self.pipeline.steps_dict.get(None, [])
-        ):
+        for step in self.pipeline.get_steps(package_version.name):
             _LOGGER.debug("Running step %r for %r", step.__class__.__name__, package_version_tuple)
             step.unit_run = True
 
@@ -431,7 +525,6 @@ class Resolver:
             and not skip_package
         ):
             cloned_state = state.clone()
-            weakref.finalize(cloned_state, self.predictor.finalize_state, id(cloned_state)).atexit = False
         else:
             # Optimization - reuse the old one as it would be discarded anyway.
             cloned_state = state
@@ -465,11 +558,7 @@ class Resolver:
 
     def _run_strides(self, state: State) -> bool:
         """Run strides and check if the given state should be accepted."""
-        package_strides = []
-        for package_name in state.resolved_dependencies:
-            package_strides.extend(self.pipeline.strides_dict.get(package_name, []))
-
-        for stride in chain(package_strides, self.pipeline.strides_dict.get(None, [])):
+        for stride in self.pipeline.get_strides(state.resolved_dependencies):
             _LOGGER.debug("Running stride %r", stride.__class__.__name__)
             stride.unit_run = True
             try:
@@ -489,11 +578,7 @@ class Resolver:
 
     def _run_wraps(self, state: State) -> None:
         """Run all wraps bound to the current run context."""
-        package_wraps = []
-        for package_name in state.resolved_dependencies:
-            package_wraps.extend(self.pipeline.wraps_dict.get(package_name, []))
-
-        for wrap in chain(package_wraps, self.pipeline.wraps_dict.get(None, [])):
+        for wrap in self.pipeline.get_wraps(state.resolved_dependencies):
             _LOGGER.debug("Running wrap %r", wrap.__class__.__name__)
             wrap.unit_run = True
             try:
@@ -501,6 +586,21 @@ class Resolver:
             except Exception as exc:
                 raise WrapError(f"Failed to run wrap {wrap.__class__.__name__!r} on a final state: {str(exc)}") from exc
 
+    def _get_user_lock_file_hashes(self, package_versions: List[PackageVersion], source: Source) -> Dict[str, Set[str]]:
+        """Obtain known hashes for the given locked packages from the given source, query the database concurrently."""
+        with ThreadPoolExecutor(max_workers=self.lock_file_workers) as executor:
+            futures = {
+                package_version.name: executor.submit(
+                    self.graph.get_python_package_hashes_sha256,
+                    package_version.name,
+                    package_version.locked_version,
+                    source.url,
+                )
+                for package_version in package_versions
+            }
+
+            return {package_name: set(future.result()) for package_name, future in futures.items()}
+
     def _prepare_user_lock_file(self, *, with_devel: bool = True) -> None:
         """Perform operations on the user's lock file required before running the pipeline.
 
@@ -508,7 +608,13 @@ class Resolver:
         package present in the lock file so we know from where these packages
         were installed. Pipfile.lock does not need to state the python index
         used when installing dependencies.
+
+        Hashes of all the packages without an index assigned are obtained in a batch per source
+        (queries are issued concurrently) and matched in memory. Sources are checked in the order
+        as stated in the lock file, packages with an already assigned index are not queried again.
         """
+        start_time = time.monotonic()
+
         sources = list(self.project.pipfile_lock.meta.sources.values())
         source_urls = {source.url for source in sources}
 
@@ -519,6 +625,7 @@ class Resolver:
                 f"not enabled: {', '.join(source_urls - enabled_indexes)}"
             )
 
+        to_assign = []
         for package_version in self.project.iter_dependencies_locked(with_devel=with_devel):
             if package_version.index is not None:
                 continue
@@ -527,36 +634,39 @@ class Resolver:
                 # Only one source configured, we can use it directly.
                 package_version.index = sources[0]
             else:
-                package_version_hashes = {h[len("sha256:") :] for h in package_version.hashes}
+                to_assign.append(package_version)
 
-                # Assign index based on sources.
-                for source in sources:
-                    known_hashes = set(
-                        self.graph.get_python_package_hashes_sha256(
-                            package_version.name,
-                            package_version.locked_version,
-                            source.url,
-                        )
-                    )
+        # Assign index based on sources.
+        for source in sources:
+            if not to_assign:
+                break
 
-                    if not known_hashes:
-                        continue
+            known_hashes = self._get_user_lock_file_hashes(to_assign, source)
 
-                    if known_hashes & package_version_hashes:
-                        _LOGGER.debug(
-                            "Assigning index %r for package %r in version %r based on "
-                            "the provenance database as index was not assigned in the lock file entry",
-                            source.url,
-                            package_version.name,
-                            package_version.locked_version,
-                        )
-                        package_version.index = source
-                        break
-                else:
-                    raise UserLockFileError(
-                        f"Could not determine provenance of package {package_version.name!r} "
-                        f"in version {package_version.locked_version!r}"
+            unassigned = []
+            for package_version in to_assign:
+                package_version_hashes = {h[len("sha256:") :] for h in package_version.hashes}
+                if known_hashes[package_version.name] & package_version_hashes:
+                    _LOGGER.debug(
+                        "Assigning index %r for package %r in version %r based on "
+                        "the provenance database as index was not assigned in the lock file entry",
+                        source.url,
+                        package_version.name,
+                        package_version.locked_version,
                     )
+                    package_version.index = source
+                else:
+                    unassigned.append(package_version)
+
+            to_assign = unassigned
+
+        if to_assign:
+            raise UserLockFileError(
+                f"Could not determine provenance of package {to_assign[0].name!r} "
+                f"in version {to_assign[0].locked_version!r}"
+            )
+
+        _LOGGER.info("Preparing user's lock file took %g seconds", time.monotonic() - start_time)
 
     def _maybe_score_user_lock_file(self, *, with_devel: bool = True) -> Optional[State]:
         """Score user's lock file submitted.
@@ -714,7 +824,7 @@ class Resolver:
             for direct_dependency in package_versions:
                 self.context.register_package_version(direct_dependency)
 
-            package_versions.sort(key=lambda pv: pv.semantic_version, reverse=True)
+            package_versions.sort(key=lambda pv: self.context.get_package_version_rank(pv.to_tuple()), reverse=True)
             try:
                 package_versions = list(self._run_sieves(package_versions))
             except SkipPackage as exc:
@@ -746,14 +856,48 @@ class Resolver:
             # dict during iteration.
             direct_dependencies.pop(direct_dependency_name)
 
+        if self.shard_count > 1:
+            self._shard_direct_dependencies(direct_dependencies)
+
         # Create an initial state which is made out of all the direct dependencies (kept as unresolved) in
         # resolved versions.
         self.beam.wipe()
         state = State.from_direct_dependencies(direct_dependencies)
-        weakref.finalize(state, self.predictor.finalize_state, id(state)).atexit = False
         self.beam.add_state(state)
         return state
 
+    def _shard_direct_dependencies(self, direct_dependencies: Dict[str, List[PackageVersion]]) -> None:
+        """Keep only versions of a direct dependency assigned to the current shard.
+
+        Each resolved stack has exactly one version of the direct dependency so stack spaces of shards are
+        disjoint. The direct dependency with the most versions is picked to keep shards balanced, versions are
+        assigned to shards in a round-robin fashion so that each shard resolves some of the recent versions.
+        """
+        package_name = max(direct_dependencies, key=lambda name: (len(direct_dependencies[name]), name))
+        package_versions = direct_dependencies[package_name]
+        shard_package_versions = package_versions[self.shard_index :: self.shard_count]
+        if not shard_package_versions:
+            msg = (
+                f"No versions of direct dependency {package_name!r} assigned to shard {self.shard_index} - "
+                f"there are {len(package_versions)} versions partitioned into {self.shard_count} shards"
+            )
+            self.context.stack_info.append(
+                {
+                    "type": "ERROR",
+                    "message": msg,
+                }
+            )
+            raise CannotProduceStack(msg, stack_info=self.context.stack_info)
+
+        _LOGGER.info(
+            "Shard %d resolves %d out of %d versions of direct dependency %r",
+            self.shard_index,
+            len(shard_package_versions),
+            len(package_versions),
+            package_name,
+        )
+        direct_dependencies[package_name] = shard_package_versions
+
     def _run_pseudonyms(self, state: State, package_tuples: Optional[List[Tuple[str, str, str]]] = None) -> None:
         """Run pseudonyms for the given package, clone state and add it to beam if needed."""
         for package_tuple in package_tuples or []:
@@ -829,20 +973,13 @@ class Resolver:
 
         state.remove_unresolved_dependency(package_tuple)
 
-        extras = _NO_EXTRAS
-        if package_version.extras:
-            extras = frozenset(list(package_version.extras) + [None])
-
+        prefetched = self._prefetched.pop(package_tuple, None)
+        records = None
         try:
-            dependencies = self.graph.get_depends_on(
-                *package_tuple,
-                os_name=self.project.runtime_environment.operating_system.name,
-                os_version=self.project.runtime_environment.operating_system.version,
-                python_version=self.project.runtime_environment.python_version,
-                extras=extras,
-                marker_evaluation_result=True if self.project.runtime_environment.is_fully_specified() else None,
-                is_missing=False,
-            )
+            if prefetched is not None:
+                dependencies, records = prefetched.result()
+            else:
+                dependencies = self._get_depends_on(package_tuple, self._get_extras(package_version))
         except NotFoundError:
             log_once(
                 _LOGGER,
@@ -863,13 +1000,119 @@ class Resolver:
             state=state,
             package_version=package_version,
             dependencies=list(chain(*dependencies.values())),
+            records=records,
+        )
+
+    @staticmethod
+    def _get_extras(package_version: PackageVersion) -> FrozenSet[Optional[str]]:
+        """Get extras of the given package used when querying its dependencies."""
+        if package_version.extras:
+            return frozenset(list(package_version.extras) + [None])
+
+        return _NO_EXTRAS
+
+    def _get_depends_on(
+        self, package_tuple: Tuple[str, str, str], extras: FrozenSet[Optional[str]]
+    ) -> Dict[Optional[str], List[Tuple[str, str]]]:
+        """Query dependencies of the given package in the runtime environment used."""
+        return self.graph.get_depends_on(  # type: ignore
+            *package_tuple,
+            os_name=self.project.runtime_environment.operating_system.name,
+            os_version=self.project.runtime_environment.operating_system.version,
+            python_version=self.project.runtime_environment.python_version,
+            extras=extras,
+            marker_evaluation_result=True if self.project.runtime_environment.is_fully_specified() else None,
+            is_missing=False,
         )
 
+    def _get_package_version_records(self, package_name: str, package_version: str) -> List[Dict[str, Any]]:
+        """Query records of the given package solved in the runtime environment used, across all indexes."""
+        return self.graph.get_python_package_version_records(  # type: ignore
+            package_name=package_name,
+            package_version=package_version,
+            index_url=None,  # Do cross-index resolving.
+            os_name=self.project.runtime_environment.operating_system.name,
+            os_version=self.project.runtime_environment.operating_system.version,
+            python_version=self.project.runtime_environment.python_version,
+        )
+
+    def _fetch_dependencies(
+        self, package_tuple: Tuple[str, str, str], extras: FrozenSet[Optional[str]]
+    ) -> Tuple[Dict[Optional[str], List[Tuple[str, str]]], Dict[Tuple[str, str], List[Dict[str, Any]]]]:
+        """Query dependencies of the given package together with their records, run in a worker thread."""
+        dependencies = self._get_depends_on(package_tuple, extras)
+        records = {}
+        for dependency in chain(*dependencies.values()):
+            if dependency not in records:
+                records[dependency] = self._get_package_version_records(*dependency)
+
+        return dependencies, records
+
+    def _prefetch_dependencies(self, package_tuples: List[Tuple[str, str, str]]) -> None:
+        """Query dependencies of the given packages concurrently, results are consumed when expanding states."""
+        if self._batch_executor is None:
+            self._batch_executor = ThreadPoolExecutor(max_workers=self.batch_workers)
+
+        for package_tuple in package_tuples:
+            if package_tuple in self._prefetched:
+                continue
+
+            package_version = self.context.get_package_version(package_tuple, graceful=False)
+            self._prefetched[package_tuple] = self._batch_executor.submit(
+                self._fetch_dependencies, package_tuple, self._get_extras(package_version)
+            )
+
+    def _get_expansion(self) -> Tuple[State, Tuple[str, str, str]]:
+        """Get state and its unresolved dependency to be expanded in the current iteration.
+
+        If batched expansions are configured, predictor is asked for a batch of expansions once the previous batch
+        is exhausted. Expansions are skipped if their state was already expanded in the batch, the state was
+        removed from beam, or the dependency is no longer unresolved in the state.
+        """
+        if self.batch_size == 1:
+            return self.predictor.run()
+
+        while True:
+            while self._batch:
+                state_ref, package_tuple = self._batch.popleft()
+                state = state_ref()
+                if (
+                    state is None
+                    or id(state) in self._batch_expanded
+                    or not self.beam.contains(state)
+                    or hash(package_tuple) not in state.unresolved_dependencies.get(package_tuple[0], ())
+                ):
+                    self._prefetched.pop(package_tuple, None)
+                    continue
+
+                self._batch_expanded.add(id(state))
+                return state, package_tuple
+
+            self._batch_expanded.clear()
+            self._prefetched.clear()
+            batch = self.predictor.run_batch(self.batch_size)
+            if not batch:
+                return self.predictor.run()
+
+            self._batch.extend((weakref.ref(state), package_tuple) for state, package_tuple in batch)
+            self._prefetch_dependencies([package_tuple for _, package_tuple in batch])
+            del batch
+
+    def _reset_batch(self) -> None:
+        """Discard any batched expansions and stop workers querying dependencies."""
+        self._batch.clear()
+        self._batch_expanded.clear()
+        self._prefetched.clear()
+        if self._batch_executor is not None:
+            self._batch_executor.shutdown(wait=True)
+            self._batch_executor = None
+
     def _expand_state_add_dependencies(
         self,
         state: State,
         package_version: PackageVersion,
         dependencies: List[Tuple[str, str]],
+        records: Optional[Dict[Tuple[str, str], List[Dict[str, Any]]]] = None,
     ) -> Optional[State]:
         """Create new state out of existing ones based on dependencies if necessary.
 
@@ -919,23 +1162,23 @@ class Resolver:
         _LOGGER.debug("Expanding state with dependencies based on packages solved in software environments")
 
         package_tuple = package_version.to_tuple()
+        register_skipped_dependencies = self.predictor.REGISTER_SKIPPED_DEPENDENCIES
         all_dependencies: Dict[str, List[Tuple[str, str, str]]] = {}
         newly_added: List[Tuple[str, str, str]] = []
         for dependency_name, dependency_version in dependencies:
-            records = self.graph.get_python_package_version_records(
-                package_name=dependency_name,
-                package_version=dependency_version,
-                index_url=None,  # Do cross-index resolving.
-                os_name=self.project.runtime_environment.operating_system.name,
-                os_version=self.project.runtime_environment.operating_system.version,
-                python_version=self.project.runtime_environment.python_version,
-            )
+            if records is not None and (dependency_name, dependency_version) in records:
+                dependency_records = records[(dependency_name, dependency_version)]
+            else:
+                dependency_records = self._get_package_version_records(dependency_name, dependency_version)
 
             # We could use a set here that would optimize a bit, but it will create randomness - it
             # will not work well with preserving seed across resolver runs.
             all_dependencies.setdefault(dependency_name, [])
             resolved_dependency_tuple = state.resolved_dependencies.get(dependency_name)
-            if resolved_dependency_tuple and resolved_dependency_tuple[1] != dependency_version:
+            skip_dependency = (
+                resolved_dependency_tuple is not None and resolved_dependency_tuple[1] != dependency_version
+            )
+            if skip_dependency:
                 _LOGGER.debug(
                     "Skipping adding dependency %r in version %r as this dependency is already present "
                     "in state in a different version: %r",
@@ -943,15 +1186,17 @@ class Resolver:
                     dependency_version,
                     state.resolved_dependencies[dependency_name],
                 )
-                continue
+                if not register_skipped_dependencies:
+                    continue
 
-            for record in records:
+            for record in dependency_records:
                 dependency_tuple = (
                     record["package_name"],
                     record["package_version"],
                     record["index_url"],
                 )
 
+                # Skipped dependencies are registered only if predictor asks for it, see Predictor.
                 self.context.register_package_tuple(
                     dependency_tuple,
                     dependent_tuple=package_tuple,
@@ -961,6 +1206,9 @@ class Resolver:
                     os_version=record["os_version"],
                     python_version=record["python_version"],
                 )
+                if skip_dependency:
+                    continue
+
                 newly_added.append(dependency_tuple)
 
                 if dependency_tuple not in all_dependencies[dependency_tuple[0]]:
@@ -1035,9 +1283,7 @@ class Resolver:
                     continue
 
                 all_dependencies[dependency_name] = sorted(
-                    dependency_tuples,
-                    key=lambda d: self.context.get_package_version(d).semantic_version,  # type: ignore
-                    reverse=True,
+                    dependency_tuples, key=self.context.get_package_version_rank, reverse=True
                 )
                 continue
 
@@ -1055,8 +1301,10 @@ class Resolver:
                 all_dependencies[dependency_name] = [resolved_dependency]
                 continue
 
-            package_versions = [self.context.get_package_version(d) for d in dependency_tuples]
-            package_versions.sort(key=lambda pv: pv.semantic_version, reverse=True)  # type: ignore
+            package_versions = [
+                self.context.get_package_version(d)
+                for d in sorted(dependency_tuples, key=self.context.get_package_version_rank, reverse=True)
+            ]
             try:
                 package_versions = list(self._run_sieves(package_versions))
             except SkipPackage as exc:
@@ -1100,6 +1348,7 @@ class Resolver:
         user_stack_scoring: bool = True,
     ) -> Generator[State, None, None]:
         """Actually perform states resolution."""
+        start_time = time.monotonic()
         self._log_once_init()
         self._run_boots(with_devel=with_devel)
 
@@ -1127,12 +1376,16 @@ class Resolver:
         _LOGGER.info("Preparing initial states for the resolution pipeline")
         state = self._prepare_initial_state(with_devel=with_devel)
         self._run_pseudonyms_initial_state(state)
+        _LOGGER.info("Pre-resolution phase took %g seconds", time.monotonic() - start_time)
 
         _LOGGER.info("Hold tight, Thoth is computing recommendations for your application...")
 
         self.context.iteration = 0
         self.stop_resolving = False
-        with _sigint_handler(self):
+        self._memory_usage_shrunk = None
+        memory_check = self.memory_soft_limit is not None or self.memory_hard_limit is not None
+        with _sigint_handler(self), contextlib.ExitStack() as stack:
+            stack.callback(self._reset_batch)
             while not self.stop_resolving:
                 if self.context.accepted_final_states_count >= self.limit:
                     _LOGGER.info(
@@ -1155,7 +1408,10 @@ class Resolver:
                 self.beam.new_iteration()
                 self.context.iteration += 1
 
-                state, unresolved_package_tuple = self.predictor.run()
+                if memory_check and self.context.iteration % self.memory_check_iteration == 0:
+                    self._check_memory_usage()
+
+                state, unresolved_package_tuple = self._get_expansion()
 
                 _LOGGER.debug(
                     "Resolving package %r in state with score %g: %r",
@@ -1163,7 +1419,9 @@ class Resolver:
                     state.score,
                     state,
                 )
-                state_returned = self._expand_state(state, unresolved_package_tuple)
+                with self.beam.expanding(state):
+                    state_returned = self._expand_state(state, unresolved_package_tuple)
+
                 if state_returned is not None and not state_returned.unresolved_dependencies:
                     # A final state produced by the pipeline.
                     if self._run_strides(state_returned):
@@ -1194,6 +1452,45 @@ class Resolver:
                 self.beam.size,
             )
 
+    def _check_memory_usage(self) -> None:
+        """Check memory usage and shrink beam or switch predictor to exploitation if limits are exceeded."""
+        memory_usage = get_memory_usage()
+        if self.memory_soft_limit is not None and memory_usage < self.memory_soft_limit:
+            return
+
+        if self.memory_soft_limit is None and (self.memory_hard_limit is None or memory_usage < self.memory_hard_limit):
+            return
+
+        if self._memory_usage_shrunk is not None and memory_usage < self._memory_usage_shrunk * (
+            1.0 + _MEMORY_SHRINK_GROWTH
+        ):
+            # Beam was already shrunk, freed memory is reused by the interpreter.
+            return
+
+        self._memory_usage_shrunk = memory_usage
+        hard_limit_exceeded = self.memory_hard_limit is not None and memory_usage >= self.memory_hard_limit
+        beam_size = self.beam.size
+        size = max(beam_size // (4 if hard_limit_exceeded else 2), 1)
+        _LOGGER.warning(
+            "Memory usage %d bytes exceeded %s limit in iteration %d, shrinking beam of size %d to size %d",
+            memory_usage,
+            "hard" if hard_limit_exceeded else "soft",
+            self.context.iteration,
+            beam_size,
+            size,
+        )
+        # Beam width configured is kept, beam is not ratcheted down on each memory usage peak.
+        self.beam.shrink(size)
+
+        if hard_limit_exceeded:
+            _LOGGER.warning("Asking predictor to switch to exploitation due to memory pressure")
+            self.predictor.exploit()
+
+    def _get_top_accepted_final_state_score(self) -> float:
+        """Get score of the best accepted final state so far, NaN if there is none."""
+        top_accepted_final_state = self.context.get_top_accepted_final_state()
+        return top_accepted_final_state.score if top_accepted_final_state is not None else float("nan")
+
     def _do_resolve_states(
         self,
         *,
@@ -1216,7 +1513,6 @@ class Resolver:
         self.pipeline.call_pre_run()
 
         start_time = time.monotonic()
-        max_score = None
         last_iteration_logged = 0
         try:
             for final_state in self._do_resolve_states_raw(
@@ -1229,8 +1525,6 @@ class Resolver:
                     self.context.limit,
                 )
 
-                max_score = final_state.score if max_score is None else max(max_score, final_state.score)
-
                 if (
                     self.context.iteration - last_iteration_logged > self.log_iteration
                     or self.context.accepted_final_states_count == 1
@@ -1244,8 +1538,14 @@ class Resolver:
                         self.context.limit,
                         self.context.accepted_final_states_count / (time.monotonic() - start_time),
                         self.beam.max().score if self.beam.size > 0 else float("nan"),
-                        float("nan") if max_score is None else max_score,
+                        self._get_top_accepted_final_state_score(),
                     )
+                    if _LOGGER.isEnabledFor(logging.DEBUG):
+                        _LOGGER.debug(
+                            "Scores of top rated states in beam: %s",
+                            ", ".join(f"{state.score:.2f}" for state in self.beam.iter_top(self._BEAM_TOP_LOGGED)),
+                        )
+
                     last_iteration_logged = self.context.iteration
 
                 yield final_state
@@ -1260,25 +1560,43 @@ class Resolver:
             self.context.accepted_final_states_count / duration,
         )
 
-        if max_score is not None:
-            _LOGGER.info("The highest rated software stack resolved has a score of %0.2f", max_score)
+        top_accepted_final_state = self.context.get_top_accepted_final_state()
+        if top_accepted_final_state is not None:
+            _LOGGER.info(
+                "The highest rated software stack resolved has a score of %0.2f", top_accepted_final_state.score
+            )
 
         _LOGGER.info(
             "Pipeline strides discarded %d and accepted %d software stacks in total",
             self.context.discarded_final_states_count,
             self.context.accepted_final_states_count,
         )
+        _LOGGER.info(
+            "Resolver instantiated %d package versions out of %d package tuples registered",
+            len(self.context.package_versions),
+            self.context.package_tuples_count,
+        )
 
         self.predictor.post_run()
         self.pipeline.call_post_run()
 
     def resolve_products(
-        self, *, with_devel: bool = True, user_stack_scoring: bool = True
+        self, *, with_devel: bool = True, user_stack_scoring: bool = True, offset: int = 0
     ) -> Generator[Product, None, None]:
-        """Resolve raw products as produced by this resolver pipeline."""
+        """Resolve raw products as produced by this resolver pipeline.
+
+        If offset is provided, the given number of final states resolved first is skipped without creating
+        products out of them - used to resume enumeration of software stacks resolved in a deterministic order.
+        """
         self._init_context()
-        with Unit.assigned_context(self.context), self.predictor.assigned_context(self.context):
+        with Unit.assigned_context(self.context), self.predictor.assigned_context(self.context), _state_finalizer(
+            self.predictor
+        ):
             for state in self._do_resolve_states(with_devel=with_devel, user_stack_scoring=user_stack_scoring):
+                if offset > 0:
+                    offset -= 1
+                    continue
+
                 # Always run wraps as raw products are computed.
                 self._run_wraps(state)
                 yield Product.from_final_state(context=self.context, state=state)
@@ -1288,7 +1606,9 @@ class Resolver:
         report = Report(count=self.count, pipeline=self.pipeline)
 
         self._init_context()
-        with Unit.assigned_context(self.context), self.predictor.assigned_context(self.context):
+        with Unit.assigned_context(self.context), self.predictor.assigned_context(self.context), _state_finalizer(
+            self.predictor
+        ):
             for state in self._do_resolve_states(with_devel=with_devel, user_stack_scoring=user_stack_scoring):
                 product = Product.from_final_state(context=self.context, state=state)
                 if report.add_product(product):
@@ -1321,8 +1641,11 @@ class Resolver:
         report.discarded_final_states_count = self.context.discarded_final_states_count
         return report
 
-    def plot(self) -> matplotlib.figure.Figure:
+    def plot(self) -> "matplotlib.figure.Figure":
         """Plot history captured during the resolution process."""
+        import matplotlib.pyplot as plt
+        from matplotlib.font_manager import FontProperties
+
         if not self._history:
             raise NoHistoryKept("No history datapoints kept")
 
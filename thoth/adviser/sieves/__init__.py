@@ -17,25 +17,7 @@
 
 """Implementation of sieves used in adviser pipeline."""
 
-from .abi_compat import AbiCompatibilitySieve
-from .backports import Enum34BackportSieve
-from .backports import Functools32BackportSieve
-from .backports import ImportlibMetadataBackportSieve
-from .backports import ImportlibResourcesBackportSieve
-from .backports import MockBackportSieve
-from .filter_index import FilterIndexSieve
-from .index_enabled import PackageIndexSieve
-from .locked import CutLockedSieve
-from .pandas import PandasPy36Sieve
-from .prereleases import CutPreReleasesSieve
-from .setuptools import Py36SetuptoolsSieve
-from .solved import SolvedSieve
-from .tensorflow import TensorFlow240AVX2IllegalInstructionSieve
-from .tensorflow import TensorFlowAPISieve
-from .tensorflow import TensorFlowCUDASieve
-from .tensorflow import TensorFlowPython39Sieve
-from .version_constraint import VersionConstraintSieve
-
+from ..unit_registry import lazy_unit_getattr
 
 # Relative ordering of units is relevant, as the order specifies order
 # in which the asked to be registered - any dependencies between them
@@ -60,3 +42,5 @@ __all__ = [
     "TensorFlowPython39Sieve",
     "PandasPy36Sieve",
 ]
+
+__getattr__ = lazy_unit_getattr(__name__, __all__)
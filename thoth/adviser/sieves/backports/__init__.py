@@ -17,11 +17,7 @@
 
 """Sieve units for backports to older Python versions."""
 
-from .enum34 import Enum34BackportSieve
-from .functools32 import Functools32BackportSieve
-from .importlib_metadata import ImportlibMetadataBackportSieve
-from .importlib_resources import ImportlibResourcesBackportSieve
-from .mock import MockBackportSieve
+from ...unit_registry import lazy_unit_getattr
 
 __all__ = [
     "Enum34BackportSieve",
@@ -30,3 +26,5 @@ __all__ = [
     "ImportlibResourcesBackportSieve",
     "MockBackportSieve",
 ]
+
+__getattr__ = lazy_unit_getattr(__name__, __all__)
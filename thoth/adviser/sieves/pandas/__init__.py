@@ -17,9 +17,10 @@
 
 """Implementation of sieves used, specific for Pandas package."""
 
-from .py36_drop import PandasPy36Sieve
-
+from ...unit_registry import lazy_unit_getattr
 
 __all__ = [
     "PandasPy36Sieve",
 ]
+
+__getattr__ = lazy_unit_getattr(__name__, __all__)
@@ -17,8 +17,10 @@
 
 """Implementation of steps used, specific for setuptools package."""
 
-from .py36 import Py36SetuptoolsSieve
+from ...unit_registry import lazy_unit_getattr
 
 __all__ = [
     "Py36SetuptoolsSieve",
 ]
+
+__getattr__ = lazy_unit_getattr(__name__, __all__)
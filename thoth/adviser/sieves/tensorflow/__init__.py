@@ -17,11 +17,7 @@
 
 """Implementation of sieves used, specific for TensorFlow."""
 
-from .tf_240_avx2 import TensorFlow240AVX2IllegalInstructionSieve
-from .tf_api import TensorFlowAPISieve
-from .tf_cuda import TensorFlowCUDASieve
-from .tf_py39 import TensorFlowPython39Sieve
-
+from ...unit_registry import lazy_unit_getattr
 
 __all__ = [
     "TensorFlow240AVX2IllegalInstructionSieve",
@@ -29,3 +25,5 @@ __all__ = [
     "TensorFlowCUDASieve",
     "TensorFlowPython39Sieve",
 ]
+
+__getattr__ = lazy_unit_getattr(__name__, __all__)
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+# thoth-adviser
+# Copyright(C) 2020 Fridolin Pokorny
+#
+# This program is free software: you can redistribute it and / or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""An indexed archive of software stacks produced by Dependency Monkey.
+
+Software stacks are appended to a single JSON lines file, one software stack per line. An index file kept
+next to the archive stores stack number, offset and length of each line so that any software stack can be
+read without scanning the whole archive.
+"""
+
+import bisect
+import json
+import logging
+import os
+import struct
+import sys
+import threading
+from array import array
+from queue import Queue
+from typing import Any
+from typing import BinaryIO
+from typing import Dict
+from typing import Iterator
+from typing import Optional
+from typing import Sequence
+
+import attr
+from thoth.common import RuntimeEnvironment
+from thoth.python import Project
+
+
+_LOGGER = logging.getLogger(__name__)
+
+# Stack number, offset and length of the line in the archive.
+_INDEX_ENTRY = struct.Struct("<QQQ")
+
+
+def get_index_path(path: str) -> str:
+    """Get path to index file of the given archive."""
+    return f"{path}.idx"
+
+
+@attr.s(slots=True)
+class StackArchiveWriter:
+    """Append software stacks to an indexed archive from a background writer thread.
+
+    Software stacks are passed to the writer using a bounded queue - if the writer cannot keep up, writing
+    a new software stack blocks. Existing archives are appended to so that resumed runs extend the archive.
+    """
+
+    path = attr.ib(type=str)
+    queue_size = attr.ib(
+        type=int, kw_only=True, default=int(os.getenv("THOTH_DEPENDENCY_MONKEY_ARCHIVE_QUEUE_SIZE", 256))
+    )
+
+    _queue = attr.ib(type="Queue[Any]", factory=Queue, init=False)
+    _thread = attr.ib(type=Optional[threading.Thread], default=None, init=False)
+    _error = attr.ib(type=Optional[Exception], default=None, init=False)
+
+    @queue_size.validator
+    def _queue_size_validator(self, _: str, value: int) -> None:
+        """Validate queue size is a positive integer."""
+        if not isinstance(value, int) or value <= 0:
+            raise ValueError(f"Queue size has to be a positive integer, got {value!r}")
+
+    def __enter__(self) -> "StackArchiveWriter":
+        """Start the writer."""
+        self.start()
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        """Wait for all the software stacks to be written."""
+        self.close()
+
+    def start(self) -> None:
+        """Start the writer thread."""
+        dir_name = os.path.dirname(self.path)
+        if dir_name:
+            os.makedirs(dir_name, exist_ok=True)
+
+        self._error = None
+        self._queue = Queue(maxsize=self.queue_size)
+        self._thread = threading.Thread(target=self._writer, name="stack-archive-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, count: int, project_dict: Dict[str, Any]) -> str:
+        """Queue the given software stack for writing, return reference to it in the archive."""
+        if self._error is not None:
+            raise self._error
+
+        self._queue.put((count, project_dict))
+        return f"{self.path}#{count}"
+
+    def close(self) -> None:
+        """Wait for software stacks queued to be written and stop the writer thread."""
+        if self._thread is None:
+            return
+
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+
+        if self._error is not None:
+            raise self._error
+
+    def _writer(self) -> None:
+        """Write software stacks queued until asked to stop."""
+        try:
+            with open(self.path, "a+b") as archive_file, open(get_index_path(self.path), "a+b") as index_file:
+                self._repair(archive_file, index_file)
+                self._write_stacks(archive_file, index_file)
+        except Exception as exc:
+            _LOGGER.exception("Failed to write software stacks to archive %r: %s", self.path, str(exc))
+            self._error = exc
+            # Unblock producers waiting on a full queue.
+            while self._queue.get() is not None:
+                pass
+
+    @staticmethod
+    def _repair(archive_file: BinaryIO, index_file: BinaryIO) -> None:
+        """Drop a partially written index entry and archive content not indexed, left by an interrupted run."""
+        index_size = index_file.seek(0, os.SEEK_END)
+        if index_size % _INDEX_ENTRY.size:
+            _LOGGER.warning("Dropping a partially written entry in the index of archive %r", archive_file.name)
+            index_size -= index_size % _INDEX_ENTRY.size
+            index_file.truncate(index_size)
+
+        archive_size = 0
+        if index_size:
+            index_file.seek(index_size - _INDEX_ENTRY.size)
+            _, offset, length = _INDEX_ENTRY.unpack(index_file.read(_INDEX_ENTRY.size))
+            archive_size = offset + length
+
+        if archive_file.seek(0, os.SEEK_END) > archive_size:
+            _LOGGER.warning("Dropping content not indexed at the end of archive %r", archive_file.name)
+            archive_file.truncate(archive_size)
+
+    def _write_stacks(self, archive_file: BinaryIO, index_file: BinaryIO) -> None:
+        """Append software stacks queued to the archive and to its index."""
+        offset = archive_file.seek(0, os.SEEK_END)
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+
+            count, project_dict = item
+            line = json.dumps({"stack": count, "project": project_dict}, sort_keys=True).encode() + b"\n"
+            archive_file.write(line)
+            index_file.write(_INDEX_ENTRY.pack(count, offset, len(line)))
+            offset += len(line)
+
+            if self._queue.empty():
+                # Make stacks written available to readers while waiting for new ones.
+                archive_file.flush()
+                index_file.flush()
+
+
+@attr.s(slots=True)
+class StackArchiveReader:
+    """Random access to software stacks stored in an indexed archive by stack number."""
+
+    path = attr.ib(type=str)
+
+    _archive_file = attr.ib(type=Optional[BinaryIO], default=None, init=False)
+    _numbers = attr.ib(type=Sequence[int], factory=list, init=False)
+    _offsets = attr.ib(type=Sequence[int], factory=list, init=False)
+    _lengths = attr.ib(type=Sequence[int], factory=list, init=False)
+
+    def __attrs_post_init__(self) -> None:
+        """Load the index of the archive."""
+        with open(get_index_path(self.path), "rb") as index_file:
+            content = index_file.read()
+
+        # An entry written partially (e.g. on a crash) is ignored.
+        entries = array("Q")
+        entries.frombytes(content[: len(content) - len(content) % _INDEX_ENTRY.size])
+        if sys.byteorder == "big":
+            entries.byteswap()
+
+        numbers, offsets, lengths = entries[0::3], entries[1::3], entries[2::3]
+        if any(numbers[i] >= numbers[i + 1] for i in range(len(numbers) - 1)):
+            # Stacks written again (e.g. a resumed run) are kept in the index, the last one written wins.
+            positions = {number: i for i, number in enumerate(numbers)}
+            numbers = array("Q", sorted(positions))
+            offsets = array("Q", (offsets[positions[number]] for number in numbers))
+            lengths = array("Q", (lengths[positions[number]] for number in numbers))
+
+        self._numbers, self._offsets, self._lengths = numbers, offsets, lengths
+        self._archive_file = open(self.path, "rb")
+
+    def __enter__(self) -> "StackArchiveReader":
+        """Use the reader as a context manager."""
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        """Close the archive."""
+        self.close()
+
+    def close(self) -> None:
+        """Close the archive."""
+        if self._archive_file is not None:
+            self._archive_file.close()
+            self._archive_file = None
+
+    def _find(self, number: int) -> Optional[int]:
+        """Find position of the given stack number in the index."""
+        position = bisect.bisect_left(self._numbers, number)
+        if position == len(self._numbers) or self._numbers[position] != number:
+            return None
+
+        return position
+
+    def __len__(self) -> int:
+        """Get number of software stacks in the archive."""
+        return len(self._numbers)
+
+    def __contains__(self, number: int) -> bool:
+        """Check if the given stack number is present in the archive."""
+        return self._find(number) is not None
+
+    def __iter__(self) -> Iterator[int]:
+        """Iterate over stack numbers present in the archive in ascending order."""
+        return iter(self._numbers)
+
+    def get(self, number: int) -> Dict[str, Any]:
+        """Get dictionary representation of the project with the given stack number."""
+        position = self._find(number)
+        if position is None:
+            raise KeyError(f"No stack with number {number} found in archive {self.path!r}")
+
+        if self._archive_file is None:
+            raise ValueError(f"Archive {self.path!r} is closed")
+
+        self._archive_file.seek(self._offsets[position])
+        record: Dict[str, Any] = json.loads(self._archive_file.read(self._lengths[position]))
+        project_dict: Dict[str, Any] = record["project"]
+        return project_dict
+
+    def get_project(self, number: int) -> Project:
+        """Get project with the given stack number."""
+        project_dict = self.get(number)
+        runtime_environment = project_dict.get("runtime_environment")
+        return Project.from_dict(
+            project_dict["requirements"],
+            project_dict["requirements_locked"],
+            runtime_environment=RuntimeEnvironment.from_dict(runtime_environment) if runtime_environment else None,
+        )
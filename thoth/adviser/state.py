@@ -17,13 +17,16 @@
 
 """A state of not fully resolved software stack in adviser's recommendations implementation."""
 
+from contextlib import contextmanager
 from typing import Any
+from typing import Callable
 from typing import Tuple
 from typing import Dict
 from typing import List
 from typing import Optional
 from typing import Generator
 import random
+import threading
 import weakref
 
 import attr
@@ -69,6 +72,8 @@ class State:
     justification = attr.ib(type=List[Dict[str, str]], default=attr.Factory(list), kw_only=True)
 
     _EPSILON = 0.1
+    # Callbacks called with id of a state that is about to be destructed, see `assigned_finalizer'.
+    _FINALIZERS: List[Callable[[int], None]] = []
 
     @property
     def parent(self):
@@ -117,6 +122,23 @@ class State:
             "unresolved_dependencies": self.unresolved_dependencies,
         }
 
+    @classmethod
+    def from_dict(cls, dict_: Dict[str, Any]) -> "State":
+        """Instantiate a state from its dict representation, parent is not restored."""
+        advised_runtime_environment = None
+        if dict_["advised_runtime_environment"]:
+            advised_runtime_environment = RuntimeEnvironment.from_dict(dict_["advised_runtime_environment"])
+
+        return cls(
+            score=dict_["score"],
+            iteration=dict_["iteration"],
+            unresolved_dependencies=dict_["unresolved_dependencies"],
+            resolved_dependencies=dict_["resolved_dependencies"],
+            advised_runtime_environment=advised_runtime_environment,
+            advised_manifest_changes=dict_["advised_manifest_changes"],
+            justification=dict_["justification"],
+        )
+
     def is_final(self) -> bool:
         """Check if the given state is a final state."""
         return len(self.unresolved_dependencies) == 0
@@ -262,8 +284,37 @@ class State:
             parent=weakref.ref(self),
         )
 
-    def __del__(self) -> None:
-        """Destruct self."""
-        # Destruct parts that are not eventually populated to the pipeline product abstraction.
-        del self.unresolved_dependencies
-        del self.resolved_dependencies
+    @classmethod
+    @contextmanager
+    def assigned_finalizer(cls, finalizer: Callable[[int], None]) -> Generator[None, None, None]:
+        """Assign a callback called with id of each state that is about to be destructed.
+
+        All the finalizers assigned are notified, finalizers can be assigned by nested or concurrently running
+        resolvers. The `__del__' hook is installed only while at least one finalizer is assigned so states are
+        destructed without calling into Python code otherwise.
+        """
+        with _FINALIZERS_LOCK:
+            if not State._FINALIZERS:
+                State.__del__ = _notify_finalizers  # type: ignore
+
+            # A new list so that finalizers are not modified while being notified.
+            State._FINALIZERS = State._FINALIZERS + [finalizer]
+
+        try:
+            yield
+        finally:
+            with _FINALIZERS_LOCK:
+                finalizers = list(State._FINALIZERS)
+                finalizers.remove(finalizer)
+                State._FINALIZERS = finalizers
+                if not finalizers:
+                    del State.__del__  # type: ignore
+
+
+_FINALIZERS_LOCK = threading.Lock()
+
+
+def _notify_finalizers(state: State) -> None:
+    """Notify the finalizers assigned about the state being destructed, see `State.assigned_finalizer'."""
+    for finalizer in State._FINALIZERS:
+        finalizer(id(state))
@@ -17,23 +17,7 @@
 
 """Implementation of steps used during resolution."""
 
-from .aicoe import AICoEReleasesStep
-from .cve import CvePenalizationStep
-from .dropout import DropoutStep
-from .security_indicators import SecurityIndicatorStep
-from .tensorflow import TensorFlow21Urllib3Step
-from .tensorflow import TensorFlow22ProbabilityStep
-from .tensorflow import TensorFlowAVX2Step
-from .tensorflow import TensorFlow113NumPyStep
-from .tensorflow import TensorFlow114GastStep
-from .tensorflow import TensorFlow22NumPyStep
-from .tensorflow import TensorFlowRemoveSciPyStep
-from .tensorflow import TensorFlow21H5pyStep
-
-from ._debug import GenerateScoreStep
-from ._debug import MockScoreStep
-from ._debug import SetScoreStep
-
+from ..unit_registry import lazy_unit_getattr
 
 # Relative ordering of units is relevant, as the order specifies order
 # in which the asked to be registered - any dependencies between them
@@ -55,3 +39,5 @@ __all__ = [
     "TensorFlow22NumPyStep",
     "TensorFlowRemoveSciPyStep",
 ]
+
+__getattr__ = lazy_unit_getattr(__name__, __all__)
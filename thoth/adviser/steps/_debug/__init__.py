@@ -17,9 +17,8 @@
 
 """Implementation of steps used for debugging the application."""
 
-from .generate_score import GenerateScoreStep
-from .mock_score import MockScoreStep
-from .set_score import SetScoreStep
-
+from ...unit_registry import lazy_unit_getattr
 
 __all__ = ["MockScoreStep", "SetScoreStep", "GenerateScoreStep"]
+
+__getattr__ = lazy_unit_getattr(__name__, __all__)
@@ -17,15 +17,7 @@
 
 """Implementation of steps used, specific for TensorFlow."""
 
-from .tf_113_numpy import TensorFlow113NumPyStep
-from .tf_114_gast import TensorFlow114GastStep
-from .tf_21_h5py import TensorFlow21H5pyStep
-from .tf_21_urllib3 import TensorFlow21Urllib3Step
-from .tf_22_numpy import TensorFlow22NumPyStep
-from .tf_22_prob import TensorFlow22ProbabilityStep
-from .tf_avx2 import TensorFlowAVX2Step
-from .tf_rm_scipy import TensorFlowRemoveSciPyStep
-
+from ...unit_registry import lazy_unit_getattr
 
 __all__ = [
     "TensorFlow113NumPyStep",
@@ -37,3 +29,5 @@ __all__ = [
     "TensorFlowAVX2Step",
     "TensorFlowRemoveSciPyStep",
 ]
+
+__getattr__ = lazy_unit_getattr(__name__, __all__)
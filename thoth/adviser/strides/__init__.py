@@ -17,10 +17,7 @@
 
 """Implementation of strides used to filter out resolved stacks."""
 
-from .one_version import OneVersionStride
-from .random_decision import RandomDecisionStride
-from .unique_stack import UniqueStackStride
-
+from ..unit_registry import lazy_unit_getattr
 
 # Relative ordering of units is relevant, as the order specifies order
 # in which the asked to be registered - any dependencies between them
@@ -30,3 +27,5 @@ __all__ = [
     "RandomDecisionStride",
     "UniqueStackStride",
 ]
+
+__getattr__ = lazy_unit_getattr(__name__, __all__)
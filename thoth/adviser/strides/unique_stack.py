@@ -21,7 +21,9 @@ This pipeline unit is especially useful for dependency monkey runs when no
 duplicate software stacks should be resolved.
 """
 
+import hashlib
 import logging
+import math
 from typing import Any
 from typing import Dict
 from typing import Optional
@@ -31,7 +33,13 @@ from typing import FrozenSet
 from typing import TYPE_CHECKING
 
 import attr
+from voluptuous import All
+from voluptuous import Any as SchemaAny
+from voluptuous import Range
+from voluptuous import Required
+from voluptuous import Schema
 
+from ..bloom_filter import ScalableBloomFilter
 from ..state import State
 from ..stride import Stride
 from ..exceptions import NotAcceptable
@@ -49,9 +57,40 @@ class UniqueStackStride(Stride):
     As dependency graphs can share nodes, it might happen that the same
     software stack can be resolved multiple times considering different
     resolution paths.
+
+    Stacks seen are kept based on the configured mode:
+
+    * `exact' - stacks are kept as sets of package tuples
+    * `fingerprint' - an order independent fingerprint of `fingerprint_size' bytes is kept per stack, stacks
+      are distinguished unless their fingerprints collide
+    * `bloom' - fingerprints are kept in a scalable Bloom filter, a stack is discarded as duplicate with
+      at most `false_positive_rate' probability even if it was not seen
     """
 
+    CONFIGURATION_DEFAULT = {
+        "package_name": None,
+        "mode": "exact",
+        "fingerprint_size": 16,
+        "false_positive_rate": 1e-6,
+        "initial_capacity": 65536,
+    }
+    CONFIGURATION_SCHEMA: Schema = Schema(
+        {
+            Required("package_name"): SchemaAny(str, None),
+            Required("mode"): SchemaAny("exact", "fingerprint", "bloom"),
+            Required("fingerprint_size"): All(int, Range(min=8, max=64)),
+            Required("false_positive_rate"): All(
+                float, Range(min=0.0, max=1.0, min_included=False, max_included=False)
+            ),
+            Required("initial_capacity"): All(int, Range(min=1)),
+        }
+    )
+
     stacks_seen = attr.ib(type=Set[FrozenSet[Tuple[str, str, str]]], default=attr.Factory(set), init=False)
+    _fingerprints_seen = attr.ib(type=Set[int], factory=set, init=False)
+    _bloom_filter = attr.ib(type=Optional[ScalableBloomFilter], default=None, init=False)
+    _package_tuple_hashes = attr.ib(type=Dict[Tuple[str, str, str], int], factory=dict, init=False)
+    _duplicates = attr.ib(type=int, default=0, init=False)
 
     @classmethod
     def should_include(cls, builder_context: "PipelineBuilderContext") -> Optional[Dict[str, Any]]:
@@ -61,11 +100,71 @@ class UniqueStackStride(Stride):
     def pre_run(self) -> None:
         """Initialize internal state of the unit."""
         self.stacks_seen.clear()
+        self._fingerprints_seen.clear()
+        self._package_tuple_hashes.clear()
+        self._duplicates = 0
+        self._bloom_filter = None
+        if self.configuration["mode"] == "bloom":
+            self._bloom_filter = ScalableBloomFilter(
+                self.configuration["initial_capacity"], self.configuration["false_positive_rate"]
+            )
+        super().pre_run()
+
+    def post_run(self) -> None:
+        """Report number of stacks seen and probability of discarding a stack that was not seen."""
+        mode = self.configuration["mode"]
+        if mode == "exact":
+            return
+
+        if mode == "fingerprint":
+            stacks_seen = len(self._fingerprints_seen)
+            # Birthday bound - probability of any two distinct stacks seen sharing the same fingerprint.
+            bits = 8 * self.configuration["fingerprint_size"]
+            error_rate = -math.expm1(-stacks_seen * (stacks_seen - 1) / 2.0 ** (bits + 1))
+            message = f"Kept {stacks_seen} fingerprints of stacks, estimated collision probability is {error_rate:g}"
+        else:
+            bloom_filter: ScalableBloomFilter = self._bloom_filter  # type: ignore
+            stacks_seen = bloom_filter.size
+            error_rate = bloom_filter.estimated_false_positive_rate
+            message = (
+                f"Kept {stacks_seen} stacks in {bloom_filter.filter_count} Bloom filters of "
+                f"{bloom_filter.memory} bytes in total, estimated false positive rate is {error_rate:g}"
+            )
+
+        message += f" ({self._duplicates} stacks discarded as duplicates)"
+        _LOGGER.info("%s", message)
+        self.context.stack_info.append({"type": "INFO", "message": message})
+
+    def _compute_fingerprint(self, state: State) -> int:
+        """Compute fingerprint of the resolved stack, independent of the order of resolving dependencies."""
+        fingerprint_size: int = self.configuration["fingerprint_size"]
+        fingerprint = 0
+        for package_tuple in state.resolved_dependencies.values():
+            package_tuple_hash = self._package_tuple_hashes.get(package_tuple)
+            if package_tuple_hash is None:
+                digest = hashlib.blake2b("\0".join(package_tuple).encode(), digest_size=fingerprint_size).digest()
+                package_tuple_hash = int.from_bytes(digest, "little")
+                self._package_tuple_hashes[package_tuple] = package_tuple_hash
+
+            fingerprint += package_tuple_hash
+
+        return fingerprint & ((1 << (8 * fingerprint_size)) - 1)
 
     def run(self, state: State) -> None:
         """Filter out software stacks that were already resolved."""
-        stack = frozenset(state.resolved_dependencies.values())
-        if stack not in self.stacks_seen:
-            self.stacks_seen.add(stack)
-        else:
-            raise NotAcceptable
+        mode = self.configuration["mode"]
+        if mode == "exact":
+            stack = frozenset(state.resolved_dependencies.values())
+            if stack not in self.stacks_seen:
+                self.stacks_seen.add(stack)
+                return
+        elif mode == "fingerprint":
+            fingerprint = self._compute_fingerprint(state)
+            if fingerprint not in self._fingerprints_seen:
+                self._fingerprints_seen.add(fingerprint)
+                return
+        elif not self._bloom_filter.add(self._compute_fingerprint(state)):  # type: ignore
+            return
+
+        self._duplicates += 1
+        raise NotAcceptable
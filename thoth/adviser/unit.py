@@ -23,6 +23,7 @@ import os
 import re
 from typing import Any
 from typing import Dict
+from typing import FrozenSet
 from typing import Generator
 from typing import Optional
 from typing import Union
@@ -58,6 +59,10 @@ class Unit(metaclass=abc.ABCMeta):
     _CONTEXT: Optional[Context] = None
     CONFIGURATION_SCHEMA: Schema = Schema({Required("package_name"): SchemaAny(str, None)})
     CONFIGURATION_DEFAULT: Dict[str, Any] = {"package_name": None}
+    # Names of units whose inclusion can change the result of should_include of this unit. The builder context does
+    # not change while a pipeline is built so a unit is re-evaluated only once it or any unit listed is included.
+    # Set to None to re-evaluate the unit each time any unit is included.
+    SHOULD_INCLUDE_TRIGGERS: Optional[FrozenSet[str]] = frozenset()
 
     unit_run = attr.ib(type=bool, default=False, kw_only=True)
 
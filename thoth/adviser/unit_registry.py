@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# thoth-adviser
+# Copyright(C) 2020 Fridolin Pokorny
+#
+# This program is free software: you can redistribute it and / or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""A registry of pipeline units implemented in adviser, pipeline unit modules are imported on first use.
+
+Each entry states name of the pipeline unit class, module it is implemented in and cheap metadata on
+pipelines the unit can be included in. Pipeline builder uses the metadata to avoid importing pipeline units that
+would not be included in the pipeline anyway. Packages with pipeline units expose pipeline units lazily - a module
+implementing the pipeline unit is imported once the pipeline unit is accessed.
+"""
+
+import importlib
+import sys
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Optional
+from typing import Sequence
+
+import attr
+
+
+@attr.s(slots=True, frozen=True)
+class UnitRegistryEntry:
+    """An entry in the registry of pipeline units."""
+
+    name = attr.ib(type=str)
+    module = attr.ib(type=str)
+    # Whether the pipeline unit can be included in adviser or Dependency Monkey pipeline based on its should_include.
+    adviser = attr.ib(type=bool, default=True, kw_only=True)
+    dependency_monkey = attr.ib(type=bool, default=True, kw_only=True)
+
+    def load(self) -> type:
+        """Import module implementing the pipeline unit and return the pipeline unit class."""
+        unit_class: type = getattr(importlib.import_module(self.module), self.name)
+        return unit_class
+
+
+# Pipeline units included only in adviser pipelines.
+_ADVISER_ONLY: Dict[str, bool] = {"adviser": True, "dependency_monkey": False}
+# Pipeline units never included by pipeline builder, they can be stated explicitly in pipeline configuration.
+_EXPLICIT_ONLY: Dict[str, bool] = {"adviser": False, "dependency_monkey": False}
+
+UNIT_REGISTRY = (
+    # Boots.
+    UnitRegistryEntry("MemTraceBoot", "thoth.adviser.boots._debug.memtrace", **_EXPLICIT_ONLY),
+    UnitRegistryEntry("FullySpecifiedEnvironment", "thoth.adviser.boots.fully_specified_environment", **_ADVISER_ONLY),
+    UnitRegistryEntry("PipfileHashBoot", "thoth.adviser.boots.pipfile_hash"),
+    UnitRegistryEntry("PlatformBoot", "thoth.adviser.boots.platform"),
+    UnitRegistryEntry("PythonVersionBoot", "thoth.adviser.boots.python_version", **_ADVISER_ONLY),
+    UnitRegistryEntry("RHELVersionBoot", "thoth.adviser.boots.rhel_version"),
+    UnitRegistryEntry("SolvedSoftwareEnvironmentBoot", "thoth.adviser.boots.solved_software_environment"),
+    UnitRegistryEntry("UbiBoot", "thoth.adviser.boots.ubi"),
+    # Pseudonyms.
+    UnitRegistryEntry("AliasPseudonym", "thoth.adviser.pseudonyms._debug.alias", **_EXPLICIT_ONLY),
+    UnitRegistryEntry("IntelTensorFlowPseudonym", "thoth.adviser.pseudonyms.intel_tensorflow"),
+    UnitRegistryEntry("TensorFlowGPUPseudonym", "thoth.adviser.pseudonyms.tensorflow_gpu"),
+    # Sieves.
+    UnitRegistryEntry("AbiCompatibilitySieve", "thoth.adviser.sieves.abi_compat"),
+    UnitRegistryEntry("Enum34BackportSieve", "thoth.adviser.sieves.backports.enum34"),
+    UnitRegistryEntry("Functools32BackportSieve", "thoth.adviser.sieves.backports.functools32"),
+    UnitRegistryEntry("ImportlibMetadataBackportSieve", "thoth.adviser.sieves.backports.importlib_metadata"),
+    UnitRegistryEntry("ImportlibResourcesBackportSieve", "thoth.adviser.sieves.backports.importlib_resources"),
+    UnitRegistryEntry("MockBackportSieve", "thoth.adviser.sieves.backports.mock"),
+    UnitRegistryEntry("FilterIndexSieve", "thoth.adviser.sieves.filter_index", **_EXPLICIT_ONLY),
+    UnitRegistryEntry("PackageIndexSieve", "thoth.adviser.sieves.index_enabled"),
+    UnitRegistryEntry("CutLockedSieve", "thoth.adviser.sieves.locked"),
+    UnitRegistryEntry("PandasPy36Sieve", "thoth.adviser.sieves.pandas.py36_drop", **_ADVISER_ONLY),
+    UnitRegistryEntry("CutPreReleasesSieve", "thoth.adviser.sieves.prereleases"),
+    UnitRegistryEntry("Py36SetuptoolsSieve", "thoth.adviser.sieves.setuptools.py36"),
+    UnitRegistryEntry("SolvedSieve", "thoth.adviser.sieves.solved"),
+    UnitRegistryEntry(
+        "TensorFlow240AVX2IllegalInstructionSieve", "thoth.adviser.sieves.tensorflow.tf_240_avx2", **_ADVISER_ONLY
+    ),
+    UnitRegistryEntry("TensorFlowAPISieve", "thoth.adviser.sieves.tensorflow.tf_api", **_ADVISER_ONLY),
+    UnitRegistryEntry("TensorFlowCUDASieve", "thoth.adviser.sieves.tensorflow.tf_cuda", **_ADVISER_ONLY),
+    UnitRegistryEntry("TensorFlowPython39Sieve", "thoth.adviser.sieves.tensorflow.tf_py39", **_ADVISER_ONLY),
+    UnitRegistryEntry("VersionConstraintSieve", "thoth.adviser.sieves.version_constraint", **_EXPLICIT_ONLY),
+    # Steps.
+    UnitRegistryEntry("GenerateScoreStep", "thoth.adviser.steps._debug.generate_score", **_EXPLICIT_ONLY),
+    UnitRegistryEntry("MockScoreStep", "thoth.adviser.steps._debug.mock_score", **_EXPLICIT_ONLY),
+    UnitRegistryEntry("SetScoreStep", "thoth.adviser.steps._debug.set_score", **_EXPLICIT_ONLY),
+    UnitRegistryEntry("AICoEReleasesStep", "thoth.adviser.steps.aicoe", **_ADVISER_ONLY),
+    UnitRegistryEntry("CvePenalizationStep", "thoth.adviser.steps.cve", **_ADVISER_ONLY),
+    UnitRegistryEntry("DropoutStep", "thoth.adviser.steps.dropout", **_EXPLICIT_ONLY),
+    UnitRegistryEntry("SecurityIndicatorStep", "thoth.adviser.steps.security_indicators", **_ADVISER_ONLY),
+    UnitRegistryEntry("TensorFlow113NumPyStep", "thoth.adviser.steps.tensorflow.tf_113_numpy", **_ADVISER_ONLY),
+    UnitRegistryEntry("TensorFlow114GastStep", "thoth.adviser.steps.tensorflow.tf_114_gast", **_ADVISER_ONLY),
+    UnitRegistryEntry("TensorFlow21H5pyStep", "thoth.adviser.steps.tensorflow.tf_21_h5py", **_ADVISER_ONLY),
+    UnitRegistryEntry("TensorFlow21Urllib3Step", "thoth.adviser.steps.tensorflow.tf_21_urllib3", **_ADVISER_ONLY),
+    UnitRegistryEntry("TensorFlow22NumPyStep", "thoth.adviser.steps.tensorflow.tf_22_numpy", **_ADVISER_ONLY),
+    UnitRegistryEntry("TensorFlow22ProbabilityStep", "thoth.adviser.steps.tensorflow.tf_22_prob", **_ADVISER_ONLY),
+    UnitRegistryEntry("TensorFlowAVX2Step", "thoth.adviser.steps.tensorflow.tf_avx2", **_ADVISER_ONLY),
+    UnitRegistryEntry("TensorFlowRemoveSciPyStep", "thoth.adviser.steps.tensorflow.tf_rm_scipy", **_ADVISER_ONLY),
+    # Strides.
+    UnitRegistryEntry("OneVersionStride", "thoth.adviser.strides.one_version", **_EXPLICIT_ONLY),
+    UnitRegistryEntry("RandomDecisionStride", "thoth.adviser.strides.random_decision", **_EXPLICIT_ONLY),
+    UnitRegistryEntry("UniqueStackStride", "thoth.adviser.strides.unique_stack", **_EXPLICIT_ONLY),
+    # Wraps.
+    UnitRegistryEntry("NoObservationWrap", "thoth.adviser.wraps.no_onservation", **_ADVISER_ONLY),
+    UnitRegistryEntry(
+        "NoSemanticInterpositionWrap", "thoth.adviser.wraps.python.no_semantic_interposition", **_ADVISER_ONLY
+    ),
+    UnitRegistryEntry("TensorFlow23Accuracy", "thoth.adviser.wraps.tensorflow.tf_23_accuracy", **_ADVISER_ONLY),
+    UnitRegistryEntry("TensorFlow23DictSummary", "thoth.adviser.wraps.tensorflow.tf_23_dict_bug", **_ADVISER_ONLY),
+    UnitRegistryEntry("TensorFlowMultipleProcessesGPUBug", "thoth.adviser.wraps.tensorflow.tf_38518", **_ADVISER_ONLY),
+    UnitRegistryEntry("TensorFlowSlowKerasEmbedding", "thoth.adviser.wraps.tensorflow.tf_42475", **_ADVISER_ONLY),
+    UnitRegistryEntry("IntelTensorFlowWrap", "thoth.adviser.wraps.tensorflow.tf_intel", **_ADVISER_ONLY),
+    UnitRegistryEntry("MKLThreadsWrap", "thoth.adviser.wraps.tensorflow.tf_mkl_threads"),
+)
+
+_UNIT_REGISTRY_BY_NAME = {entry.name: entry for entry in UNIT_REGISTRY}
+
+
+def get_unit_registry_entry(name: str) -> Optional[UnitRegistryEntry]:
+    """Get registry entry for the given pipeline unit name, return None if not registered."""
+    return _UNIT_REGISTRY_BY_NAME.get(name)
+
+
+def lazy_unit_getattr(package: str, names: Sequence[str]) -> Callable[[str], Any]:
+    """Create a module level __getattr__ for the given package, importing pipeline units on first access."""
+    entries: Dict[str, UnitRegistryEntry] = {}
+    for name in names:
+        entry = _UNIT_REGISTRY_BY_NAME[name]
+        if not entry.module.startswith(package + "."):
+            raise ValueError(f"Pipeline unit {name!r} is not implemented in package {package!r}")
+
+        entries[name] = entry
+
+    def __getattr__(name: str) -> Any:
+        """Import the requested pipeline unit."""
+        entry = entries.get(name)
+        if entry is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+
+        unit_class = entry.load()
+        # Next accesses do not go through __getattr__.
+        setattr(sys.modules[package], name, unit_class)
+        return unit_class
+
+    return __getattr__
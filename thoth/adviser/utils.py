@@ -19,6 +19,8 @@
 
 import os
 import logging
+import resource
+import tracemalloc
 
 from typing import Any
 from typing import Set
@@ -40,6 +42,22 @@ def should_keep_history(value: Any) -> bool:
     raise ValueError(f"Unknown keep history configuration value: {value!r} if of type {type(value)!r}")
 
 
+def get_memory_usage() -> int:
+    """Get memory used by the current process in bytes.
+
+    If tracemalloc is tracing, the size of traced memory blocks is reported. Otherwise resident set size
+    is reported, falling back to the peak resident set size on systems without procfs.
+    """
+    if tracemalloc.is_tracing():
+        return tracemalloc.get_traced_memory()[0]
+
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * resource.getpagesize()
+    except (OSError, IndexError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
 def log_once(
     logger: logging.Logger,
     log_state: Set[Any],
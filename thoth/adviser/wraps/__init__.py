@@ -17,15 +17,7 @@
 
 """Wrap units implemented in adviser."""
 
-from .no_onservation import NoObservationWrap
-from .python import NoSemanticInterpositionWrap
-from .tensorflow import TensorFlow23DictSummary
-from .tensorflow import TensorFlow23Accuracy
-from .tensorflow import IntelTensorFlowWrap
-from .tensorflow import MKLThreadsWrap
-from .tensorflow import TensorFlowMultipleProcessesGPUBug
-from .tensorflow import TensorFlowSlowKerasEmbedding
-
+from ..unit_registry import lazy_unit_getattr
 
 # Relative ordering of units is relevant, as the order specifies order
 # in which the asked to be registered - any dependencies between them
@@ -40,3 +32,5 @@ __all__ = [
     "TensorFlowMultipleProcessesGPUBug",
     "TensorFlowSlowKerasEmbedding",
 ]
+
+__getattr__ = lazy_unit_getattr(__name__, __all__)
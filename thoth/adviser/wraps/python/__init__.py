@@ -17,8 +17,10 @@
 
 """Implementation of wraps used, specific for Python interpreter."""
 
-from .no_semantic_interposition import NoSemanticInterpositionWrap
+from ...unit_registry import lazy_unit_getattr
 
 __all__ = [
     "NoSemanticInterpositionWrap",
 ]
+
+__getattr__ = lazy_unit_getattr(__name__, __all__)
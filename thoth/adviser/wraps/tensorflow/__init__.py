@@ -17,12 +17,7 @@
 
 """Implementation of wraps used, specific for TensorFlow."""
 
-from .tf_23_accuracy import TensorFlow23Accuracy
-from .tf_23_dict_bug import TensorFlow23DictSummary
-from .tf_38518 import TensorFlowMultipleProcessesGPUBug
-from .tf_42475 import TensorFlowSlowKerasEmbedding
-from .tf_intel import IntelTensorFlowWrap
-from .tf_mkl_threads import MKLThreadsWrap
+from ...unit_registry import lazy_unit_getattr
 
 __all__ = [
     "TensorFlow23DictSummary",
@@ -32,3 +27,5 @@ __all__ = [
     "TensorFlowMultipleProcessesGPUBug",
     "TensorFlowSlowKerasEmbedding",
 ]
+
+__getattr__ = lazy_unit_getattr(__name__, __all__)